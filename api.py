@@ -1,12 +1,28 @@
-import json
-import os
-from fastapi import FastAPI
+from datetime import date
+from typing import Annotated, Dict, List
+
+import anyio
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
 
-from ml_predict import predict_aggregated
+from api_json import CompresieMiddleware, RaspunsJSON
+from calibration_table import load_calibration_table
+from config import get_config
+from elections import get_election
+from cpu_pool import RETRY_AFTER_SECUNDE, PoolPlin, pool_din_mediu
+from file_cache import file_fingerprint
+from http_cache import antete_cache, din_mtime_ns, etag, max_age_din_updated_at, nemodificat
+from ml_core import get_predictions, input_fingerprint
+from poll_store import load_poll_store
+from scenarii import MAX_SCENARII, lot_din_scenarii, scenarii_json, scoreaza_scenarii
+from stock_store import StockStore, get_stock_store
 
 # ================= APP =================
-app = FastAPI(title="MyPolls API")
+# RaspunsJSON: orjson dacă e instalat, altfel json din stdlib
+app = FastAPI(title="MyPolls API", default_response_class=RaspunsJSON)
 
 # ================= CORS =================
 app.add_middleware(
@@ -17,41 +33,220 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ================= COMPRESIE =================
+# gzip (brotli dacă e instalat) pentru răspunsurile peste ~1 KB
+app.add_middleware(CompresieMiddleware)
+
+# ================= POOL CPU =================
+# predicțiile / scenariile rulează aici; handler-ele async rămân libere
+# pentru citirile rapide (stock), care nu trec niciodată prin pool
+CPU_POOL = pool_din_mediu()
+
+
+@app.exception_handler(PoolPlin)
+async def pool_plin(request: Request, exc: PoolPlin):
+    return RaspunsJSON(
+        status_code=503,
+        content={"error": "Server busy, retry later"},
+        headers={"Retry-After": str(RETRY_AFTER_SECUNDE)},
+    )
+
 # ================= PATHS =================
-ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
-STOCK_CACHE_PATH = os.path.join(
-    ROOT_DIR, "data", "stock_cache", "stocks_cache.json"
-)
+# None → get_config().stock_cache_path (respectă MYPOLLS_ROOT); se poate suprascrie (benchmark-uri)
+STOCK_CACHE_PATH = None
 
 # ================= UTILS =================
-def load_stock_cache():
-    if not os.path.exists(STOCK_CACHE_PATH):
-        return {}
-    with open(STOCK_CACHE_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+# versiunea curentă a stocks_cache.json, parsată și pre-serializată per țară;
+# înlocuită dintr-o singură atribuire când stock_agent rescrie fișierul
+_stock = StockStore()
+
+
+async def stock_curent() -> StockStore:
+    """Doar un stat per request; re-parsare (în thread) numai când s-a schimbat fișierul."""
+    global _stock
+    path = STOCK_CACHE_PATH or get_config().stock_cache_path
+    if file_fingerprint(path) != _stock.fingerprint:
+        _stock = await anyio.to_thread.run_sync(get_stock_store, path)
+    return _stock
+
+
+def ultima_modificare(*paths):
+    """Cel mai recent mtime dintre fișiere (None dacă nu există niciunul)."""
+    mtimes = [fp[0] for fp in map(file_fingerprint, paths) if fp is not None]
+    return din_mtime_ns(max(mtimes)) if mtimes else None
 
 # ================= ML ENDPOINT =================
+def _antete_predictii():
+    """(ETag, antete de cache) — ieftin: hash-uri de fișiere ținute în cache după mtime."""
+    cfg = get_config()
+    # amprenta e hash-ul de conținut al sondajelor + rezultatelor + modelului + registrului
+    tag = etag("pmb2024", input_fingerprint())
+    modificat = ultima_modificare(cfg.polls_path, cfg.results_path, cfg.model_path, cfg.elections_path)
+    # se poate păstra în cache, dar se revalidează la fiecare folosire (304 e ieftin)
+    return tag, modificat, antete_cache(tag, modificat, "public, no-cache")
+
+
 @app.get("/api/pmb/2024")
-def get_pmb_2024_predictions():
-    return {
+async def get_pmb_2024_predictions(request: Request):
+    # verificarea condițională nu trece prin pool: un client la zi primește 304
+    # chiar și când pool-ul e plin; doar un cache miss ajunge la CPU_POOL
+    tag, modificat, antete = await anyio.to_thread.run_sync(_antete_predictii)
+    if nemodificat(request.headers, tag, modificat):
+        return Response(status_code=304, headers=antete)
+
+    artifact = await CPU_POOL.ruleaza(get_predictions)
+
+    # răspuns construit direct: fără jsonable_encoder; hit / miss stă în antet,
+    # nu în corp, ca același ETag să acopere mereu aceiași octeți
+    return RaspunsJSON({
         "election": "PMB 2024",
         "model": "RandomForest",
-        "predictions": predict_aggregated(verbose=False),
+        "predictions": artifact["predictions"],
+        "fingerprint": artifact["fingerprint"],
+    }, headers={**antete, "X-Cache": artifact["cache"]})
+
+# ================= WHAT-IF (SCENARII) =================
+# candidații permiși și parametrii impliciți de agregare vin din registru
+ALEGERE_SCENARII = "ro-pmb-2024"
+
+Procent = Annotated[float, Field(ge=0, le=100)]
+
+
+class Scenariu(BaseModel):
+    institut: str = Field(min_length=1)
+    metoda: str = "necunoscut"
+    data: date
+    esantion: float = Field(gt=0)
+    marja_eroare: float = Field(3.0, ge=0)
+    procentaje: Dict[str, Procent] = Field(min_length=1)
+
+
+class CerereScenarii(BaseModel):
+    # None → valorile intrării ALEGERE_SCENARII din data/elections.json
+    scenarii: List[Scenariu] = Field(min_length=1, max_length=MAX_SCENARII)
+    azi: date | None = None
+    max_age_days: int | None = Field(None, ge=0)
+    lambda_time_decay: float | None = Field(None, ge=0)
+
+
+def _eroare_validare(erori):
+    # aceeași formă ca validarea automată FastAPI (loc începe cu "body")
+    return RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in erori])
+
+
+def _candidati_necunoscuti(cerere: CerereScenarii, candidati: List[str]):
+    """
+    Erori de validare pentru numele care nu sunt în lista alegerii: fiecare
+    nume distinct ar deveni o coloană în matricile scenarii × candidați.
+    """
+    permisi = set(candidati)
+    return [
+        {
+            "type": "value_error",
+            "loc": ("scenarii", i, "procentaje", nume),
+            "msg": f"Candidat necunoscut pentru alegere: {nume}",
+            "input": nume,
+        }
+        for i, s in enumerate(cerere.scenarii)
+        for nume in s.procentaje
+        if nume not in permisi
+    ]
+
+
+def _scoreaza_cerere(corp: bytes):
+    """Validare + scorare, ambele în pool (100k scenarii înseamnă secunde de CPU)."""
+    try:
+        cerere = CerereScenarii.model_validate_json(corp)
+    except ValidationError as e:
+        raise _eroare_validare(e.errors(include_url=False))
+
+    alegere = get_election(ALEGERE_SCENARII)
+    necunoscuti = _candidati_necunoscuti(cerere, alegere.candidati)
+    if necunoscuti:
+        raise _eroare_validare(necunoscuti[:20])
+
+    cfg = get_config()
+    lot = lot_din_scenarii(
+        {
+            "institut": s.institut,
+            "metoda": s.metoda,
+            "data": s.data.isoformat(),
+            "esantion": s.esantion,
+            "marja_eroare": s.marja_eroare,
+            "procentaje": s.procentaje,
+        }
+        for s in cerere.scenarii
+    )
+
+    return scoreaza_scenarii(
+        lot,
+        load_poll_store(cfg.polls_path),
+        load_calibration_table(cfg.accuracy_path),
+        max_age_days=alegere.max_age_days if cerere.max_age_days is None else cerere.max_age_days,
+        lambda_time_decay=(
+            alegere.lambda_time_decay if cerere.lambda_time_decay is None else cerere.lambda_time_decay
+        ),
+        azi=alegere.zi_estimare if cerere.azi is None else cerere.azi,
+    )
+
+
+@app.post("/api/pmb/2024/scenarii")
+async def score_pmb_2024_scenarios(request: Request):
+    # corpul (CerereScenarii) se validează în pool, nu pe event loop
+    try:
+        scor = await CPU_POOL.ruleaza(_scoreaza_cerere, await request.body())
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    antet = {
+        "election": "PMB 2024",
+        "model": "RandomForest",
+        "azi": scor.azi.isoformat(),
+        "numar_scenarii": len(scor),
     }
+    return StreamingResponse(scenarii_json(scor, antet), media_type="application/json")
 
 # ================= STOCK ENDPOINT =================
 @app.get("/api/country/{code}/stock")
-def get_country_stock(code: str):
+async def get_country_stock(code: str, request: Request):
     code = code.upper()
-    cache = load_stock_cache()
+    tara = (await stock_curent()).get(code)
 
-    if code not in cache:
+    if tara is None:
         return {
             "error": "No stock data available",
             "country": code
         }
 
-    return {
-        "country": code,
-        **cache[code]
-    }
+    max_age = max_age_din_updated_at(tara.updated_at)
+    antete = antete_cache(tara.etag, tara.last_modified, f"public, max-age={max_age}")
+    if nemodificat(request.headers, tara.etag, tara.last_modified):
+        return Response(status_code=304, headers=antete)
+
+    # corpul e deja serializat: fără encoder JSON pe calea request-ului
+    return Response(content=tara.corp, media_type="application/json", headers=antete)
+
+# ================= BULK STOCK ENDPOINT =================
+def _lista_query(valoare: str | None):
+    """"RO,DE, FR" → ["RO", "DE", "FR"]; parametru lipsă → None (toate)."""
+    if valoare is None:
+        return None
+    return [v.strip() for v in valoare.split(",") if v.strip()]
+
+
+@app.get("/api/stocks")
+async def get_stocks(request: Request, countries: str | None = None, fields: str | None = None):
+    """
+    Toate țările (sau ?countries=RO,DE) într-un singur răspuns, opțional doar
+    cu câmpurile din ?fields=value,change_percent,status.
+    """
+    vedere = (await stock_curent()).vedere(_lista_query(countries), _lista_query(fields))
+
+    max_age = max_age_din_updated_at(
+        vedere.last_modified.isoformat() if vedere.last_modified else None
+    )
+    antete = antete_cache(vedere.etag, vedere.last_modified, f"public, max-age={max_age}")
+    if nemodificat(request.headers, vedere.etag, vedere.last_modified):
+        return Response(status_code=304, headers=antete)
+
+    return Response(content=vedere.corp, media_type="application/json", headers=antete)
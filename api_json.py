@@ -0,0 +1,231 @@
+from __future__ import annotations
+import json
+import math
+import zlib
+from datetime import date, datetime
+from typing import Any, List, Tuple
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# dependențe opționale: fără ele, stdlib json + doar gzip
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# -----------------------------
+# SERIALIZARE JSON RAPIDĂ
+#    - orjson dacă e instalat (NaN → null, numpy nativ), altfel json din stdlib
+#      cu aceleași setări compacte ca JSONResponse și tot NaN / Infinity → null
+#    - RaspunsJSON trimis direct din handler ocolește jsonable_encoder
+# -----------------------------
+
+def _implicit(obj: Any) -> Any:
+    """Ce nu știe json din stdlib: numpy (scalari / array-uri) și date."""
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _fara_nan(obj: Any) -> Any:
+    """Copie în care float-urile ne-finite devin None, ca la orjson."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _fara_nan(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_fara_nan(v) for v in obj]
+    if hasattr(obj, "tolist"):
+        return _fara_nan(obj.tolist())
+    return obj
+
+
+def _dumps_stdlib(continut: Any) -> bytes:
+    return json.dumps(
+        continut, ensure_ascii=False, allow_nan=False, indent=None,
+        separators=(",", ":"), default=_implicit,
+    ).encode("utf-8")
+
+
+def dumps(continut: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(continut, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    try:
+        return _dumps_stdlib(continut)
+    except ValueError:
+        # NaN / Infinity undeva în conținut: a doua trecere, după înlocuire
+        return _dumps_stdlib(_fara_nan(continut))
+
+
+class RaspunsJSON(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# -----------------------------
+# COMPRESIE (gzip, brotli dacă e instalat)
+#    - doar peste un prag de mărime; răspunsurile mici (și 304) trec neatinse
+#    - merge și pe StreamingResponse: fiecare bucată e compresată și trimisă imediat
+#    - bucățile mari se compresează într-un thread, ca să nu blocheze event loop-ul
+#    - ETag-ul devine slab (W/) pe varianta compresată, ca la nginx; comparația
+#      din http_cache.nemodificat e slabă, deci revalidarea funcționează la fel
+# -----------------------------
+
+MIN_MARIME_COMPRESIE = 1024
+NIVEL_GZIP = 6
+CALITATE_BROTLI = 5  # 10-11 sunt prea lente pentru răspunsuri dinamice
+MIN_MARIME_THREAD = 64 * 1024  # sub prag, compresia e mai ieftină decât saltul în thread
+
+
+class _Gzip:
+    nume = "gzip"
+
+    def __init__(self, nivel: int):
+        self._z = zlib.compressobj(nivel, zlib.DEFLATED, 31)  # 31 = container gzip
+
+    def bucata(self, date_: bytes) -> bytes:
+        return self._z.compress(date_) + self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def final(self, date_: bytes) -> bytes:
+        return self._z.compress(date_) + self._z.flush()
+
+
+class _Brotli:
+    nume = "br"
+
+    def __init__(self, calitate: int):
+        self._c = brotli.Compressor(quality=calitate)
+
+    def bucata(self, date_: bytes) -> bytes:
+        return self._c.process(date_) + self._c.flush()
+
+    def final(self, date_: bytes) -> bytes:
+        return self._c.process(date_) + self._c.finish()
+
+
+def _codificari_acceptate(accept_encoding: str) -> List[Tuple[str, float]]:
+    acceptate = []
+    for parte in accept_encoding.split(","):
+        nume, _, parametri = parte.strip().partition(";")
+        q = 1.0
+        if parametri.strip().startswith("q="):
+            try:
+                q = float(parametri.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if nume:
+            acceptate.append((nume.strip().lower(), q))
+    return acceptate
+
+
+def alege_codificare(accept_encoding: str) -> str | None:
+    """"br" dacă e acceptat și brotli există, altfel "gzip", altfel None."""
+    acceptate = {nume: q for nume, q in _codificari_acceptate(accept_encoding)}
+    if brotli is not None and acceptate.get("br", 0.0) > 0:
+        return "br"
+    if acceptate.get("gzip", 0.0) > 0:
+        return "gzip"
+    return None
+
+
+class CompresieMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = MIN_MARIME_COMPRESIE,
+        nivel_gzip: int = NIVEL_GZIP,
+        calitate_brotli: int = CALITATE_BROTLI,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.nivel_gzip = nivel_gzip
+        self.calitate_brotli = calitate_brotli
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            codificare = alege_codificare(Headers(scope=scope).get("accept-encoding", ""))
+            if codificare is not None:
+                compresor = _Brotli(self.calitate_brotli) if codificare == "br" else _Gzip(self.nivel_gzip)
+                await _Responder(self.app, self.minimum_size, compresor)(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class _Responder:
+    def __init__(self, app: ASGIApp, minimum_size: int, compresor: _Gzip | _Brotli):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresor = compresor
+        self.send: Send = _nelegat
+        self.start: Message = {}
+        self.pornit = False
+        self.compresat = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self._trimite)
+
+    def _antete_compresate(self) -> MutableHeaders:
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.compresor.nume
+        headers.add_vary_header("Accept-Encoding")
+        tag = headers.get("etag")
+        if tag is not None and not tag.startswith("W/"):
+            headers["ETag"] = "W/" + tag
+        return headers
+
+    async def _trimite(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # așteptăm primul body ca să știm dacă merită compresat
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.pornit:
+            self.pornit = True
+            deja = "content-encoding" in Headers(raw=self.start["headers"])
+            if deja or (len(body) < self.minimum_size and not more_body):
+                await self.send(self.start)
+                await self.send(message)
+                return
+
+            self.compresat = True
+            headers = self._antete_compresate()
+            if more_body:
+                del headers["Content-Length"]
+            message["body"] = await self._compreseaza(body, more_body)
+            if not more_body:
+                headers["Content-Length"] = str(len(message["body"]))
+            await self.send(self.start)
+            await self.send(message)
+            return
+
+        if self.compresat:
+            message["body"] = await self._compreseaza(body, more_body)
+        await self.send(message)
+
+    async def _compreseaza(self, body: bytes, more_body: bool) -> bytes:
+        fn = self.compresor.bucata if more_body else self.compresor.final
+        if len(body) < MIN_MARIME_THREAD:
+            return fn(body)
+        return await anyio.to_thread.run_sync(fn, body)
+
+
+async def _nelegat(message: Message) -> None:
+    raise RuntimeError("send nu a fost setat")  # pragma: no cover
@@ -0,0 +1,189 @@
+from __future__ import annotations
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+# -----------------------------
+# BENCHMARK: serializare JSON + octeți pe fir pentru endpoint-urile din api.py
+#    1. serializare: calea implicită FastAPI (jsonable_encoder + json) vs
+#       api_json.dumps (orjson dacă e instalat, altfel json compact)
+#    2. compresie: identity / gzip / br pe aceleași corpuri
+#    3. end-to-end prin TestClient cu Accept-Encoding diferit (octeți brut pe fir)
+#    stocurile sunt sintetice (fișier temporar); sondajele / modelul sunt cele din repo
+# -----------------------------
+
+TARI = "AT BE BG HR CY CZ DK EE FI FR DE GR HU IE IT LV LT LU MT NL PL PT RO SK SI ES SE".split()
+CANDIDATI = ["Nicușor Dan", "Gabriela Firea", "Cristian Popescu Piedone"]
+
+
+def stocuri_sintetice() -> Dict[str, Any]:
+    acum = datetime.now(timezone.utc)
+    return {
+        cod: {
+            "status": "ok",
+            "index": f"{cod} index",
+            "value": round(random.uniform(500, 20_000), 2),
+            "change_percent": round(random.uniform(-3, 3), 2),
+            "source": f"https://exchange.example/{cod.lower()}",
+            "updated_at": (acum - timedelta(minutes=random.randint(1, 600)))
+            .isoformat(timespec="seconds").replace("+00:00", "Z"),
+        }
+        for cod in TARI
+    }
+
+
+def scenarii_sintetice(n: int) -> List[Dict[str, Any]]:
+    institute = ["CURS", "AtlasIntel", "Avangarde", "INSCOP", "Institut nou"]
+    return [
+        {
+            "institut": random.choice(institute),
+            "metoda": random.choice(["CATI", "online"]),
+            "data": f"2024-05-{random.randint(1, 31):02d}",
+            "esantion": random.randint(600, 2000),
+            "procentaje": {c: round(random.uniform(10, 50), 1) for c in CANDIDATI},
+        }
+        for _ in range(n)
+    ]
+
+
+def raspuns_scenarii(n: int) -> Dict[str, Any]:
+    """Aceeași formă ca /api/pmb/2024/scenarii, ca obiect Python (pentru serializare)."""
+    return {
+        "election": "PMB 2024",
+        "azi": "2024-06-09",
+        "scenarii": [
+            {
+                "index": i,
+                "in_fereastra": True,
+                "candidati": {
+                    c: {k: random.uniform(0, 60) for k in ("calibrat", "agregat", "marja_eroare", "ml")}
+                    for c in CANDIDATI
+                },
+            }
+            for i in range(n)
+        ],
+    }
+
+
+def _cronometreaza(fn: Callable[[], Any], repetari: int) -> float:
+    """Cel mai bun timp (ms) din `repetari` rulări."""
+    best = float("inf")
+    for _ in range(repetari):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def sectiune_serializare(payloads: Dict[str, Any], repetari: int) -> Dict[str, bytes]:
+    import api_json
+    from fastapi.encoders import jsonable_encoder
+    from starlette.responses import JSONResponse
+
+    print(f"===== SERIALIZARE (ms, cel mai bun din {repetari}) — "
+          f"api_json folosește {'orjson' if api_json.orjson else 'json (stdlib)'} =====")
+    print(f"{'payload':<26} {'FastAPI implicit':>16} {'api_json':>10} {'x':>6} {'octeți':>10}")
+
+    corpuri: Dict[str, bytes] = {}
+    for nume, obj in payloads.items():
+        t_implicit = _cronometreaza(lambda: JSONResponse(jsonable_encoder(obj)).body, repetari)
+        t_rapid = _cronometreaza(lambda: api_json.dumps(obj), repetari)
+        corpuri[nume] = api_json.dumps(obj)
+        print(f"{nume:<26} {t_implicit:>16.2f} {t_rapid:>10.2f} "
+              f"{t_implicit / t_rapid:>5.1f}x {len(corpuri[nume]):>10,}")
+    return corpuri
+
+
+def sectiune_compresie(corpuri: Dict[str, bytes], repetari: int) -> None:
+    import api_json
+
+    compresoare = {"gzip": lambda: api_json._Gzip(api_json.NIVEL_GZIP)}
+    if api_json.brotli is not None:
+        compresoare["br"] = lambda: api_json._Brotli(api_json.CALITATE_BROTLI)
+
+    print(f"\n===== COMPRESIE (prag {api_json.MIN_MARIME_COMPRESIE} B) =====")
+    print(f"{'payload':<26} {'identity':>10}" + "".join(f" {c:>10} {'ms':>7}" for c in compresoare))
+    for nume, corp in corpuri.items():
+        linie = f"{nume:<26} {len(corp):>10,}"
+        for fabrica in compresoare.values():
+            compresat = fabrica().final(corp)
+            ms = _cronometreaza(lambda: fabrica().final(corp), repetari)
+            linie += f" {len(compresat):>10,} {ms:>7.2f}"
+        print(linie)
+    if api_json.brotli is None:
+        print("ℹ️ brotli nu e instalat: doar gzip")
+
+
+def sectiune_http(stocuri_path: Path, n_scenarii: int) -> None:
+    import api
+    import api_json
+    from fastapi.testclient import TestClient
+
+    api.STOCK_CACHE_PATH = str(stocuri_path)
+    codificari = ["identity", "gzip"] + (["br"] if api_json.brotli is not None else [])
+
+    cereri = [
+        ("GET", "/api/country/RO/stock", None),
+        ("GET", "/api/stocks", None),
+        ("GET", "/api/stocks?fields=value,change_percent,status", None),
+        ("GET", "/api/pmb/2024", None),
+        ("POST", "/api/pmb/2024/scenarii", {"scenarii": scenarii_sintetice(n_scenarii)}),
+    ]
+
+    print("\n===== END-TO-END (octeți pe fir / ms) =====")
+    print(f"{'cerere':<52}" + "".join(f" {c:>20}" for c in codificari))
+    with TestClient(api.app) as client:
+        for metoda, url, corp in cereri:
+            eticheta = url if corp is None else f"{url} ({n_scenarii} scenarii)"
+            linie = f"{metoda + ' ' + eticheta:<52}"
+            for cod in codificari:
+                t0 = time.perf_counter()
+                with client.stream(metoda, url, json=corp, headers={"Accept-Encoding": cod}) as r:
+                    octeti = sum(len(b) for b in r.iter_raw())
+                ms = (time.perf_counter() - t0) * 1000
+                linie += f" {f'{octeti:,} / {ms:.0f}':>20}" if r.status_code == 200 else f" {r.status_code:>20}"
+            print(linie)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serializare JSON + compresie pentru endpoint-urile API")
+    parser.add_argument("--scenarii", type=int, default=10_000, help="mărimea lotului what-if")
+    parser.add_argument("--repetari", type=int, default=5)
+    parser.add_argument("--fara-http", action="store_true", help="doar serializare + compresie")
+    args = parser.parse_args()
+
+    random.seed(0)
+    stocuri = stocuri_sintetice()
+    payloads = {
+        "country stock (RO)": {"country": "RO", **stocuri["RO"]},
+        "stocks bulk (27)": {"countries": stocuri},
+        "pmb 2024": {
+            "election": "PMB 2024",
+            "model": "RandomForest",
+            "predictions": {c: random.uniform(10, 50) for c in CANDIDATI},
+            "fingerprint": "0" * 64,
+        },
+        f"scenarii ({args.scenarii})": raspuns_scenarii(args.scenarii),
+    }
+
+    corpuri = sectiune_serializare(payloads, args.repetari)
+    sectiune_compresie(corpuri, args.repetari)
+
+    if not args.fara_http:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "stocks_cache.json"
+            path.write_text(json.dumps(stocuri, ensure_ascii=False, indent=2), encoding="utf-8")
+            sectiune_http(path, args.scenarii)
+
+
+if __name__ == "__main__":
+    main()
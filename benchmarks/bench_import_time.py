@@ -0,0 +1,89 @@
+from __future__ import annotations
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+# -----------------------------
+# BENCHMARK / GARDĂ PENTRU TIMPUL DE IMPORT
+#    python -X importtime -c "import <modul>" într-un proces nou, din root-ul proiectului;
+#    eșuează (exit 1) dacă un modul depășește bugetul sau trage după el
+#    biblioteci grele care trebuie încărcate doar la prima folosire
+# -----------------------------
+
+# modul → buget în ms (cumulativ, cel mai bun din --repetari rulări)
+BUGETE_MS: Dict[str, float] = {
+    "api": 1_000.0,       # dominat de fastapi / pydantic
+    "ml_core": 300.0,
+    "ml_predict": 300.0,
+    "main": 300.0,
+}
+
+INTERZISE = ("pandas", "sklearn", "joblib")
+
+
+def masoara(modul: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """(ms cumulativ pentru `modul`, [(modul importat, ms cumulativ)])."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modul}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"❌ import {modul} a eșuat:\n{proc.stderr[-2000:]}")
+
+    importuri: List[Tuple[str, float]] = []
+    for linie in proc.stderr.splitlines():
+        if not linie.startswith("import time:") or "|" not in linie:
+            continue
+        _, cumulativ, nume = (x.strip() for x in linie.split(":", 1)[1].split("|"))
+        if cumulativ.isdigit():
+            importuri.append((nume, int(cumulativ) / 1000.0))
+
+    total = next((ms for nume, ms in reversed(importuri) if nume == modul), float("nan"))
+    return total, importuri
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Timp de import per modul, cu buget (gardă de regresie)")
+    parser.add_argument("--module", nargs="+", default=list(BUGETE_MS))
+    parser.add_argument("--repetari", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5, help="cele mai scumpe importuri afișate per modul")
+    args = parser.parse_args()
+
+    probleme: List[str] = []
+    for modul in args.module:
+        rulari = [masoara(modul) for _ in range(args.repetari)]
+        total, importuri = min(rulari, key=lambda r: r[0])
+        buget = BUGETE_MS.get(modul)
+
+        stare = "✔" if buget is None or total <= buget else "❌"
+        print(f"{stare} {modul}: {total:.1f} ms" + (f" (buget {buget:.0f} ms)" if buget else ""))
+
+        directe = sorted(
+            ((n, ms) for n, ms in importuri if "." not in n and n != modul),
+            key=lambda x: -x[1],
+        )
+        for nume, ms in directe[:args.top]:
+            print(f"     {nume:<30} {ms:8.1f} ms")
+
+        grele = sorted({n.split(".")[0] for n, _ in importuri} & set(INTERZISE))
+        if grele:
+            probleme.append(f"{modul} importă la pornire: {', '.join(grele)}")
+        if buget is not None and total > buget:
+            probleme.append(f"{modul}: {total:.1f} ms > buget {buget:.0f} ms")
+
+    if probleme:
+        print("\n❌ Regresie la timpul de import:")
+        for p in probleme:
+            print(f"   - {p}")
+        sys.exit(1)
+
+    print("\n✔ Toate modulele sunt în buget.")
+
+
+if __name__ == "__main__":
+    main()
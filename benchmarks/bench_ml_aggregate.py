@@ -0,0 +1,90 @@
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ml_core import medii_ponderate_pe_grupuri
+
+
+# -----------------------------
+# BENCHMARK: agregarea predicțiilor ML pe candidat
+#    iterrows (implementarea veche) vs np.bincount, pe date sintetice
+#    de forma df_pred din predict_aggregated
+# -----------------------------
+
+def date_sintetice(n_randuri: int, n_candidati: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    candidati = np.array([f"Candidat {j}" for j in range(n_candidati)], dtype=object)
+    return pd.DataFrame({
+        "candidat": candidati[rng.integers(0, n_candidati, n_randuri)],
+        "esantion": rng.integers(0, 3000, n_randuri).astype(float),
+        "pred_procent_final": rng.uniform(0, 60, n_randuri),
+    })
+
+
+def agregare_iterrows(df_pred: pd.DataFrame) -> Dict[str, float]:
+    rezultate: Dict[str, Dict[str, float]] = {}
+    for _, row in df_pred.iterrows():
+        cand = row["candidat"]
+        w = max(float(row["esantion"]), 1.0)
+        val = float(row["pred_procent_final"])
+
+        if cand not in rezultate:
+            rezultate[cand] = {"num": 0.0, "den": 0.0}
+
+        rezultate[cand]["num"] += val * w
+        rezultate[cand]["den"] += w
+
+    return {cand: agg["num"] / agg["den"] for cand, agg in rezultate.items()}
+
+
+def agregare_bincount(df_pred: pd.DataFrame) -> Dict[str, float]:
+    cat = pd.Categorical(df_pred["candidat"])
+    greutati = np.maximum(df_pred["esantion"].to_numpy(dtype=float), 1.0)
+    stat = medii_ponderate_pe_grupuri(
+        cat.codes, df_pred["pred_procent_final"].to_numpy(), greutati, len(cat.categories)
+    )
+    return {c: float(stat["media"][j]) for j, c in enumerate(cat.categories)}
+
+
+def _cronometreaza(fn, df: pd.DataFrame, repetari: int) -> tuple[float, Dict[str, float]]:
+    best = float("inf")
+    out: Dict[str, float] = {}
+    for _ in range(repetari):
+        t0 = time.perf_counter()
+        out = fn(df)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="iterrows vs bincount pentru agregarea predicțiilor")
+    parser.add_argument("--randuri", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--candidati", type=int, default=12)
+    parser.add_argument("--max-iterrows", type=int, default=100_000,
+                        help="peste acest număr de rânduri iterrows nu se mai rulează")
+    parser.add_argument("--repetari", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rânduri':>10} {'iterrows (s)':>14} {'bincount (s)':>14} {'speedup':>9} {'max |Δ|':>10}")
+    for n in args.randuri:
+        df = date_sintetice(n, args.candidati)
+        t_vec, vec = _cronometreaza(agregare_bincount, df, args.repetari)
+
+        if n <= args.max_iterrows:
+            t_loop, loop = _cronometreaza(agregare_iterrows, df, 1)
+            delta = max(abs(loop[c] - vec[c]) for c in loop)
+            print(f"{n:>10} {t_loop:>14.4f} {t_vec:>14.5f} {t_loop / t_vec:>8.0f}x {delta:>10.2e}")
+        else:
+            print(f"{n:>10} {'—':>14} {t_vec:>14.5f} {'—':>9} {'—':>10}")
+
+
+if __name__ == "__main__":
+    main()
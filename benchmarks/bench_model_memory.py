@@ -0,0 +1,154 @@
+from __future__ import annotations
+import argparse
+import multiprocessing as mp
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+# -----------------------------
+# BENCHMARK: memoria rezidentă per worker pentru fiecare mod de încărcare
+#    N procese încarcă același model simultan (ca N workeri uvicorn);
+#    citim /proc/self/smaps_rollup înainte / după încărcare + o predicție.
+#      - RSS: paginile atinse de proces (inclusiv cele partajate)
+#      - Private: pagini doar ale procesului (heap, copii)
+#      - Pss: paginile partajate împărțite la numărul de procese care le folosesc
+# -----------------------------
+
+MODURI = ["pickle", "pickle-mmap", "flat", "flat-mmap", "flat32-mmap"]
+
+
+def _memorie() -> Dict[str, int]:
+    """kB din /proc/self/smaps_rollup (Linux)."""
+    out: Dict[str, int] = {}
+    with open("/proc/self/smaps_rollup", encoding="ascii") as f:
+        for linie in f:
+            parti = linie.split()
+            if len(parti) == 3 and parti[2] == "kB":
+                out[parti[0].rstrip(":")] = int(parti[1])
+    return {
+        "rss": out.get("Rss", 0),
+        "pss": out.get("Pss", 0),
+        "private": out.get("Private_Clean", 0) + out.get("Private_Dirty", 0),
+    }
+
+
+def _features(n: int, seed: int):
+    from ml_features import FeatureMatrix
+
+    rng = np.random.default_rng(seed)
+    categorii = {
+        "institut": [f"Institut {i}" for i in range(8)],
+        "metoda": ["CATI", "online", "telefonic", "față în față"],
+        "candidat": [f"Candidat {j}" for j in range(6)],
+    }
+    coduri = np.column_stack([rng.integers(0, len(v), n) for v in categorii.values()]).astype(np.int32)
+    numerice = np.column_stack([
+        rng.integers(0, 60, n),
+        rng.integers(600, 2000, n),
+        rng.uniform(0, 50, n),
+        rng.uniform(2, 4, n),
+    ]).astype(np.float32)
+    return FeatureMatrix(categorii=categorii, coduri=coduri, numerice=numerice, sondaj=np.zeros(n, np.int32))
+
+
+def _worker(mod: str, director: str, bariera, coada) -> None:
+    import joblib
+    import ml_flat
+
+    fm = _features(64, seed=1)
+    X = fm.to_frame()
+    inainte = _memorie()
+
+    t0 = time.perf_counter()
+    if mod == "pickle":
+        model = joblib.load(Path(director) / "model.pkl")
+    elif mod == "pickle-mmap":
+        model = joblib.load(Path(director) / "model.pkl", mmap_mode="r")
+    elif mod == "flat":
+        model = ml_flat.load_flat_model(Path(director) / "flat.npz", mmap=False)
+    elif mod == "flat-mmap":
+        model = ml_flat.load_flat_model(Path(director) / "flat.npz", mmap=True)
+    else:
+        model = ml_flat.load_flat_model(Path(director) / "flat32.npz", mmap=True)
+    incarcare = time.perf_counter() - t0
+
+    model.predict(fm if mod.startswith("flat") else X)
+
+    # toți workerii au modelul încărcat → Pss reflectă partajarea
+    bariera.wait()
+    dupa = _memorie()
+    coada.put({
+        "incarcare": incarcare,
+        **{k: dupa[k] - inainte[k] for k in dupa},
+    })
+    bariera.wait()
+
+
+def pregateste_modele(director: Path, randuri: int, arbori: int) -> Dict[str, int]:
+    import joblib
+    import ml_core
+    import ml_flat
+    from ml_features import FEATURE_COLS
+
+    fm = _features(randuri, seed=0)
+    df = fm.to_frame()
+    y = 0.8 * fm.numerice[:, 2] + np.random.default_rng(0).normal(0, 1.5, randuri)
+
+    pipe = ml_core._pipeline_nou(n_estimators=arbori)
+    pipe.fit(df[FEATURE_COLS], y)
+
+    joblib.dump(pipe, director / "model.pkl")
+    ml_flat.export_flat_model(pipe, director / "flat.npz")
+    ml_flat.export_flat_model(pipe, director / "flat32.npz", valori_float32=True)
+    return {p.name: p.stat().st_size for p in director.iterdir()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSS per worker: pickle vs model plat mmap")
+    parser.add_argument("--workeri", type=int, default=4)
+    parser.add_argument("--randuri", type=int, default=20_000, help="rânduri sintetice pentru antrenare")
+    parser.add_argument("--arbori", type=int, default=300)
+    parser.add_argument("--moduri", nargs="+", default=MODURI, choices=MODURI)
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        director = Path(tmp)
+        print(f"🧠 Antrenez un RF sintetic ({args.randuri} rânduri, {args.arbori} arbori)...")
+        marimi = pregateste_modele(director, args.randuri, args.arbori)
+        for nume, marime in sorted(marimi.items()):
+            print(f"   {nume}: {marime / 2**20:.1f} MB")
+
+        print(f"\n{args.workeri} workeri simultan, Δ față de înainte de încărcare (MB / worker):")
+        print(f"{'mod':>12} {'RSS':>8} {'Private':>8} {'Pss':>8} {'load (s)':>9}")
+        for mod in args.moduri:
+            bariera = ctx.Barrier(args.workeri)
+            coada = ctx.Queue()
+            procese = [
+                ctx.Process(target=_worker, args=(mod, tmp, bariera, coada))
+                for _ in range(args.workeri)
+            ]
+            for p in procese:
+                p.start()
+            rezultate = [coada.get() for _ in procese]
+            for p in procese:
+                p.join()
+
+            def _medie(k):
+                return sum(r[k] for r in rezultate) / len(rezultate)
+
+            print(
+                f"{mod:>12} {_medie('rss') / 1024:>8.1f} {_medie('private') / 1024:>8.1f} "
+                f"{_medie('pss') / 1024:>8.1f} {_medie('incarcare'):>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
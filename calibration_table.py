@@ -0,0 +1,189 @@
+from __future__ import annotations
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from file_cache import FileCache
+
+
+# cât de mult contează institutul vs candidatul la coeficient
+GAMMA_INST_COEF = 0.7
+GAMMA_CAND_COEF = 0.3
+
+# cât de mult contează institutul vs candidatul la bonus_greutate
+GAMMA_INST_BONUS = 0.7
+GAMMA_CAND_BONUS = 0.3
+
+
+def _eroare(x: Any) -> float:
+    """eroare_medie ca float; NaN dacă lipsește sau nu e numerică."""
+    return float(x) if isinstance(x, (int, float)) else float("nan")
+
+
+# -----------------------------
+# TABELUL COMPILAT DE CALIBRARE
+# -----------------------------
+
+class CalibrationTable:
+    """
+    Calibrarea din accuracy_institutes.json compilată o singură dată în
+    matrice dense (institut × candidat):
+      - coef       : coeficientul efectiv aplicat pe procent
+      - bonus      : bonusul efectiv de greutate
+      - penalizare : 1 / (1 + eroarea medie globală + per candidat)
+
+    Ultimul rând e folosit pentru institutele necunoscute, ultima coloană
+    pentru candidații fără calibrare proprie. Valorile brute (globale și per
+    candidat) sunt păstrate pentru audit; eroare lipsă = NaN.
+    """
+
+    def __init__(self, institute: Sequence[str], candidati: Sequence[str]):
+        self.institute: List[str] = list(institute)
+        self.candidati: List[str] = list(candidati)
+        self.institute_ids: Dict[str, int] = {n: i for i, n in enumerate(self.institute)}
+        self.candidat_ids: Dict[str, int] = {n: j for j, n in enumerate(self.candidati)}
+
+        n_inst, n_cand = len(self.institute) + 1, len(self.candidati) + 1
+
+        self.global_bonus = np.ones(n_inst)
+        self.global_err = np.full(n_inst, np.nan)
+        self.global_coef = np.ones(n_inst)
+
+        self.cand_bonus = np.ones((n_inst, n_cand))
+        self.cand_err = np.full((n_inst, n_cand), np.nan)
+        self.cand_coef = np.ones((n_inst, n_cand))
+
+        self.coef = np.ones((n_inst, n_cand))
+        self.bonus = np.ones((n_inst, n_cand))
+        self.penalizare = np.ones((n_inst, n_cand))
+
+    @classmethod
+    def from_accuracy_db(
+        cls,
+        accuracy_db: Dict[str, Dict[str, Any]],
+        candidati: Iterable[str] = (),
+    ) -> "CalibrationTable":
+        nume_candidati: Dict[str, None] = dict.fromkeys(candidati)
+        for inst_info in accuracy_db.values():
+            cand_block = (inst_info or {}).get("cand")
+            if isinstance(cand_block, dict):
+                nume_candidati.update(dict.fromkeys(cand_block))
+
+        table = cls(list(accuracy_db), list(nume_candidati))
+
+        for i, inst in enumerate(table.institute):
+            inst_info = accuracy_db.get(inst, {}) or {}
+
+            global_bonus = float(inst_info.get("bonus_greutate", 1.0))
+            global_err = inst_info.get("eroare_medie")
+            global_coef = float(inst_info.get("coeficient_procente", 1.0))
+
+            table.global_bonus[i] = global_bonus
+            table.global_err[i] = _eroare(global_err)
+            table.global_coef[i] = global_coef
+
+            cand_block = inst_info.get("cand")
+            if not isinstance(cand_block, dict):
+                cand_block = {}
+
+            # rândul pornește cu valorile pentru un candidat fără calibrare proprie
+            table._seteaza(i, -1, global_bonus, global_err, global_coef, {})
+            table.cand_bonus[i, :] = table.cand_bonus[i, -1]
+            table.cand_err[i, :] = table.cand_err[i, -1]
+            table.cand_coef[i, :] = table.cand_coef[i, -1]
+            table.coef[i, :] = table.coef[i, -1]
+            table.bonus[i, :] = table.bonus[i, -1]
+            table.penalizare[i, :] = table.penalizare[i, -1]
+
+            for cand, cand_info in cand_block.items():
+                table._seteaza(
+                    i, table.candidat_ids[cand],
+                    global_bonus, global_err, global_coef, cand_info or {},
+                )
+
+        return table
+
+    def _seteaza(
+        self,
+        i: int,
+        j: int,
+        global_bonus: float,
+        global_err: Any,
+        global_coef: float,
+        cand_info: Dict[str, Any],
+    ) -> None:
+        # aceleași formule ca în calculeaza_media_candidat, evaluate o singură dată
+        cand_bonus = float(cand_info.get("bonus_greutate", global_bonus))
+        cand_err = cand_info.get("eroare_medie", global_err)
+        cand_coef = float(cand_info.get("coeficient_procente", 1.0))
+
+        self.cand_bonus[i, j] = cand_bonus
+        self.cand_err[i, j] = _eroare(cand_err)
+        self.cand_coef[i, j] = cand_coef
+
+        self.coef[i, j] = (global_coef ** GAMMA_INST_COEF) * (cand_coef ** GAMMA_CAND_COEF)
+        self.bonus[i, j] = (global_bonus ** GAMMA_INST_BONUS) * (cand_bonus ** GAMMA_CAND_BONUS)
+
+        erori = [e for e in [global_err, cand_err] if isinstance(e, (int, float))]
+        if erori:
+            self.penalizare[i, j] = 1.0 / (1.0 + sum(erori) / len(erori))
+        else:
+            self.penalizare[i, j] = 1.0
+
+    # ----------------------------
+    # LOOKUP
+    # ----------------------------
+
+    def id_institut(self, institut: str) -> int:
+        return self.institute_ids.get(institut, len(self.institute))
+
+    def id_candidat(self, candidat: str) -> int:
+        return self.candidat_ids.get(candidat, len(self.candidati))
+
+    def ids_institute(self, institute: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self.id_institut(n) for n in institute), dtype=np.intp)
+
+    def ids_candidati(self, candidati: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self.id_candidat(n) for n in candidati), dtype=np.intp)
+
+    def lookup(self, institut: str, candidat: str) -> Tuple[float, float, float]:
+        """(coef efectiv, bonus efectiv, penalizare eroare) pentru o pereche institut/candidat."""
+        i, j = self.id_institut(institut), self.id_candidat(candidat)
+        return float(self.coef[i, j]), float(self.bonus[i, j]), float(self.penalizare[i, j])
+
+    def fingerprint(self) -> str:
+        """Hash al calibrării efective; se schimbă doar dacă se schimbă rezultatul agregării."""
+        h = hashlib.sha1()
+        h.update(json.dumps([self.institute, self.candidati], ensure_ascii=False).encode("utf-8"))
+        for arr in (self.coef, self.bonus, self.penalizare):
+            h.update(np.ascontiguousarray(arr).tobytes())
+        return h.hexdigest()
+
+
+def as_calibration_table(
+    accuracy_db: Dict[str, Dict[str, Any]] | CalibrationTable,
+) -> CalibrationTable:
+    """Acceptă fie dict-ul brut din JSON, fie un tabel deja compilat."""
+    if isinstance(accuracy_db, CalibrationTable):
+        return accuracy_db
+    return CalibrationTable.from_accuracy_db(accuracy_db)
+
+
+# -----------------------------
+# ÎNCĂRCARE DIN accuracy_institutes.json (recompilat doar la schimbare)
+# -----------------------------
+
+def _compile_file(path: Path) -> CalibrationTable:
+    if not path.exists():
+        return CalibrationTable.from_accuracy_db({})
+    return CalibrationTable.from_accuracy_db(json.loads(path.read_text(encoding="utf-8")))
+
+
+_TABLE_CACHE = FileCache(_compile_file)
+
+
+def load_calibration_table(path: Path | str) -> CalibrationTable:
+    return _TABLE_CACHE.get(path)
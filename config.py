@@ -0,0 +1,93 @@
+from __future__ import annotations
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+
+# -----------------------------
+# CONFIGURARE PROIECT (căi)
+#    - calculată la prima folosire (get_config), apoi ținută în cache
+#    - ROOT = primul director părinte care conține "data/", sau MYPOLLS_ROOT din mediu
+#    - nu creează nimic pe disc; directoarele se fac la prima scriere
+# -----------------------------
+
+ROOT_ENV = "MYPOLLS_ROOT"
+
+
+def gaseste_root(start: Path) -> Path:
+    """Urcăm în sus de la `start` până găsim folderul "data"."""
+    root = start
+    while root != root.parent:
+        if (root / "data").exists():
+            return root
+        root = root.parent
+    raise FileNotFoundError("❌ Nu am putut găsi folderul 'data' în niciun director părinte.")
+
+
+@dataclass(frozen=True)
+class Config:
+    root: Path
+
+    @property
+    def data_dir(self) -> Path:
+        return self.root / "data"
+
+    @property
+    def model_dir(self) -> Path:
+        return self.root / "models"
+
+    @property
+    def history_dir(self) -> Path:
+        return self.data_dir / "history"
+
+    @property
+    def polls_path(self) -> Path:
+        return self.data_dir / "polls_buc.json"
+
+    @property
+    def results_path(self) -> Path:
+        return self.data_dir / "results_buc.json"
+
+    @property
+    def accuracy_path(self) -> Path:
+        return self.data_dir / "accuracy_institutes.json"
+
+    @property
+    def elections_path(self) -> Path:
+        return self.data_dir / "elections.json"
+
+    @property
+    def election_results_path(self) -> Path:
+        return self.data_dir / "rezultate_alegeri.json"
+
+    @property
+    def stock_cache_path(self) -> Path:
+        return self.data_dir / "stock_cache" / "stocks_cache.json"
+
+    @property
+    def model_path(self) -> Path:
+        return self.model_dir / "pmb_2024_rf.pkl"
+
+    @property
+    def flat_model_path(self) -> Path:
+        return self.model_dir / "pmb_2024_rf_flat.npz"
+
+    @property
+    def predictions_path(self) -> Path:
+        return self.model_dir / "pmb_2024_predictions.json"
+
+    @property
+    def feature_cache_dir(self) -> Path:
+        return self.model_dir / "features"
+
+    @property
+    def training_state_path(self) -> Path:
+        return self.model_dir / "pmb_2024_training.json"
+
+
+@lru_cache(maxsize=None)
+def get_config() -> Config:
+    if os.environ.get(ROOT_ENV):
+        return Config(root=Path(os.environ[ROOT_ENV]).resolve())
+    return Config(root=gaseste_root(Path(__file__).resolve().parent))
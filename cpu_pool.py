@@ -0,0 +1,64 @@
+from __future__ import annotations
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+# -----------------------------
+# POOL DEDICAT PENTRU MUNCA CPU DIN API (predicție, agregare, scenarii)
+#    - thread-uri separate de threadpool-ul implicit Starlette, deci citirile
+#      rapide (stock) nu stau la coadă în spatele unei predicții lente
+#    - capacitate fixă: workers care rulează + loc în coadă; peste → PoolPlin
+#      (API-ul răspunde 503 + Retry-After în loc să acumuleze cereri)
+#    - mărimea din mediu: MYPOLLS_CPU_WORKERS, MYPOLLS_CPU_QUEUE
+# -----------------------------
+
+WORKERS_ENV = "MYPOLLS_CPU_WORKERS"
+QUEUE_ENV = "MYPOLLS_CPU_QUEUE"
+RETRY_AFTER_SECUNDE = 2
+
+
+class PoolPlin(RuntimeError):
+    """Toți workerii sunt ocupați și coada e plină."""
+
+
+class ExecutorLimitat:
+    def __init__(self, workers: int, coada: int):
+        if workers < 1 or coada < 0:
+            raise ValueError("❌ workers trebuie să fie ≥ 1 și coada ≥ 0.")
+        self.workers = workers
+        self.coada = coada
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mypolls-cpu")
+        self._sloturi = threading.BoundedSemaphore(workers + coada)
+
+    async def ruleaza(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Rulează fn în pool și așteaptă rezultatul fără să blocheze event loop-ul."""
+        if not self._sloturi.acquire(blocking=False):
+            raise PoolPlin(f"❌ Pool ocupat ({self.workers} workeri, coadă {self.coada}).")
+
+        try:
+            viitor = self._executor.submit(partial(fn, *args, **kwargs))
+        except BaseException:
+            self._sloturi.release()
+            raise
+        # slotul se eliberează când munca se termină efectiv, nu când clientul renunță
+        viitor.add_done_callback(lambda _: self._sloturi.release())
+        return await asyncio.wrap_future(viitor)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _din_mediu(nume: str, implicit: int) -> int:
+    valoare = os.environ.get(nume)
+    return int(valoare) if valoare else implicit
+
+
+def pool_din_mediu() -> ExecutorLimitat:
+    workers = _din_mediu(WORKERS_ENV, min(4, os.cpu_count() or 1))
+    return ExecutorLimitat(workers, _din_mediu(QUEUE_ENV, 2 * workers))
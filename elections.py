@@ -0,0 +1,100 @@
+from __future__ import annotations
+import json
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List
+
+from config import get_config
+
+# ROOT / REGISTRY_PATH vin din config.get_config() (respectă MYPOLLS_ROOT),
+# calculate la prima folosire, ca în ml_core
+_CAI = {
+    "ROOT": "root",
+    "REGISTRY_PATH": "elections_path",
+}
+
+
+def __getattr__(name: str):
+    if name in _CAI:
+        return getattr(get_config(), _CAI[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# -----------------------------
+# REGISTRUL DE ALEGERI
+#    data/elections.json — câte o intrare per alegere:
+#      id, data, candidați, sursa de sondaje (+ rezultate / calibrare opționale)
+# -----------------------------
+
+@dataclass
+class Election:
+    id: str
+    nume: str
+    tara: str
+    data: date
+    candidati: List[str]
+    sondaje: Path
+    rezultate: Path | None = None
+    accuracy: Path | None = None
+    azi: date | None = None
+    max_age_days: int = 45
+    lambda_time_decay: float = 0.05
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def zi_estimare(self) -> date:
+        """Ziua pentru care se face agregarea: "azi" din registru, altfel cel târziu ziua alegerilor."""
+        if self.azi is not None:
+            return self.azi
+        return min(date.today(), self.data)
+
+    @classmethod
+    def from_dict(cls, item: Dict[str, Any], root: Path | None = None) -> "Election":
+        cunoscute = {
+            "id", "nume", "tara", "data", "candidati", "sondaje", "rezultate",
+            "accuracy", "azi", "max_age_days", "lambda_time_decay",
+        }
+
+        if root is None:
+            root = get_config().root
+
+        def _cale(x):
+            return None if x is None else root / x
+
+        return cls(
+            id=item["id"],
+            nume=item.get("nume", item["id"]),
+            tara=item.get("tara", ""),
+            data=date.fromisoformat(item["data"]),
+            candidati=list(item["candidati"]),
+            sondaje=root / item["sondaje"],
+            rezultate=_cale(item.get("rezultate")),
+            accuracy=_cale(item.get("accuracy")),
+            azi=date.fromisoformat(item["azi"]) if item.get("azi") else None,
+            max_age_days=int(item.get("max_age_days", 45)),
+            lambda_time_decay=float(item.get("lambda_time_decay", 0.05)),
+            extra={k: v for k, v in item.items() if k not in cunoscute},
+        )
+
+
+def load_registry(path: Path | str | None = None) -> Dict[str, Election]:
+    path = get_config().elections_path if path is None else Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"❌ Registrul de alegeri nu există ({path}).")
+
+    items = json.loads(path.read_text(encoding="utf-8"))
+    registry: Dict[str, Election] = {}
+    for item in items:
+        election = Election.from_dict(item)
+        if election.id in registry:
+            raise ValueError(f"❌ Id de alegere duplicat în registru: {election.id}")
+        registry[election.id] = election
+    return registry
+
+
+def get_election(election_id: str, path: Path | str | None = None) -> Election:
+    registry = load_registry(path)
+    if election_id not in registry:
+        raise KeyError(f"❌ Alegere necunoscută: {election_id}")
+    return registry[election_id]
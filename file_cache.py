@@ -0,0 +1,76 @@
+from __future__ import annotations
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+
+# -----------------------------
+# AMPRENTA UNUI FIȘIER (mtime + mărime)
+# -----------------------------
+
+def file_fingerprint(path: Path | str) -> Tuple[int, int] | None:
+    """(mtime_ns, size) pentru fișier sau None dacă fișierul nu există."""
+    try:
+        st = Path(path).stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+# -----------------------------
+# CACHE ÎN PROCES, INVALIDAT LA SCHIMBAREA FIȘIERULUI
+# -----------------------------
+
+class FileCache:
+    """
+    Ține în memorie rezultatul unui loader per fișier și îl reîncarcă doar
+    când se schimbă amprenta (mtime/size). Lock-ul garantează că mai multe
+    thread-uri care cer același fișier simultan îl încarcă o singură dată.
+    """
+
+    def __init__(self, loader: Callable[[Path], Any]):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._entries: Dict[Path, Tuple[Tuple[int, int] | None, Any]] = {}
+
+    def get(self, path: Path | str) -> Any:
+        path = Path(path)
+        fp = file_fingerprint(path)
+
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == fp:
+            return entry[1]
+
+        with self._lock:
+            fp = file_fingerprint(path)
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == fp:
+                return entry[1]
+
+            value = self._loader(path)
+            self._entries[path] = (fp, value)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# -----------------------------
+# HASH DE CONȚINUT (recalculat doar când se schimbă mtime/size)
+# -----------------------------
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+_SHA256_CACHE = FileCache(_sha256)
+
+
+def file_sha256(path: Path | str) -> str:
+    return _SHA256_CACHE.get(path)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Mapping
+
+
+# -----------------------------
+# CONDITIONAL GET (ETag / Last-Modified → 304)
+#    - ETag-ul vine din amprentele fișierelor sursă, nu din corpul răspunsului,
+#      deci un 304 nu cere nici citire, nici serializare
+#    - If-None-Match are prioritate față de If-Modified-Since (RFC 9110 §13.2.2)
+# -----------------------------
+
+# prospețimea datelor de stock: 10% din vârsta lui updated_at (euristica
+# RFC 9111 §4.2.2 pentru Last-Modified), limitată la [MIN, MAX] secunde
+FRACTIE_VARSTA = 0.1
+MIN_MAX_AGE = 30
+MAX_MAX_AGE = 3600
+
+
+def etag(*parti: object) -> str:
+    """ETag tare (între ghilimele) din orice părți care identifică reprezentarea."""
+    h = hashlib.sha256("|".join(str(p) for p in parti).encode("utf-8"))
+    return f'"{h.hexdigest()[:32]}"'
+
+
+def http_date(moment: datetime) -> str:
+    """Format IMF-fixdate (Last-Modified), mereu în GMT."""
+    return format_datetime(moment.astimezone(timezone.utc), usegmt=True)
+
+
+def din_mtime_ns(mtime_ns: int) -> datetime:
+    # HTTP are rezoluție de o secundă
+    return datetime.fromtimestamp(mtime_ns // 1_000_000_000, tz=timezone.utc)
+
+
+def _etag_potrivit(if_none_match: str, tag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # comparație slabă: W/"x" și "x" sunt aceeași reprezentare pentru GET
+    valori = (v.strip() for v in if_none_match.split(","))
+    return any(v.removeprefix("W/") == tag for v in valori)
+
+
+def nemodificat(headers: Mapping[str, str], tag: str, last_modified: datetime | None = None) -> bool:
+    """True dacă clientul are deja reprezentarea curentă (→ 304)."""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_potrivit(if_none_match, tag)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        data_client = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False  # dată invalidă → se ignoră header-ul
+    if data_client.tzinfo is None:
+        data_client = data_client.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= data_client
+
+
+def max_age_din_updated_at(updated_at: str | None, acum: datetime | None = None) -> int:
+    """Câte secunde poate fi refolosită o intrare de stock, după vârsta ei."""
+    if acum is None:
+        acum = datetime.now(timezone.utc)
+    try:
+        actualizat = datetime.fromisoformat(str(updated_at).replace("Z", "+00:00"))
+    except ValueError:
+        return MIN_MAX_AGE
+    if actualizat.tzinfo is None:
+        actualizat = actualizat.replace(tzinfo=timezone.utc)
+
+    varsta = max((acum - actualizat).total_seconds(), 0.0)
+    return int(min(max(varsta * FRACTIE_VARSTA, MIN_MAX_AGE), MAX_MAX_AGE))
+
+
+def antete_cache(tag: str, last_modified: datetime | None, cache_control: str) -> Dict[str, str]:
+    """Aceleași antete la 200 și la 304."""
+    antete = {"ETag": tag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        antete["Last-Modified"] = http_date(last_modified)
+    return antete
@@ -0,0 +1,316 @@
+from __future__ import annotations
+import hashlib
+import json
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from calibration_table import CalibrationTable, as_calibration_table
+from poll_aggregator import Poll, _construieste_matrice, _rezultat_candidat
+from poll_store import PollStore
+
+
+STATE_VERSION = 2
+
+# rândurile unui galet zilnic: Σ greutate_baza, Σ greutate_baza·procent,
+# Σ greutate_baza²·se², numărul de sondaje (per candidat)
+_W, _WX, _W2SE2, _N = range(4)
+
+
+# -----------------------------
+# AGREGATOR INCREMENTAL
+#    - sumele ponderate (Σw·x, Σw, Σw²·se²) ținute pe galeți, câte unul per
+#      zi de sondaj, fără time-decay; decay-ul și fereastra se aplică doar la
+#      citire (rezultate), deci advance() nu are nevoie de sondaje
+#    - add_polls / remove_polls: o singură matrice pentru tot lotul
+#    - pe disc: doar galeții + un cursor per fișier sursă (octeți absorbiți +
+#      sha256 al lor); sincronizeaza() parsează doar coada adăugată la final,
+#      orice altă modificare a fișierului → reconstrucție din sursă
+#    - fără deduplicare: fiecare înregistrare contează o dată, ca în
+#      calculeaza_medii_candidati
+# -----------------------------
+
+class IncrementalAggregator:
+    """
+    Aceleași agregate ca calculeaza_medii_candidati, ținute la zi lot cu
+    lot în loc să fie recalculate de la zero la fiecare rulare.
+    """
+
+    def __init__(
+        self,
+        candidati: Sequence[str],
+        accuracy_db: Dict[str, Dict[str, Any]] | CalibrationTable,
+        max_age_days: int = 45,
+        lambda_time_decay: float = 0.05,
+        azi: date | None = None,
+    ):
+        self.candidati: List[str] = list(candidati)
+        self.max_age_days = max_age_days
+        self.lambda_time_decay = lambda_time_decay
+        self.azi = azi if azi is not None else date.today()
+
+        self._tabel = as_calibration_table(accuracy_db)
+        self._galeti: Dict[int, np.ndarray] = {}       # ordinal zi → (4 × n_cand)
+        self._surse: Dict[str, Dict[str, Any]] = {}    # cale → cursor
+        self._numar_sondaje = 0
+
+    # ----------------------------
+    # CONTRIBUȚIA UNUI LOT DE SONDAJE
+    # ----------------------------
+
+    def _aplica(self, sondaje: Sequence[Poll] | PollStore, semn: float) -> int:
+        if not len(sondaje):
+            return 0
+
+        m = _construieste_matrice(sondaje, self.candidati, self._tabel)
+        contributii = np.stack([
+            m.greutati_baza,
+            m.greutati_baza * m.procente,
+            (m.greutati_baza ** 2) * (m.ses ** 2)[:, None],
+            m.prezent.astype(float),
+        ], axis=1)
+
+        zile, idx = np.unique(m.zile, return_inverse=True)
+        sume = np.zeros((len(zile), 4, len(self.candidati)))
+        np.add.at(sume, idx, contributii)
+
+        for zi, suma in zip(zile.tolist(), sume):
+            galet = self._galeti.get(zi)
+            if galet is None:
+                galet = self._galeti[zi] = np.zeros_like(suma)
+            galet += semn * suma
+
+            # candidat fără sondaje în ziua asta → zero exact, fără reziduuri de rotunjire
+            gol = galet[_N] <= 0
+            galet[:, gol] = 0.0
+            if gol.all():
+                del self._galeti[zi]
+
+        self._numar_sondaje += int(semn) * len(sondaje)
+        return len(sondaje)
+
+    # ----------------------------
+    # API PUBLIC
+    # ----------------------------
+
+    def add_polls(self, sondaje: Sequence[Poll] | PollStore) -> int:
+        return self._aplica(sondaje, +1.0)
+
+    def add_poll(self, poll: Poll) -> int:
+        return self._aplica([poll], +1.0)
+
+    def remove_polls(self, sondaje: Sequence[Poll] | PollStore) -> int:
+        """Scoate sondaje adăugate anterior (aceleași valori ca la adăugare)."""
+        return self._aplica(sondaje, -1.0)
+
+    def remove_poll(self, poll: Poll) -> int:
+        return self._aplica([poll], -1.0)
+
+    def advance(self, azi: date) -> None:
+        """Mută ziua de referință; fereastra și decay-ul se aplică la citire."""
+        self.azi = azi
+
+    def sincronizeaza(self, path: Path | str) -> Dict[str, Any]:
+        """
+        Aduce starea la zi cu un fișier sursă (polls_buc.json): dacă fișierul
+        doar a crescut la final (ca la agent_update.update_polls_json), se
+        absorb numai înregistrările noi; altfel (sursă nouă, sondaje editate
+        sau șterse) sumele se refac din toate sursele.
+        """
+        path = Path(path)
+        continut = path.read_bytes()
+        cursor = self._surse.get(str(path))
+
+        h = None if cursor is None else _prefix_verificat(continut, cursor)
+        coada = None if h is None else _coada_adaugata(continut, cursor)
+        if coada is None:
+            self._surse[str(path)] = {}
+            self._reconstruieste()
+            return {"noi": self._numar_sondaje, "reconstruit": True}
+
+        noi = self.add_polls(PollStore.from_records(coada))
+        self._surse[str(path)] = _cursor(continut, cursor["inregistrari"] + len(coada), cursor["octeti"], h)
+        return {"noi": noi, "reconstruit": False}
+
+    def _reconstruieste(self) -> None:
+        self._galeti = {}
+        self._numar_sondaje = 0
+        for cale in self._surse:
+            continut = Path(cale).read_bytes()
+            inregistrari = json.loads(continut)
+            self.add_polls(PollStore.from_records(inregistrari))
+            self._surse[cale] = _cursor(continut, len(inregistrari))
+
+    def set_calibration(self, accuracy_db: Dict[str, Dict[str, Any]] | CalibrationTable) -> None:
+        """Calibrare nouă (accuracy_institutes.json rescris) → sumele se refac din surse."""
+        tabel = as_calibration_table(accuracy_db)
+        schimbat = tabel.fingerprint() != self._tabel.fingerprint()
+        self._tabel = tabel
+        if schimbat:
+            self._reconstruieste()
+
+    def __len__(self) -> int:
+        return self._numar_sondaje
+
+    def rezultate(self) -> Dict[str, Dict[str, Any]]:
+        """Același format ca calculeaza_medii_candidati."""
+        parametri = {
+            "max_age_days": self.max_age_days,
+            "lambda_time_decay": self.lambda_time_decay,
+            "azi": self.azi.isoformat()
+        }
+
+        ziua = self.azi.toordinal()
+        zile = [z for z in self._galeti if 0 <= ziua - z <= self.max_age_days]
+        n_cand = len(self.candidati)
+
+        if zile:
+            galeti = np.stack([self._galeti[z] for z in zile])
+            weight_time = np.exp(-self.lambda_time_decay * (ziua - np.asarray(zile)))
+            s_w = weight_time @ galeti[:, _W]
+            s_wx = weight_time @ galeti[:, _WX]
+            s_w2se2 = (weight_time ** 2) @ galeti[:, _W2SE2]
+            numar = np.rint(galeti[:, _N].sum(axis=0)).astype(np.int64)
+        else:
+            s_w = s_wx = s_w2se2 = np.zeros(n_cand)
+            numar = np.zeros(n_cand, dtype=np.int64)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            medii = s_wx / s_w
+            marje = 1.96 * np.sqrt(np.maximum(s_w2se2, 0.0)) / s_w
+
+        return {
+            candidat: _rezultat_candidat(
+                candidat, numar[j], medii[j], marje[j], parametri
+            )
+            for j, candidat in enumerate(self.candidati)
+        }
+
+    # ----------------------------
+    # SERIALIZARE
+    # ----------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "versiune": STATE_VERSION,
+            "candidati": self.candidati,
+            "max_age_days": self.max_age_days,
+            "lambda_time_decay": self.lambda_time_decay,
+            "azi": self.azi.isoformat(),
+            "calibrare": self._tabel.fingerprint(),
+            "numar_sondaje": self._numar_sondaje,
+            "galeti": _galeti_ca_dict(self._galeti, len(self.candidati)),
+            "surse": self._surse,
+        }
+
+    @classmethod
+    def from_dict(
+        cls,
+        state: Dict[str, Any],
+        accuracy_db: Dict[str, Dict[str, Any]] | CalibrationTable,
+    ) -> "IncrementalAggregator":
+        if state.get("versiune") != STATE_VERSION:
+            raise ValueError(f"❌ Versiune de stare necunoscută: {state.get('versiune')!r}")
+
+        agg = cls(
+            candidati=state["candidati"],
+            accuracy_db=accuracy_db,
+            max_age_days=state["max_age_days"],
+            lambda_time_decay=state["lambda_time_decay"],
+            azi=date.fromisoformat(state["azi"]),
+        )
+
+        if state.get("calibrare") != agg._tabel.fingerprint():
+            # calibrarea s-a schimbat între rulări → sumele salvate nu mai sunt valide;
+            # fără cursoare, următoarea sincronizare citește sursele de la zero
+            return agg
+
+        agg._galeti = _galeti_din_dict(state["galeti"], len(agg.candidati))
+        agg._surse = {cale: dict(c) for cale, c in state["surse"].items()}
+        agg._numar_sondaje = int(state["numar_sondaje"])
+        return agg
+
+    def save(self, path: Path | str) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.to_dict(), ensure_ascii=False), encoding="utf-8")
+        tmp.replace(path)
+
+    @classmethod
+    def load(
+        cls,
+        path: Path | str,
+        accuracy_db: Dict[str, Dict[str, Any]] | CalibrationTable,
+    ) -> "IncrementalAggregator":
+        state = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls.from_dict(state, accuracy_db)
+
+
+def _galeti_ca_dict(galeti: Dict[int, np.ndarray], n_cand: int) -> Dict[str, Any]:
+    # o singură listă plată (zile × 4 × candidați): se parsează mult mai repede decât un dict de liste
+    zile = sorted(galeti)
+    sume = np.stack([galeti[z] for z in zile]) if zile else np.zeros((0, 4, n_cand))
+    return {"zile": zile, "sume": sume.ravel().tolist()}
+
+
+def _galeti_din_dict(item: Dict[str, Any], n_cand: int) -> Dict[int, np.ndarray]:
+    sume = np.asarray(item["sume"], dtype=float).reshape(len(item["zile"]), 4, n_cand)
+    return {int(z): s.copy() for z, s in zip(item["zile"], sume)}
+
+
+# -----------------------------
+# CURSOR PE FIȘIERUL SURSĂ (array JSON la care se adaugă la final)
+# -----------------------------
+
+def _cursor(
+    continut: bytes,
+    inregistrari: int,
+    octeti_hash: int = 0,
+    h: "hashlib._Hash | None" = None,
+) -> Dict[str, Any]:
+    """
+    Prefixul absorbit = tot până la ultimul element, fără "]" de final.
+    `h` = sha256 deja calculat pe continut[:octeti_hash] (se continuă de acolo).
+    """
+    corp = continut.rstrip()
+    if not corp.endswith(b"]"):
+        raise ValueError("❌ Fișierul de sondaje nu este un array JSON.")
+    octeti = len(corp[:-1].rstrip())
+
+    if h is None:
+        h, octeti_hash = hashlib.sha256(), 0
+    h = h.copy()
+    h.update(continut[octeti_hash:octeti])
+    return {"octeti": octeti, "sha256": h.hexdigest(), "inregistrari": inregistrari}
+
+
+def _prefix_verificat(continut: bytes, cursor: Dict[str, Any]) -> "hashlib._Hash | None":
+    """sha256 al prefixului absorbit dacă acesta e neschimbat, altfel None."""
+    octeti = cursor.get("octeti")
+    if octeti is None or len(continut) < octeti:
+        return None
+    h = hashlib.sha256(continut[:octeti])
+    return h if h.hexdigest() == cursor.get("sha256") else None
+
+
+def _coada_adaugata(continut: bytes, cursor: Dict[str, Any]) -> List[Dict[str, Any]] | None:
+    """Înregistrările adăugate după cursorul (deja verificat), sau None dacă nu se pot citi."""
+    rest = continut[cursor["octeti"]:].strip()
+    if not rest.endswith(b"]"):
+        return None
+    rest = rest[:-1].strip()
+    if not rest:
+        return []
+    if cursor["inregistrari"]:
+        if not rest.startswith(b","):
+            return None
+        rest = rest[1:]
+
+    try:
+        coada = json.loads(b"[" + rest + b"]")
+    except ValueError:
+        return None
+    return coada if isinstance(coada, list) else None
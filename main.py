@@ -2,30 +2,63 @@ import json
 from datetime import date, datetime
 from pathlib import Path
 
-from poll_aggregator import Poll, calculeaza_media_candidat
+from calibration_table import load_calibration_table
+from incremental_aggregator import IncrementalAggregator
+from monte_carlo import simuleaza_clasament
+from poll_store import load_poll_store
 
+AGGREGATOR_STATE_PATH = Path("data/aggregator_state.json")
 
-def load_polls(path):
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
 
-    return [
-        Poll(
-            institut=item["institut"],
-            data=date.fromisoformat(item["data"]),
-            esantion=item["esantion"],
-            metoda=item["metoda"],
-            procentaje=item["procentaje"],
-            marja_eroare=item["marja_eroare"],
-        )
-        for item in data
-    ]
+def load_polls(path):
+    """Sondajele ca PollStore (columnar, partajat); iterarea dă rânduri compatibile cu Poll."""
+    return load_poll_store(path)
 
 
 def load_json(path):
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
+def actualizeaza_agregator(
+    polls_path,
+    candidati,
+    accuracy_db,
+    max_age_days,
+    lambda_time_decay,
+    azi,
+    state_path=AGGREGATOR_STATE_PATH,
+):
+    """
+    Reia agregatorul salvat la rularea anterioară și îl sincronizează cu
+    fișierul de sondaje: dacă fișierul doar a crescut, se citesc numai
+    sondajele adăugate; orice altă modificare reface sumele din fișier.
+    """
+
+    agg = None
+    if Path(state_path).exists():
+        try:
+            agg = IncrementalAggregator.load(state_path, accuracy_db)
+        except (ValueError, KeyError, json.JSONDecodeError) as e:
+            print(f"⚠️ Starea agregatorului nu poate fi citită ({e}), o refac.")
+
+    if agg is None or (
+        agg.candidati != list(candidati)
+        or agg.max_age_days != max_age_days
+        or agg.lambda_time_decay != lambda_time_decay
+    ):
+        agg = IncrementalAggregator(candidati, accuracy_db, max_age_days, lambda_time_decay, azi)
+
+    agg.advance(azi)
+    schimbari = agg.sincronizeaza(polls_path)
+    agg.save(state_path)
+
+    if schimbari["reconstruit"]:
+        print(f"🔄 Agregator incremental: refăcut din {polls_path} ({len(agg)} sondaje)")
+    else:
+        print(f"🔄 Agregator incremental: {schimbari['noi']} sondaje noi, {len(agg)} în total")
+    return agg
+
+
 def save_run_snapshot(estimate, results_real, history_dir="data/history"):
     """Salvează top 3 agregare și top 3 rezultate reale într-un fișier JSON unic."""
 
@@ -62,24 +95,24 @@ def save_run_snapshot(estimate, results_real, history_dir="data/history"):
 
 
 def run_demo():
-    sondaje = load_polls("data/polls_buc.json")
-    accuracy_db = load_json("data/accuracy_institutes.json")
+    accuracy_db = load_calibration_table("data/accuracy_institutes.json")
     results_real = load_json("data/results_buc.json")
 
     azi = date(2024, 6, 1)
 
     estimate = {}
 
-    for candidat in ["Nicușor Dan", "Gabriela Firea", "Cristian Popescu Piedone"]:
-        rezultat = calculeaza_media_candidat(
-            sondaje,
-            candidat=candidat,
-            accuracy_db=accuracy_db,
-            max_age_days=40,
-            lambda_time_decay=0.04,
-            azi=azi
-        )
+    agg = actualizeaza_agregator(
+        "data/polls_buc.json",
+        candidati=["Nicușor Dan", "Gabriela Firea", "Cristian Popescu Piedone"],
+        accuracy_db=accuracy_db,
+        max_age_days=40,
+        lambda_time_decay=0.04,
+        azi=azi
+    )
+    rezultate = agg.rezultate()
 
+    for candidat, rezultat in rezultate.items():
         estimate[candidat] = rezultat["media"]
 
         print("\n----------------------------")
@@ -102,6 +135,12 @@ def run_demo():
     for i, (name, val) in enumerate(top_real, 1):
         print(f"{i}. {name} — {val:.2f}%")
 
+    # 🎲 PROBABILITĂȚI DIN SIMULARE
+    simulare = simuleaza_clasament(rezultate, n_simulari=100_000, seed=42)
+    print("\n===== PROBABILITATE LOCUL 1 (MONTE CARLO) =====")
+    for name, info in sorted(simulare["candidati"].items(), key=lambda x: x[1]["p_locul_1"], reverse=True):
+        print(f"{name} — {info['p_locul_1'] * 100:.1f}%")
+
 
 if __name__ == "__main__":
     run_demo()
@@ -1,41 +1,80 @@
 from __future__ import annotations
+import hashlib
 import json
+import os
+import threading
 from pathlib import Path
-from datetime import date
-from typing import Dict, Any, List
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Dict, Any, List
 
 import numpy as np
-import pandas as pd
-from sklearn.pipeline import Pipeline
-from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
-from sklearn.ensemble import RandomForestRegressor
-import joblib
+
+from config import get_config
+from file_cache import FileCache, file_sha256
+from ml_flat import FlatForest, export_flat_model, get_flat_model
+from ml_features import (
+    CATEGORICAL_FEATURES,
+    FEATURE_COLS,
+    NUMERIC_FEATURES,
+    FeatureMatrix,
+    construieste_features,
+)
+from poll_store import PollStore, load_poll_store
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from sklearn.pipeline import Pipeline
+
+# pandas / scikit-learn / joblib se importă la prima folosire (în funcții):
+# API-ul servește predicțiile din artefact / modelul plat fără ele.
 
 # ============================
-# DETECTARE ROOT (ca la calibration_agent)
+# CĂI (config.get_config, calculat leneș)
+#    numele vechi (ROOT, MODEL_PATH, ...) rămân disponibile prin __getattr__,
+#    la fel ELECTION_DATE (citită din registrul de alegeri)
 # ============================
-THIS_FILE = Path(__file__).resolve()
-ROOT = THIS_FILE
 
-while ROOT != ROOT.parent:
-    if (ROOT / "data").exists():
-        break
-    ROOT = ROOT.parent
+_CAI = {
+    "ROOT": "root",
+    "DATA_DIR": "data_dir",
+    "MODEL_DIR": "model_dir",
+    "POLLS_PATH": "polls_path",
+    "RESULTS_PATH": "results_path",
+    "MODEL_PATH": "model_path",
+    "FLAT_MODEL_PATH": "flat_model_path",
+    "PREDICTIONS_PATH": "predictions_path",
+    "FEATURE_CACHE_DIR": "feature_cache_dir",
+    "TRAINING_STATE_PATH": "training_state_path",
+}
+
+
+def __getattr__(name: str):
+    if name in _CAI:
+        return getattr(get_config(), _CAI[name])
+    if name == "ELECTION_DATE":
+        return data_alegeri()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-if not (ROOT / "data").exists():
-    raise FileNotFoundError("❌ Nu am putut găsi folderul 'data' în niciun director părinte.")
+PREDICTIONS_ARTIFACT_VERSION = 1
+TRAINING_STATE_VERSION = 1
 
-DATA_DIR = ROOT / "data"
-MODEL_DIR = ROOT / "models"
-MODEL_DIR.mkdir(parents=True, exist_ok=True)
+# politica de training incremental
+ARBORI_REFIT = 300           # arbori la un refit complet
+ARBORI_PER_LOT = 20          # arbori adăugați per lot de sondaje noi
+MAX_ARBORI = 600             # peste → refit complet
+PRAG_RANDURI_NOI = 0.25      # sondaje noi / sondaje învățate peste care refacem tot
+MAX_RANDURI_REPLAY = 2_000   # rânduri vechi reluate la fiecare lot incremental
 
-POLLS_PATH = DATA_DIR / "polls_buc.json"
-RESULTS_PATH = DATA_DIR / "results_buc.json"
+# alegerea modelului: data alegerilor vine din data/elections.json
+ALEGERE = "ro-pmb-2024"
 
-MODEL_PATH = MODEL_DIR / "pmb_2024_rf.pkl"
 
-ELECTION_DATE = date(2024, 6, 9)  # data oficială PMB 2024
+def data_alegeri() -> date:
+    """Data oficială a alegerii ALEGERE, din registru (respectă MYPOLLS_ROOT)."""
+    from elections import get_election
+
+    return get_election(ALEGERE).data
 
 
 # ============================
@@ -48,11 +87,29 @@ def load_json(path: Path, default):
     return json.loads(path.read_text(encoding="utf-8"))
 
 
+def _read_json(path: Path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _load_model_mmap(path: Path):
+    import joblib
+
+    # array-urile numpy mari din pickle (ex. valorile frunzelor) rămân mapate din fișier
+    return joblib.load(path, mmap_mode="r")
+
+
+# rezultatele și modelul rămân în memorie până se schimbă fișierul (mtime/size)
+_RESULTS_CACHE = FileCache(_read_json)
+_MODEL_CACHE = FileCache(_load_model_mmap)
+
+
 def load_polls_and_results():
-    polls = load_json(POLLS_PATH, [])
-    results = load_json(RESULTS_PATH, {})
+    cfg = get_config()
+    # PollStore partajat cu agregatorul și calibrarea (încărcat o dată per versiune a fișierului)
+    polls = load_poll_store(cfg.polls_path)
+    results = _RESULTS_CACHE.get(cfg.results_path) if cfg.results_path.exists() else {}
 
-    if not polls:
+    if not len(polls):
         raise ValueError("❌ polls_buc.json este gol sau inexistent.")
     if not results:
         raise ValueError("❌ results_buc.json este gol sau inexistent.")
@@ -64,10 +121,14 @@ def load_polls_and_results():
 # DATASET ML
 # ============================
 
-def build_dataset(polls: List[Dict[str, Any]], final_results: Dict[str, float]) -> pd.DataFrame:
+def build_dataset(
+    polls: PollStore | List[Dict[str, Any]],
+    final_results: Dict[str, float],
+    cache_dir: Path | None = None,
+) -> pd.DataFrame:
     """
     Fiecare rând = (sondaj X, candidat Y)
-    Features:
+    Features (ml_features.FEATURE_COLS):
       - institut (categorical)
       - metoda   (categorical)
       - candidat (categorical)
@@ -80,38 +141,23 @@ def build_dataset(polls: List[Dict[str, Any]], final_results: Dict[str, float])
       - procent_final (din results_buc.json)
     """
 
-    rows = []
-
-    for poll in polls:
-        try:
-            poll_date = date.fromisoformat(poll["data"])
-        except Exception:
-            # ignorăm sondajele cu dată coruptă
-            continue
-
-        days_to_election = (ELECTION_DATE - poll_date).days
-        procentaje = poll.get("procentaje", {}) or {}
-
-        for candidat, rezult_final in final_results.items():
-            if candidat not in procentaje:
-                # sondajul nu îl are pe candidatul ăsta
-                continue
-
-            rows.append({
-                "institut": poll.get("institut", "necunoscut"),
-                "metoda": poll.get("metoda", "necunoscut"),
-                "candidat": candidat,
-                "zile_pana_la_alegeri": days_to_election,
-                "esantion": poll.get("esantion", 0),
-                "procent_brut": procentaje[candidat],
-                "marja_eroare": poll.get("marja_eroare", 3.0),
-                "procent_final": rezult_final,
-            })
-
-    if not rows:
+    if not isinstance(polls, PollStore):
+        # sondajele cu dată coruptă sunt ignorate la construirea store-ului
+        polls = PollStore.from_records(polls)
+
+    candidati = list(final_results)
+    fm = construieste_features(polls, candidati, data_alegeri(), cache_dir=cache_dir)
+
+    if not len(fm):
         raise ValueError("❌ Nu am putut construi niciun rând de training (rows=0).")
 
-    df = pd.DataFrame(rows)
+    return _dataset_din_features(fm, final_results)
+
+
+def _dataset_din_features(fm: FeatureMatrix, final_results: Dict[str, float]) -> pd.DataFrame:
+    df = fm.to_frame()
+    target = np.array([final_results[c] for c in fm.categorii["candidat"]], dtype=float)
+    df["procent_final"] = target[fm.candidat]
     return df
 
 
@@ -119,158 +165,432 @@ def build_dataset(polls: List[Dict[str, Any]], final_results: Dict[str, float])
 # TRAIN MODEL
 # ============================
 
-def train_model(verbose: bool = True) -> Pipeline:
-    polls, final_results = load_polls_and_results()
-    df = build_dataset(polls, final_results)
-
-    if verbose:
-        print("📊 Dataset ML construit cu", len(df), "rânduri.")
-
-    feature_cols = [
-        "institut",
-        "metoda",
-        "candidat",
-        "zile_pana_la_alegeri",
-        "esantion",
-        "procent_brut",
-        "marja_eroare",
-    ]
-    target_col = "procent_final"
-
-    X = df[feature_cols]
-    y = df[target_col]
-
-    categorical_features = ["institut", "metoda", "candidat"]
-    numeric_features = ["zile_pana_la_alegeri", "esantion", "procent_brut", "marja_eroare"]
+def _pipeline_nou(n_estimators: int = ARBORI_REFIT) -> Pipeline:
+    from sklearn.compose import ColumnTransformer
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
 
     preprocessor = ColumnTransformer(
         transformers=[
-            ("cat", OneHotEncoder(handle_unknown="ignore"), categorical_features),
-            ("num", StandardScaler(), numeric_features),
+            ("cat", OneHotEncoder(handle_unknown="ignore"), CATEGORICAL_FEATURES),
+            ("num", StandardScaler(), NUMERIC_FEATURES),
         ]
     )
 
     model = RandomForestRegressor(
-        n_estimators=300,
+        n_estimators=n_estimators,
         random_state=42,
         min_samples_leaf=2,
         n_jobs=-1
     )
 
-    pipe = Pipeline(
+    return Pipeline(
         steps=[
             ("preprocess", preprocessor),
             ("model", model),
         ]
     )
 
+
+def _amprente_sondaje(polls: PollStore, candidati: List[str]) -> List[str]:
+    """Amprentă per sondaj (institut, dată, eșantion, metodă, marjă, procente) → detectăm rânduri noi / modificate."""
+    procente, prezent = polls.coloane_candidati(candidati)
+    amprente = []
+    for i in range(len(polls)):
+        h = hashlib.sha1(
+            f"{polls.institute[polls.institut_id[i]]}|{polls.metode[polls.metoda_id[i]]}|{polls.zile[i]}".encode()
+        )
+        h.update(polls.esantion[i:i + 1].tobytes())
+        h.update(polls.marja_eroare[i:i + 1].tobytes())
+        h.update(procente[i].tobytes())
+        h.update(prezent[i].tobytes())
+        amprente.append(h.hexdigest())
+    return amprente
+
+
+def _hash_rezultate(final_results: Dict[str, float]) -> str:
+    return hashlib.sha256(json.dumps(final_results, ensure_ascii=False, sort_keys=True).encode()).hexdigest()
+
+
+def load_training_state() -> Dict[str, Any] | None:
+    cfg = get_config()
+    if not cfg.training_state_path.exists():
+        return None
+    try:
+        state = json.loads(cfg.training_state_path.read_text(encoding="utf-8"))
+    except ValueError:
+        return None
+    return state if state.get("versiune") == TRAINING_STATE_VERSION else None
+
+
+def _save_training_state(state: Dict[str, Any]) -> None:
+    cfg = get_config()
+    cfg.model_dir.mkdir(parents=True, exist_ok=True)
+    tmp = cfg.training_state_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, cfg.training_state_path)
+
+
+def decide_mod_training(
+    state: Dict[str, Any] | None,
+    pipe: Pipeline | None,
+    fm: FeatureMatrix,
+    amprente: List[str],
+    final_results: Dict[str, float],
+) -> tuple[str, str]:
+    """
+    Politica de refit: ("full" | "incremental" | "nimic", motiv).
+    Refit complet când modelul n-ar mai fi consistent cu datele:
+      - nu există model / stare de training
+      - rezultatele finale (target-ul) s-au schimbat
+      - sondaje vechi au dispărut sau au fost modificate
+      - apar institute / metode / candidați necunoscuți encoder-ului
+      - sondajele noi depășesc PRAG_RANDURI_NOI din cele deja învățate
+      - pădurea ar depăși MAX_ARBORI
+    """
+    if pipe is None or state is None:
+        return "full", "nu există model / stare de training"
+    if state["rezultate"] != _hash_rezultate(final_results):
+        return "full", "rezultatele finale s-au schimbat"
+
+    invatate = set(state["sondaje"])
+    if not invatate.issubset(amprente):
+        return "full", "sondaje învățate au fost șterse sau modificate"
+
+    noi = [a for a in amprente if a not in invatate]
+    if not noi:
+        return "nimic", "niciun sondaj nou"
+
+    encoder = pipe.named_steps["preprocess"].named_transformers_["cat"]
+    for k, nume in enumerate(CATEGORICAL_FEATURES):
+        cunoscute = set(encoder.categories_[k])
+        folosite = {fm.categorii[nume][c] for c in np.unique(fm.coduri[:, k])}
+        if not folosite.issubset(cunoscute):
+            return "full", f"categorii noi în '{nume}'"
+
+    if len(noi) > PRAG_RANDURI_NOI * max(len(invatate), 1):
+        return "full", f"{len(noi)} sondaje noi (> {PRAG_RANDURI_NOI:.0%} din {len(invatate)})"
+    if pipe.named_steps["model"].n_estimators + ARBORI_PER_LOT > MAX_ARBORI:
+        return "full", f"pădurea ar depăși {MAX_ARBORI} arbori"
+
+    return "incremental", f"{len(noi)} sondaje noi"
+
+
+def _fit_incremental(pipe: Pipeline, X: pd.DataFrame, y: np.ndarray, noi: np.ndarray, seed: int) -> None:
+    """
+    warm_start: ARBORI_PER_LOT arbori noi, antrenați pe rândurile noi + un eșantion
+    limitat din cele vechi (replay), cu preprocesorul deja potrivit ținut fix.
+    Costul nu crește cu arhiva: cel mult len(noi) + MAX_RANDURI_REPLAY rânduri.
+    """
+    vechi = np.flatnonzero(~noi)
+    if len(vechi) > MAX_RANDURI_REPLAY:
+        vechi = np.random.default_rng(seed).choice(vechi, MAX_RANDURI_REPLAY, replace=False)
+    randuri = np.sort(np.concatenate([np.flatnonzero(noi), vechi]))
+
+    Xt = pipe.named_steps["preprocess"].transform(X.iloc[randuri])
+    model = pipe.named_steps["model"]
+    model.set_params(warm_start=True, n_estimators=model.n_estimators + ARBORI_PER_LOT)
+    model.fit(Xt, y[randuri])
+    model.set_params(warm_start=False)
+
+
+def train_model(verbose: bool = True, incremental: bool = False) -> Pipeline:
+    """
+    incremental=False → refit complet (comportamentul clasic).
+    incremental=True  → decide_mod_training alege între refit complet,
+                        câțiva arbori noi (warm_start) sau nimic.
+    """
+    import joblib
+
+    cfg = get_config()
+    polls, final_results = load_polls_and_results()
+    candidati = list(final_results)
+    fm = construieste_features(polls, candidati, data_alegeri(), cache_dir=cfg.feature_cache_dir)
+    if not len(fm):
+        raise ValueError("❌ Nu am putut construi niciun rând de training (rows=0).")
+    df = _dataset_din_features(fm, final_results)
+
     if verbose:
-        print("🧠 Antrenez modelul RandomForest...")
+        print("📊 Dataset ML construit cu", len(df), "rânduri.")
 
-    pipe.fit(X, y)
+    target_col = "procent_final"
+
+    X = df[FEATURE_COLS]
+    y = df[target_col].to_numpy()
+
+    amprente = _amprente_sondaje(polls, candidati)
+    state = load_training_state()
 
-    joblib.dump(pipe, MODEL_PATH)
+    if incremental:
+        # copie proprie (nu instanța din _MODEL_CACHE, folosită de predicții)
+        pipe = joblib.load(cfg.model_path) if cfg.model_path.exists() else None
+        mod, motiv = decide_mod_training(state, pipe, fm, amprente, final_results)
+    else:
+        pipe, mod, motiv = None, "full", "refit cerut explicit"
+
+    if verbose:
+        print(f"🔎 Mod training: {mod} ({motiv})")
+
+    if mod == "nimic":
+        return pipe
+
+    if mod == "full":
+        pipe = _pipeline_nou()
+        if verbose:
+            print("🧠 Antrenez modelul RandomForest...")
+        pipe.fit(X, y)
+        loturi = 0
+    else:
+        invatate = set(state["sondaje"])
+        noi = np.array([amprente[i] not in invatate for i in fm.sondaj])
+        if verbose:
+            print(f"🌲 Adaug {ARBORI_PER_LOT} arbori pentru {int(noi.sum())} rânduri noi...")
+        _fit_incremental(pipe, X, y, noi, seed=len(amprente))
+        loturi = state["loturi_incrementale"] + 1
+
+    save_model(pipe)
+    if verbose:
+        print(f"✔ Model salvat în {cfg.model_path} (+ varianta plată {cfg.flat_model_path.name})")
+
+    _save_training_state({
+        "versiune": TRAINING_STATE_VERSION,
+        "actualizat_la": datetime.now().isoformat(timespec="seconds"),
+        "mod": mod,
+        "motiv": motiv,
+        "arbori": pipe.named_steps["model"].n_estimators,
+        "loturi_incrementale": loturi,
+        "rezultate": _hash_rezultate(final_results),
+        "sondaje": amprente,
+    })
+
+    artifact = write_prediction_artifact()
     if verbose:
-        print(f"✔ Model salvat în {MODEL_PATH}")
+        print(f"✔ Predicții precalculate ({artifact['fingerprint'][:12]}) în {cfg.predictions_path}")
 
     return pipe
 
 
+def save_model(pipe: Pipeline) -> None:
+    """
+    .pkl necomprimat (mapabil cu joblib.load(mmap_mode="r")) + varianta plată.
+    Ambele se scriu în fișiere temporare și se mută atomic: un worker care
+    are fișierul vechi mapat nu vede niciodată un fișier pe jumătate scris.
+    """
+    import joblib
+
+    cfg = get_config()
+    cfg.model_dir.mkdir(parents=True, exist_ok=True)
+    tmp = cfg.model_path.with_suffix(".tmp")
+    joblib.dump(pipe, tmp, compress=0)
+    os.replace(tmp, cfg.model_path)
+    export_flat_model(pipe, cfg.flat_model_path, sursa=file_sha256(cfg.model_path))
+
+
 def load_model() -> Pipeline:
-    if not MODEL_PATH.exists():
+    """
+    Pipeline-ul antrenat, ținut în memorie per proces. Se reîncarcă doar când
+    se schimbă fișierul .pkl; lock-ul din FileCache face ca request-urile
+    concurente să aștepte o singură încărcare.
+    """
+    cfg = get_config()
+    if not cfg.model_path.exists():
         raise FileNotFoundError(
-            f"❌ Modelul nu există ({MODEL_PATH}). Rulează mai întâi train_model()."
+            f"❌ Modelul nu există ({cfg.model_path}). Rulează mai întâi train_model()."
         )
-    return joblib.load(MODEL_PATH)
+    return _MODEL_CACHE.get(cfg.model_path)
+
+
+def load_flat_model() -> FlatForest | None:
+    """
+    Varianta plată (ml_flat) a modelului, dacă a fost exportată din .pkl-ul
+    curent; altfel None și predicția merge prin Pipeline-ul sklearn.
+    """
+    cfg = get_config()
+    if not cfg.flat_model_path.exists() or not cfg.model_path.exists():
+        return None
+    flat = get_flat_model(cfg.flat_model_path)
+    return flat if flat.sursa == file_sha256(cfg.model_path) else None
+
+
+def export_flat_model_curent() -> FlatForest:
+    """Exportă (din nou) .pkl-ul curent în format plat."""
+    cfg = get_config()
+    export_flat_model(load_model(), cfg.flat_model_path, sursa=file_sha256(cfg.model_path))
+    return get_flat_model(cfg.flat_model_path)
 
 
 # ============================
 # PREDICȚIE AGREGATĂ
 # ============================
 
-def predict_aggregated(verbose: bool = True) -> Dict[str, float]:
+def medii_ponderate_pe_grupuri(
+    coduri: np.ndarray,
+    valori: np.ndarray,
+    greutati: np.ndarray,
+    n_grupuri: int,
+) -> Dict[str, np.ndarray]:
     """
-    Generează predicții finale pentru fiecare candidat:
-      - ia toate sondajele din polls_buc.json
-      - pentru fiecare (sondaj, candidat) generează o predicție a procentului final
-      - agregă predicțiile pe candidat cu o medie ponderată (greutate = esantion)
+    Medie ponderată, deviație standard ponderată și effective sample size
+    (Kish: (Σw)² / Σw²) pentru fiecare grup, cu np.bincount — O(rânduri) în C.
+    Grupurile fără rânduri primesc NaN.
+    """
+    coduri = np.asarray(coduri, dtype=np.intp)
+    valori = np.asarray(valori, dtype=float)
+    greutati = np.asarray(greutati, dtype=float)
+
+    numar = np.bincount(coduri, minlength=n_grupuri)
+    s_w = np.bincount(coduri, weights=greutati, minlength=n_grupuri)
+    s_wx = np.bincount(coduri, weights=valori * greutati, minlength=n_grupuri)
+    s_w2 = np.bincount(coduri, weights=greutati * greutati, minlength=n_grupuri)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        media = s_wx / s_w
+        # a doua trecere pe abateri: stabilă numeric față de Σw·x² − (Σw·x)²/Σw
+        abateri = valori - media[coduri]
+        s_wd2 = np.bincount(coduri, weights=greutati * abateri * abateri, minlength=n_grupuri)
+        std = np.sqrt(s_wd2 / s_w)
+        ess = s_w * s_w / s_w2
+
+    gol = numar == 0
+    media[gol] = std[gol] = ess[gol] = np.nan
+    return {"media": media, "std": std, "ess": ess, "numar": numar}
+
+
+def predict_features(fm: FeatureMatrix) -> np.ndarray:
+    """Predicția pentru fiecare rând din FeatureMatrix, într-un singur apel."""
+    flat = load_flat_model()
+    if flat is not None:
+        # aceleași valori ca Pipeline.predict, fără sklearn / pandas / pickle
+        return flat.predict(fm)
+    return load_model().predict(fm.to_frame())
+
+
+def predict_aggregated_detaliat(verbose: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Ca predict_aggregated, dar pentru fiecare candidat întoarce
+    {"media", "std", "ess", "numar_randuri"} (greutate = esantion, minim 1).
     """
-
     polls, final_results = load_polls_and_results()
-    model = load_model()
 
     # extragem lista de candidați din results_buc.json
     candidati = list(final_results.keys())
 
-    rows_pred = []
-    for poll in polls:
-        try:
-            poll_date = date.fromisoformat(poll["data"])
-        except Exception:
-            continue
-
-        days_to_election = (ELECTION_DATE - poll_date).days
-        procentaje = poll.get("procentaje", {}) or {}
-
-        for candidat in candidati:
-            if candidat not in procentaje:
-                continue
-
-            rows_pred.append({
-                "institut": poll.get("institut", "necunoscut"),
-                "metoda": poll.get("metoda", "necunoscut"),
-                "candidat": candidat,
-                "zile_pana_la_alegeri": days_to_election,
-                "esantion": poll.get("esantion", 0),
-                "procent_brut": procentaje[candidat],
-                "marja_eroare": poll.get("marja_eroare", 3.0),
-            })
-
-    if not rows_pred:
+    # fără cache_dir: pe calea de predicție (API) nu scriem / ștergem .npz pe disc;
+    # matricea se construiește în memorie, cache-ul rămâne doar pentru training / CV
+    fm = construieste_features(polls, candidati, data_alegeri())
+
+    if not len(fm):
         raise ValueError("❌ Nu am găsit sondaje valide pentru predicție.")
 
-    df_pred = pd.DataFrame(rows_pred)
-
-    feature_cols = [
-        "institut",
-        "metoda",
-        "candidat",
-        "zile_pana_la_alegeri",
-        "esantion",
-        "procent_brut",
-        "marja_eroare",
-    ]
-    X_pred = df_pred[feature_cols]
-
-    y_pred = model.predict(X_pred)
-    df_pred["pred_procent_final"] = y_pred
-
-    # agregăm pe candidat cu medie ponderată (greutate = esantion)
-    rezultate: Dict[str, Dict[str, float]] = {}
-    for _, row in df_pred.iterrows():
-        cand = row["candidat"]
-        w = max(float(row["esantion"]), 1.0)
-        val = float(row["pred_procent_final"])
-
-        if cand not in rezultate:
-            rezultate[cand] = {"num": 0.0, "den": 0.0}
-
-        rezultate[cand]["num"] += val * w
-        rezultate[cand]["den"] += w
-
-    aggregated: Dict[str, float] = {}
-    for cand, agg in rezultate.items():
-        if agg["den"] == 0:
-            aggregated[cand] = None
-        else:
-            aggregated[cand] = agg["num"] / agg["den"]
+    y_pred = predict_features(fm)
+
+    coduri = fm.candidat
+    # greutatea = eșantionul original (float64), nu coloana float32 din features
+    greutati = np.maximum(polls.esantion[fm.sondaj], 1.0)
+    stat = medii_ponderate_pe_grupuri(coduri, y_pred, greutati, len(candidati))
+
+    # ordinea candidaților = ordinea primei apariții în rânduri (ca înainte)
+    _, prima_aparitie = np.unique(coduri, return_index=True)
+    ordine = coduri[np.sort(prima_aparitie)]
+
+    detaliat: Dict[str, Dict[str, Any]] = {}
+    for j in ordine:
+        detaliat[candidati[j]] = {
+            "media": float(stat["media"][j]),
+            "std": float(stat["std"][j]),
+            "ess": float(stat["ess"][j]),
+            "numar_randuri": int(stat["numar"][j]),
+        }
 
     if verbose:
         print("\n===== PREDICȚII ML AGREGATE =====")
-        for cand, val in sorted(aggregated.items(), key=lambda x: x[1] or 0, reverse=True):
-            if val is None:
-                print(f"{cand}: N/A")
-            else:
-                print(f"{cand}: {val:.2f}%")
+        for cand, info in sorted(detaliat.items(), key=lambda x: x[1]["media"], reverse=True):
+            print(f"{cand}: {info['media']:.2f}% (std {info['std']:.2f}, ESS {info['ess']:.1f})")
+
+    return detaliat
+
 
-    return aggregated
+def predict_aggregated(verbose: bool = True) -> Dict[str, float]:
+    """
+    Generează predicții finale pentru fiecare candidat:
+      - ia toate sondajele din polls_buc.json
+      - pentru fiecare (sondaj, candidat) generează o predicție a procentului final
+      - agregă predicțiile pe candidat cu o medie ponderată (greutate = esantion)
+    """
+
+    detaliat = predict_aggregated_detaliat(verbose=verbose)
+    return {cand: info["media"] for cand, info in detaliat.items()}
+
+
+# ============================
+# ARTEFACT DE PREDICȚII (cheie = amprenta intrărilor)
+# ============================
+
+_ARTIFACT_LOCK = threading.Lock()
+
+
+def input_fingerprint() -> str:
+    """Hash al conținutului: sondaje + rezultate + model + registru (+ versiunea formatului)."""
+    cfg = get_config()
+    h = hashlib.sha256(f"v{PREDICTIONS_ARTIFACT_VERSION}".encode())
+    # registrul dă data alegerilor (feature-ul zile_pana_la_alegeri)
+    for path in (cfg.polls_path, cfg.results_path, cfg.model_path, cfg.elections_path):
+        h.update(path.name.encode("utf-8"))
+        h.update(file_sha256(path).encode() if path.exists() else b"-")
+    return h.hexdigest()
+
+
+def write_prediction_artifact(predictions: Dict[str, float] | None = None) -> Dict[str, Any]:
+    """Calculează (dacă nu sunt date) și salvează predicțiile agregate împreună cu amprenta intrărilor."""
+    cfg = get_config()
+    fingerprint = input_fingerprint()
+    if predictions is None:
+        predictions = predict_aggregated(verbose=False)
+
+    artifact = {
+        "versiune": PREDICTIONS_ARTIFACT_VERSION,
+        "fingerprint": fingerprint,
+        "creat_la": datetime.now().isoformat(timespec="seconds"),
+        "predictions": predictions,
+    }
+
+    cfg.model_dir.mkdir(parents=True, exist_ok=True)
+    tmp = cfg.predictions_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(artifact, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, cfg.predictions_path)
+    return artifact
+
+
+def _read_artifact(path: Path) -> Dict[str, Any] | None:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+_ARTIFACT_CACHE = FileCache(_read_artifact)
+
+
+def get_predictions() -> Dict[str, Any]:
+    """
+    Predicțiile servite de API: artefactul precalculat dacă amprenta lui
+    coincide cu intrările curente, altfel recalculare + rescriere artefact.
+    Întoarce artefactul plus "cache": "hit" / "miss".
+    """
+    cfg = get_config()
+    fingerprint = input_fingerprint()
+
+    artifact = _ARTIFACT_CACHE.get(cfg.predictions_path) if cfg.predictions_path.exists() else None
+    if artifact and artifact.get("fingerprint") == fingerprint:
+        return {**artifact, "cache": "hit"}
+
+    with _ARTIFACT_LOCK:
+        # alt thread poate să fi rescris deja artefactul cât am așteptat
+        fingerprint = input_fingerprint()
+        artifact = _ARTIFACT_CACHE.get(cfg.predictions_path) if cfg.predictions_path.exists() else None
+        if artifact and artifact.get("fingerprint") == fingerprint:
+            return {**artifact, "cache": "hit"}
+
+        artifact = write_prediction_artifact()
+        return {**artifact, "cache": "miss"}
@@ -0,0 +1,320 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from joblib import Parallel, delayed
+
+from calibration_table import CalibrationTable
+from elections import get_election
+from ml_core import (
+    _dataset_din_features,
+    _pipeline_nou,
+    load_polls_and_results,
+    medii_ponderate_pe_grupuri,
+)
+from ml_features import FEATURE_COLS, construieste_features
+from poll_aggregator import calculeaza_medii_candidati
+from poll_store import PollStore
+from testare_calibrare.calibration_agent import compute_institute_bonuses, merge_accuracy
+
+# alegerea evaluată: fereastra și decay-ul implicite vin din registru
+ALEGERE = "ro-pmb-2024"
+
+# ATENȚIE la interpretare: cu o singură alegere, target-ul (rezultatul final)
+# e constant per candidat, deci ML-ul îl învață în mare parte prin feature-ul
+# "candidat" chiar și fără sondajele din fold-ul de test. Comparația devine
+# relevantă abia cu mai multe alegeri în date. Tabelul de calibrare al
+# agregatorului clasic se potrivește în fiecare fold doar pe sondajele de
+# antrenare (accuracy_institutes.json e calculat pe toate, inclusiv pe test).
+
+
+# -----------------------------
+# FOLD-URI
+#    - leave-one-institute-out: fiecare institut e pe rând setul de test
+#    - split temporal: antrenare pe sondajele de până la o dată, test pe cele de după
+# -----------------------------
+
+def folduri_institut(polls: PollStore) -> List[Tuple[str, np.ndarray]]:
+    return [
+        (f"institut={nume}", polls.institut_id == i)
+        for i, nume in enumerate(polls.institute)
+        if (polls.institut_id == i).any()
+    ]
+
+
+def folduri_temporale(polls: PollStore, n_folduri: int) -> List[Tuple[str, np.ndarray]]:
+    """Fereastră care crește: la fold-ul k, test = sondajele de după a k-a cuantilă a datelor."""
+    zile = np.unique(polls.zile)
+    if len(zile) < 2:
+        return []
+
+    taieturi = np.unique(zile[np.linspace(0, len(zile) - 1, n_folduri + 2)[1:-1].astype(int)])
+    return [
+        (f"dupa={date.fromordinal(int(z)).isoformat()}", polls.zile > z)
+        for z in taieturi
+        if (polls.zile > z).any() and (polls.zile <= z).any()
+    ]
+
+
+# -----------------------------
+# UN FOLD (rulează într-un worker joblib)
+# -----------------------------
+
+def tabel_fold(
+    antrenare: PollStore,
+    final_results: Dict[str, float],
+    data_alegeri: date,
+    max_age_days: int,
+) -> CalibrationTable:
+    """
+    O iterație din calibration_agent, pornind de la zero, doar pe sondajele de
+    antrenare: institutele din test primesc coeficienți neutri, ca în ML.
+    """
+    try:
+        bonuses = compute_institute_bonuses(
+            final_results, data_alegeri, max_age_days=max_age_days, store=antrenare, previous={}
+        )
+    except ValueError:
+        # niciun sondaj de antrenare în fereastră → fără corecții
+        bonuses = {}
+    return CalibrationTable.from_accuracy_db(merge_accuracy(bonuses))
+
+
+def _erori_clasic(
+    test: PollStore,
+    candidati: List[str],
+    tabel: CalibrationTable,
+    reale: np.ndarray,
+    lambda_time_decay: float,
+) -> np.ndarray:
+    """Eroarea absolută per candidat a agregatorului clasic pe sondajele de test."""
+    azi = date.fromordinal(int(test.zile.max()))
+    rezultate = calculeaza_medii_candidati(
+        test,
+        candidati,
+        tabel,
+        max_age_days=int(test.zile.max() - test.zile.min()),
+        lambda_time_decay=lambda_time_decay,
+        azi=azi,
+    )
+    medii = np.array([
+        np.nan if rezultate[c]["media"] is None else rezultate[c]["media"] for c in candidati
+    ])
+    return np.abs(medii - reale)
+
+
+def evalueaza_fold(
+    nume: str,
+    polls: PollStore,
+    masca_test: np.ndarray,
+    final_results: Dict[str, float],
+    data_alegeri: date,
+    n_estimators: int,
+    lambda_time_decay: float,
+    max_age_days: int,
+) -> Dict[str, Any]:
+    candidati = list(final_results)
+    reale = np.array([final_results[c] for c in candidati], dtype=float)
+    antrenare, test = polls.take(~masca_test), polls.take(masca_test)
+
+    fm_train = construieste_features(antrenare, candidati, data_alegeri)
+    fm_test = construieste_features(test, candidati, data_alegeri)
+    df_train = _dataset_din_features(fm_train, final_results)
+
+    # un singur thread per fold: paralelismul e între fold-uri
+    pipe = _pipeline_nou(n_estimators=n_estimators)
+    pipe.set_params(model__n_jobs=1)
+
+    t0 = time.perf_counter()
+    pipe.fit(df_train[FEATURE_COLS], df_train["procent_final"].to_numpy())
+    t_fit = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    y_pred = pipe.predict(fm_test.to_frame())
+    t_predict = time.perf_counter() - t0
+
+    greutati = np.maximum(test.esantion[fm_test.sondaj], 1.0)
+    institut_rand = test.institut_id[fm_test.sondaj]
+
+    t0 = time.perf_counter()
+    tabel = tabel_fold(antrenare, final_results, data_alegeri, max_age_days)
+    pe_institut: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for i in np.unique(institut_rand):
+        rand = institut_rand == i
+        ml = medii_ponderate_pe_grupuri(fm_test.candidat[rand], y_pred[rand], greutati[rand], len(candidati))
+        clasic = _erori_clasic(test.take(test.institut_id == i), candidati, tabel, reale, lambda_time_decay)
+        pe_institut[test.institute[i]] = {
+            c: {"ml": float(abs(ml["media"][j] - reale[j])), "clasic": float(clasic[j])}
+            for j, c in enumerate(candidati)
+            if not np.isnan(ml["media"][j])
+        }
+
+    ml = medii_ponderate_pe_grupuri(fm_test.candidat, y_pred, greutati, len(candidati))
+    clasic = _erori_clasic(test, candidati, tabel, reale, lambda_time_decay)
+    t_clasic = time.perf_counter() - t0
+
+    return {
+        "fold": nume,
+        "sondaje_antrenare": len(antrenare),
+        "sondaje_test": len(test),
+        "randuri_test": len(fm_test),
+        "pe_candidat": {
+            c: {"ml": float(abs(ml["media"][j] - reale[j])), "clasic": float(clasic[j])}
+            for j, c in enumerate(candidati)
+            if not np.isnan(ml["media"][j])
+        },
+        "pe_institut": pe_institut,
+        "secunde": {"fit": t_fit, "predict": t_predict, "clasic": t_clasic},
+    }
+
+
+# -----------------------------
+# RAPORT
+# -----------------------------
+
+def _medie(valori: List[float]) -> float | None:
+    valori = [v for v in valori if not np.isnan(v)]
+    return float(np.mean(valori)) if valori else None
+
+
+def rezumat(folduri: List[Dict[str, Any]]) -> Dict[str, Any]:
+    pe_candidat: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: {"ml": [], "clasic": []})
+    pe_institut: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: {"ml": [], "clasic": []})
+
+    for f in folduri:
+        for c, e in f["pe_candidat"].items():
+            pe_candidat[c]["ml"].append(e["ml"])
+            pe_candidat[c]["clasic"].append(e["clasic"])
+        for inst, erori in f["pe_institut"].items():
+            for e in erori.values():
+                pe_institut[inst]["ml"].append(e["ml"])
+                pe_institut[inst]["clasic"].append(e["clasic"])
+
+    def _mae(d):
+        return {k: {"ml": _medie(v["ml"]), "clasic": _medie(v["clasic"]), "n": len(v["ml"])} for k, v in d.items()}
+
+    return {
+        "mae_pe_candidat": _mae(pe_candidat),
+        "mae_pe_institut": _mae(pe_institut),
+        "mae_total": {
+            "ml": _medie([e for v in pe_candidat.values() for e in v["ml"]]),
+            "clasic": _medie([e for v in pe_candidat.values() for e in v["clasic"]]),
+        },
+        "secunde_medii": {
+            k: float(np.mean([f["secunde"][k] for f in folduri])) for k in ("fit", "predict", "clasic")
+        },
+    }
+
+
+def ruleaza_cv(
+    schema: str = "toate",
+    folduri_timp: int = 3,
+    workers: int = 1,
+    n_estimators: int = 300,
+    lambda_time_decay: float | None = None,
+    max_age_days: int | None = None,
+) -> Dict[str, Any]:
+    # None → valorile intrării ALEGERE din data/elections.json
+    alegere = get_election(ALEGERE)
+    if lambda_time_decay is None:
+        lambda_time_decay = alegere.lambda_time_decay
+    if max_age_days is None:
+        max_age_days = alegere.max_age_days
+
+    polls, final_results = load_polls_and_results()
+
+    folduri: List[Tuple[str, np.ndarray]] = []
+    if schema in ("institut", "toate"):
+        folduri += folduri_institut(polls)
+    if schema in ("timp", "toate"):
+        folduri += folduri_temporale(polls, folduri_timp)
+    if not folduri:
+        raise ValueError("❌ Nu am putut construi niciun fold (prea puține sondaje).")
+
+    t0 = time.perf_counter()
+    rezultate = Parallel(n_jobs=workers)(
+        delayed(evalueaza_fold)(
+            nume, polls, masca, final_results, alegere.data, n_estimators, lambda_time_decay, max_age_days
+        )
+        for nume, masca in folduri
+    )
+    durata = time.perf_counter() - t0
+
+    return {
+        "folduri": rezultate,
+        "rezumat": rezumat(rezultate),
+        "secunde_total": durata,
+    }
+
+
+def _fmt(x: float | None) -> str:
+    return "   N/A" if x is None or np.isnan(x) else f"{x:6.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-validation ML vs agregatorul clasic")
+    parser.add_argument("--schema", choices=["institut", "timp", "toate"], default="toate")
+    parser.add_argument("--folduri-timp", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--arbori", type=int, default=300)
+    parser.add_argument("--lambda-time-decay", type=float, help="implicit: valoarea din data/elections.json")
+    parser.add_argument("--max-age-days", type=int, help="fereastra de calibrare; implicit din data/elections.json")
+    parser.add_argument("--output", help="salvează raportul complet ca JSON")
+    args = parser.parse_args()
+
+    print("\n==============================")
+    print("      CROSS-VALIDATION ML")
+    print("==============================\n")
+
+    raport = ruleaza_cv(
+        schema=args.schema,
+        folduri_timp=args.folduri_timp,
+        workers=args.workers,
+        n_estimators=args.arbori,
+        lambda_time_decay=args.lambda_time_decay,
+        max_age_days=args.max_age_days,
+    )
+
+    print(f"{'fold':<60} {'train':>5} {'test':>5} {'fit (s)':>8} {'pred (ms)':>9} {'clasic (ms)':>11}")
+    for f in raport["folduri"]:
+        s = f["secunde"]
+        print(
+            f"{f['fold'][:60]:<60} {f['sondaje_antrenare']:>5} {f['sondaje_test']:>5} "
+            f"{s['fit']:>8.3f} {s['predict'] * 1000:>9.1f} {s['clasic'] * 1000:>11.1f}"
+        )
+
+    rez = raport["rezumat"]
+    print("\n===== MAE PE CANDIDAT (puncte procentuale) =====")
+    print(f"{'candidat':<40} {'ML':>6} {'clasic':>6}")
+    for c, e in rez["mae_pe_candidat"].items():
+        print(f"{c:<40} {_fmt(e['ml'])} {_fmt(e['clasic'])}")
+
+    print("\n===== MAE PE INSTITUT =====")
+    print(f"{'institut':<50} {'ML':>6} {'clasic':>6}")
+    for inst, e in sorted(rez["mae_pe_institut"].items()):
+        print(f"{inst[:50]:<50} {_fmt(e['ml'])} {_fmt(e['clasic'])}")
+
+    total = rez["mae_total"]
+    t = rez["secunde_medii"]
+    print(f"\n✔ MAE total: ML {_fmt(total['ml']).strip()}p vs clasic {_fmt(total['clasic']).strip()}p")
+    print(
+        f"⏱  Per fold: fit {t['fit']:.3f}s, predict {t['predict'] * 1000:.1f} ms, "
+        f"clasic {t['clasic'] * 1000:.1f} ms (total {raport['secunde_total']:.2f}s)"
+    )
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(raport, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n📁 Raportul a fost salvat în {output}")
+
+
+if __name__ == "__main__":
+    main()
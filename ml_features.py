@@ -0,0 +1,186 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Sequence
+
+import numpy as np
+
+from poll_store import PollStore
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# -----------------------------
+# FEATURE-URI ML: un rând = (sondaj, candidat)
+#    - construite direct din coloanele PollStore, fără dict-uri per rând
+#    - categoricele ca coduri int32 + vocabular, numericele float32
+#    - același builder la training și la predicție
+# -----------------------------
+
+CATEGORICAL_FEATURES = ["institut", "metoda", "candidat"]
+NUMERIC_FEATURES = ["zile_pana_la_alegeri", "esantion", "procent_brut", "marja_eroare"]
+FEATURE_COLS = CATEGORICAL_FEATURES + NUMERIC_FEATURES
+
+FEATURES_VERSION = 1
+MAX_FEATURES_CACHE = 4  # câte features_<hash>.npz rămân în cache_dir (cele mai recent folosite)
+
+
+@dataclass
+class FeatureMatrix:
+    categorii: Dict[str, List[str]]  # vocabularul fiecărei coloane categoriale
+    coduri: np.ndarray               # int32 (rânduri × len(CATEGORICAL_FEATURES))
+    numerice: np.ndarray             # float32 (rânduri × len(NUMERIC_FEATURES))
+    sondaj: np.ndarray               # int32, indexul sondajului în store
+
+    @property
+    def candidat(self) -> np.ndarray:
+        """Codul candidatului = poziția lui în lista de candidați cerută."""
+        return self.coduri[:, CATEGORICAL_FEATURES.index("candidat")]
+
+    def __len__(self) -> int:
+        return len(self.sondaj)
+
+    def nbytes(self) -> int:
+        return self.coduri.nbytes + self.numerice.nbytes + self.sondaj.nbytes
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame pentru Pipeline: pd.Categorical din coduri + coloane float32 (fără copii de string-uri)."""
+        import pandas as pd
+
+        coloane = {
+            nume: pd.Categorical.from_codes(self.coduri[:, k], categories=self.categorii[nume])
+            for k, nume in enumerate(CATEGORICAL_FEATURES)
+        }
+        for k, nume in enumerate(NUMERIC_FEATURES):
+            coloane[nume] = self.numerice[:, k]
+        return pd.DataFrame(coloane, copy=False)
+
+    # ----------------------------
+    # CACHE PE DISC (.npz necomprimat)
+    # ----------------------------
+
+    def save(self, path: Path | str) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                categorii=np.array(json.dumps(self.categorii, ensure_ascii=False)),
+                coduri=self.coduri,
+                numerice=self.numerice,
+                sondaj=self.sondaj,
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path | str) -> "FeatureMatrix":
+        with np.load(path, allow_pickle=False) as npz:
+            return cls(
+                categorii=json.loads(str(npz["categorii"])),
+                coduri=npz["coduri"],
+                numerice=npz["numerice"],
+                sondaj=npz["sondaj"],
+            )
+
+
+def features_key(polls: PollStore, candidati: Sequence[str], data_alegeri: date) -> str:
+    """Hash al intrărilor builder-ului: coloanele store-ului + candidați + data alegerilor."""
+    h = hashlib.sha256(f"v{FEATURES_VERSION}|{data_alegeri.isoformat()}".encode())
+    h.update(json.dumps([polls.institute, polls.metode, list(candidati)], ensure_ascii=False).encode())
+    procente, prezent = polls.coloane_candidati(candidati)
+    for a in (polls.institut_id, polls.metoda_id, polls.zile, polls.esantion,
+              polls.marja_eroare, procente, prezent):
+        h.update(np.ascontiguousarray(a).tobytes())
+    return h.hexdigest()
+
+
+def _construieste(polls: PollStore, candidati: List[str], data_alegeri: date) -> FeatureMatrix:
+    procente, prezent = polls.coloane_candidati(candidati)
+    rand, col = np.nonzero(prezent)
+
+    numerice = np.empty((len(rand), len(NUMERIC_FEATURES)), dtype=np.float32)
+    numerice[:, 0] = data_alegeri.toordinal() - polls.zile[rand].astype(np.int64)
+    numerice[:, 1] = polls.esantion[rand]
+    numerice[:, 2] = procente[rand, col]
+    numerice[:, 3] = polls.marja_eroare[rand]
+
+    coduri = np.column_stack([
+        polls.institut_id[rand],
+        polls.metoda_id[rand],
+        col,
+    ]).astype(np.int32).reshape(len(rand), len(CATEGORICAL_FEATURES))
+
+    return FeatureMatrix(
+        categorii={
+            "institut": list(polls.institute),
+            "metoda": list(polls.metode),
+            "candidat": list(candidati),
+        },
+        coduri=coduri,
+        numerice=numerice,
+        sondaj=rand.astype(np.int32),
+    )
+
+
+def construieste_features(
+    polls: PollStore,
+    candidati: Sequence[str],
+    data_alegeri: date,
+    cache_dir: Path | str | None = None,
+) -> FeatureMatrix:
+    """
+    Câte un rând pentru fiecare (sondaj, candidat) prezent, în ordinea
+    sondajelor și apoi a candidaților.
+
+    Cu cache_dir, matricea se salvează ca features_<hash>.npz și se
+    refolosește cât timp intrările (features_key) nu se schimbă; în
+    cache_dir rămân doar ultimele MAX_FEATURES_CACHE fișiere folosite.
+    """
+    candidati = list(candidati)
+    if cache_dir is None:
+        return _construieste(polls, candidati, data_alegeri)
+
+    path = Path(cache_dir) / f"features_{features_key(polls, candidati, data_alegeri)[:24]}.npz"
+    if path.exists():
+        try:
+            fm = FeatureMatrix.load(path)
+        except (OSError, ValueError, KeyError):
+            pass  # fișier corupt / format vechi → îl reconstruim
+        else:
+            _marcheaza_folosit(path)
+            return fm
+
+    fm = _construieste(polls, candidati, data_alegeri)
+    fm.save(path)
+    _curata_cache(path.parent, pastrate=MAX_FEATURES_CACHE)
+    return fm
+
+
+def _marcheaza_folosit(path: Path) -> None:
+    # mtime = ultima folosire → _curata_cache șterge întâi ce nu mai e citit
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _curata_cache(cache_dir: Path, pastrate: int) -> None:
+    """Șterge fișierele features_*.npz mai vechi decât ultimele `pastrate`."""
+    fisiere = []
+    for f in cache_dir.glob("features_*.npz"):
+        try:
+            fisiere.append((f.stat().st_mtime_ns, f))
+        except OSError:
+            continue  # șters între timp de alt proces
+    fisiere.sort(reverse=True)
+    for _, f in fisiere[pastrate:]:
+        try:
+            f.unlink()
+        except OSError:
+            pass
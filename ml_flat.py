@@ -0,0 +1,351 @@
+from __future__ import annotations
+import io
+import json
+import os
+import struct
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from file_cache import FileCache
+from ml_features import CATEGORICAL_FEATURES, NUMERIC_FEATURES, FeatureMatrix
+
+
+# -----------------------------
+# MODEL "PLAT": RandomForest + ColumnTransformer ca array-uri NumPy
+#    - toți arborii concatenați: feature, threshold, copii (stânga, dreapta), valori
+#    - OneHotEncoder(handle_unknown="ignore") → offset de coloană per categorie
+#    - StandardScaler → mean_ / scale_
+#    - inferență fără sklearn / pandas, identică cu Pipeline.predict
+#    - .npz necomprimat → array-urile se mapează direct din fișier (mmap),
+#      deci N workeri uvicorn împart aceeași copie din page cache
+# -----------------------------
+
+FLAT_VERSION = 1
+
+
+def _threshold_float32(threshold: np.ndarray) -> np.ndarray:
+    """
+    Arborii compară x (float32) <= t (float64). Pentru x float32 asta e
+    echivalent cu x <= cel mai mare float32 ≤ t → rotunjim t în jos.
+    """
+    t32 = threshold.astype(np.float32)
+    prea_mare = t32.astype(np.float64) > threshold
+    t32[prea_mare] = np.nextafter(t32[prea_mare], np.float32(-np.inf))
+    return t32
+
+
+def _arbore(tree, taie: bool) -> Dict[str, np.ndarray]:
+    """
+    Array-urile unui arbore sklearn (copii locali, -1 = frunză).
+    Cu taie=True, un nod ale cărui două frunze au aceeași valoare devine el
+    însuși frunză (repetat de jos în sus) și nodurile rămase fără părinte se
+    elimină — predicțiile nu se schimbă deloc.
+    """
+    stanga = tree.children_left.copy()
+    dreapta = tree.children_right.copy()
+    valoare = tree.value[:, 0, 0].astype(np.float64)
+    mgl = getattr(tree, "missing_go_to_left", None)
+    nan_stanga = np.zeros(tree.node_count, dtype=bool) if mgl is None else np.asarray(mgl, dtype=bool)
+
+    if taie:
+        # sklearn numerotează părintele înaintea copiilor → parcurgere inversă = de jos în sus
+        for i in range(tree.node_count - 1, -1, -1):
+            st, dr = stanga[i], dreapta[i]
+            if st != -1 and stanga[st] == -1 and stanga[dr] == -1 and valoare[st] == valoare[dr]:
+                stanga[i] = dreapta[i] = -1
+                valoare[i] = valoare[st]
+
+    # nodurile accesibile din rădăcină, renumerotate în ordinea parcurgerii
+    ordine = [0]
+    adancime = {0: 0}
+    for i in ordine:
+        if stanga[i] != -1:
+            for c in (stanga[i], dreapta[i]):
+                adancime[c] = adancime[i] + 1
+                ordine.append(c)
+    ordine = np.asarray(ordine)
+    nou = np.full(tree.node_count, -1, dtype=np.int64)
+    nou[ordine] = np.arange(len(ordine))
+
+    frunza = stanga[ordine] == -1
+    return {
+        "feature": np.where(frunza, -1, tree.feature[ordine]),
+        "threshold": tree.threshold[ordine],
+        "stanga": np.where(frunza, -1, nou[stanga[ordine]]),
+        "dreapta": np.where(frunza, -1, nou[dreapta[ordine]]),
+        "valoare": valoare[ordine],
+        "nan_stanga": nan_stanga[ordine],
+        "adancime": max(adancime.values()),
+    }
+
+
+def export_flat_model(
+    pipe,
+    path: Path | str,
+    sursa: str | None = None,
+    taie: bool = True,
+    valori_float32: bool = False,
+) -> Dict[str, Any]:
+    """
+    Exportă Pipeline(preprocess=ColumnTransformer(cat=OneHot, num=StandardScaler),
+    model=RandomForestRegressor) într-un .npz necomprimat.
+    `sursa` (de ex. sha256 al .pkl-ului) se salvează în meta pentru verificarea prospețimii.
+
+    taie=True elimină split-urile inutile (fără efect asupra predicțiilor).
+    valori_float32=True înjumătățește valorile frunzelor; predicțiile diferă
+    atunci de Pipeline.predict cu ~1e-6 puncte procentuale.
+    """
+    ct = pipe.named_steps["preprocess"]
+    model = pipe.named_steps["model"]
+
+    transformers = {name: (tr, list(cols)) for name, tr, cols in ct.transformers_ if tr != "drop"}
+    if set(transformers) != {"cat", "num"} or model.n_outputs_ != 1:
+        raise ValueError("❌ Export plat suportat doar pentru pipeline-ul PMB (cat/num + RF cu o ieșire).")
+
+    encoder, cat_cols = transformers["cat"]
+    scaler, num_cols = transformers["num"]
+    if cat_cols != CATEGORICAL_FEATURES or num_cols != NUMERIC_FEATURES:
+        raise ValueError("❌ Coloanele pipeline-ului nu corespund cu ml_features.")
+    if encoder.drop is not None or getattr(encoder, "_infrequent_enabled", False):
+        raise ValueError("❌ OneHotEncoder cu drop / categorii rare nu e suportat.")
+
+    # arborii concatenați; copiii devin indici globali, frunzele arată spre ele însele
+    feature, threshold, copii, valoare, nan_stanga, radacini = [], [], [], [], [], []
+    offset = 0
+    adancime_max = 0
+    noduri_initiale = 0
+    for est in model.estimators_:
+        a = _arbore(est.tree_, taie)
+        n = len(a["valoare"])
+        frunza = a["stanga"] == -1
+        noduri = np.arange(offset, offset + n)
+
+        radacini.append(offset)
+        feature.append(np.where(frunza, 0, a["feature"]).astype(np.int32))
+        threshold.append(_threshold_float32(a["threshold"]))
+        copii.append(np.column_stack([
+            np.where(frunza, noduri, a["stanga"] + offset),
+            np.where(frunza, noduri, a["dreapta"] + offset),
+        ]).astype(np.int32))
+        valoare.append(a["valoare"])
+        nan_stanga.append(a["nan_stanga"])
+        adancime_max = max(adancime_max, a["adancime"])
+        noduri_initiale += est.tree_.node_count
+        offset += n
+
+    meta = {
+        "versiune": FLAT_VERSION,
+        "sursa": sursa,
+        "categorii": {
+            nume: [str(c) for c in cats] for nume, cats in zip(cat_cols, encoder.categories_)
+        },
+        "numerice": num_cols,
+        "n_features": int(model.n_features_in_),
+        "adancime_max": int(adancime_max),
+        "noduri": int(offset),
+        "noduri_initiale": int(noduri_initiale),
+        "valori_float32": bool(valori_float32),
+    }
+
+    arrays = {
+        "meta": np.frombuffer(json.dumps(meta, ensure_ascii=False).encode("utf-8"), dtype=np.uint8),
+        "mean": np.asarray(scaler.mean_, dtype=np.float64) if scaler.with_mean else np.zeros(len(num_cols)),
+        "scale": np.asarray(scaler.scale_, dtype=np.float64) if scaler.with_std else np.ones(len(num_cols)),
+        "radacini": np.asarray(radacini, dtype=np.int32),
+        "feature": np.concatenate(feature),
+        "threshold": np.concatenate(threshold),
+        "copii": np.concatenate(copii),
+        "valoare": np.concatenate(valoare).astype(np.float32 if valori_float32 else np.float64),
+        "nan_stanga": np.concatenate(nan_stanga),
+    }
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    _savez_aliniat(tmp, arrays)
+    os.replace(tmp, path)
+    return meta
+
+
+ALINIERE = 64  # octeți; ca header-ul .npy, care e deja multiplu de 64
+
+
+def _savez_aliniat(path: Path, arrays: Dict[str, np.ndarray]) -> None:
+    """
+    Ca np.savez (necomprimat, citibil cu np.load), dar datele fiecărui membru
+    încep la un offset multiplu de ALINIERE → memmap-ul dă array-uri aliniate
+    (gather-ele NumPy pe date nealiniate sunt mult mai lente).
+    """
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as zf:
+        for nume, arr in arrays.items():
+            buf = io.BytesIO()
+            np.lib.format.write_array(buf, np.ascontiguousarray(arr), allow_pickle=False)
+
+            info = zipfile.ZipInfo(f"{nume}.npy", date_time=(1980, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_STORED
+            # câmp "extra" de umplutură (id 0xD935, ca zipalign) până la aliniere
+            baza = zf.fp.tell() + 30 + len(info.filename.encode("utf-8")) + 4
+            umplutura = -baza % ALINIERE
+            info.extra = struct.pack("<HH", 0xD935, umplutura) + b"\0" * umplutura
+            zf.writestr(info, buf.getvalue())
+
+
+# -----------------------------
+# ÎNCĂRCARE: memmap direct pe membrii .npy din zip (fără copii în heap)
+# -----------------------------
+
+def _memmap_npz(path: Path) -> Dict[str, np.ndarray]:
+    arrays: Dict[str, np.ndarray] = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+        for info in zf.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"❌ {path}: membrul {info.filename} e comprimat, nu se poate mapa.")
+
+            # local file header: 30 octeți + nume + extra, apoi datele .npy
+            f.seek(info.header_offset)
+            header = f.read(30)
+            n_nume, n_extra = struct.unpack("<HH", header[26:30])
+            f.seek(info.header_offset + 30 + n_nume + n_extra)
+
+            versiune = np.lib.format.read_magic(f)
+            if versiune == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+
+            nume = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if int(np.prod(shape)) == 0:
+                arrays[nume] = np.empty(shape, dtype=dtype)
+                continue
+            arrays[nume] = np.memmap(
+                path, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                order="F" if fortran else "C",
+            )
+    return arrays
+
+
+class FlatForest:
+    """Pădurea exportată de export_flat_model, gata de predicție pe FeatureMatrix."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.meta: Dict[str, Any] = json.loads(bytes(np.asarray(arrays["meta"])).decode("utf-8"))
+        if self.meta.get("versiune") != FLAT_VERSION:
+            raise ValueError(f"❌ Versiune de model plat necunoscută: {self.meta.get('versiune')!r}")
+
+        self.mean = np.asarray(arrays["mean"])
+        self.scale = np.asarray(arrays["scale"])
+        self.radacini = np.asarray(arrays["radacini"])
+        self.feature = np.asarray(arrays["feature"])
+        self.threshold = np.asarray(arrays["threshold"])
+        self.copii = np.asarray(arrays["copii"])
+        self.valoare = np.asarray(arrays["valoare"])
+        self.nan_stanga = np.asarray(arrays["nan_stanga"])
+
+        # np.asarray: view ndarray peste memmap (aceleași pagini, fără overhead-ul subclasei)
+
+        # offset-ul coloanelor one-hot pentru fiecare feature categorial
+        self._categorii: List[Dict[str, int]] = []
+        self._offset_cat: List[int] = []
+        col = 0
+        for nume in CATEGORICAL_FEATURES:
+            cats = self.meta["categorii"][nume]
+            self._categorii.append({c: j for j, c in enumerate(cats)})
+            self._offset_cat.append(col)
+            col += len(cats)
+        self._offset_num = col
+
+    @property
+    def n_arbori(self) -> int:
+        return len(self.radacini)
+
+    @property
+    def sursa(self) -> str | None:
+        return self.meta.get("sursa")
+
+    def nbytes(self) -> int:
+        return sum(
+            a.nbytes for a in (
+                self.radacini, self.feature, self.threshold, self.copii,
+                self.valoare, self.nan_stanga,
+            )
+        )
+
+    def transform(self, fm: FeatureMatrix) -> np.ndarray:
+        """Echivalentul ColumnTransformer.transform + cast-ul float32 făcut de RandomForest."""
+        n = len(fm)
+        X = np.zeros((n, self.meta["n_features"]), dtype=np.float32)
+        randuri = np.arange(n)
+
+        for k, nume in enumerate(CATEGORICAL_FEATURES):
+            # vocabularul FeatureMatrix → coloana one-hot; necunoscut → -1 (handle_unknown="ignore")
+            mapa = np.array(
+                [self._categorii[k].get(v, -1) for v in fm.categorii[nume]] or [-1], dtype=np.int64
+            )
+            col = mapa[fm.coduri[:, k]]
+            ok = col >= 0
+            X[randuri[ok], self._offset_cat[k] + col[ok]] = 1.0
+
+        # aceleași operații in-place ca StandardScaler pe input float32
+        num = np.array(fm.numerice, dtype=np.float32)
+        num -= self.mean
+        num /= self.scale
+        X[:, self._offset_num:self._offset_num + num.shape[1]] = num
+        return X
+
+    def predict_transformed(self, X: np.ndarray, marime_lot: int = 8_192) -> np.ndarray:
+        # pe loturi: memoria rămâne O(marime_lot × arbori)
+        if X.shape[0] > marime_lot:
+            return np.concatenate([
+                self._predict_lot(X[i:i + marime_lot]) for i in range(0, X.shape[0], marime_lot)
+            ])
+        return self._predict_lot(X)
+
+    def _predict_lot(self, X: np.ndarray) -> np.ndarray:
+        n = X.shape[0]
+        # X transpus și aplatizat → valoarea (rând r, feature f) e la f * n + r
+        Xt = np.ascontiguousarray(X.T).ravel()
+        idx = np.int32 if Xt.size < 2**31 and 2 * len(self.feature) < 2**31 else np.int64
+        randuri = np.arange(n, dtype=idx)[:, None]
+        feature = self.feature.astype(idx, copy=False)
+        copii = self.copii.reshape(-1)
+        cu_nan = bool(np.isnan(Xt).any())
+
+        noduri = np.broadcast_to(self.radacini.astype(idx), (n, self.n_arbori)).copy()
+        # frunzele trimit spre ele însele → adâncime_max pași ajung pentru toți arborii
+        for _ in range(self.meta["adancime_max"]):
+            x = Xt[feature[noduri] * idx(n) + randuri]
+            la_dreapta = x > self.threshold[noduri]
+            if cu_nan:
+                nan = np.isnan(x)
+                la_dreapta[nan] = ~self.nan_stanga[noduri[nan]]
+            noduri = copii[2 * noduri + la_dreapta]
+
+        # sumă arbore cu arbore, în ordine, ca RandomForestRegressor.predict
+        valori = self.valoare[noduri]
+        out = np.zeros(n)
+        for t in range(self.n_arbori):
+            out += valori[:, t]
+        out /= self.n_arbori
+        return out
+
+    def predict(self, fm: FeatureMatrix) -> np.ndarray:
+        return self.predict_transformed(self.transform(fm))
+
+
+def load_flat_model(path: Path | str, mmap: bool = True) -> FlatForest:
+    path = Path(path)
+    if mmap:
+        return FlatForest(_memmap_npz(path))
+    with np.load(path, allow_pickle=False) as npz:
+        return FlatForest({k: npz[k] for k in npz.files})
+
+
+# un singur FlatForest per proces și per versiune a fișierului
+_FLAT_CACHE = FileCache(load_flat_model)
+
+
+def get_flat_model(path: Path | str) -> FlatForest:
+    return _FLAT_CACHE.get(path)
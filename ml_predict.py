@@ -2,12 +2,18 @@ from datetime import datetime
 from pathlib import Path
 import json
 
-from ml_core import predict_aggregated, RESULTS_PATH, ROOT
+from config import get_config
+from ml_core import (
+    export_flat_model_curent,
+    load_flat_model,
+    predict_aggregated,
+    write_prediction_artifact,
+)
 
 
 # putem reutiliza exact formatul din main.py (save_run_snapshot):contentReference[oaicite:3]{index=3}
 def save_run_snapshot(estimate, results_real, history_dir="data/history"):
-    history_path = Path(ROOT / history_dir)
+    history_path = Path(get_config().root / history_dir)
     history_path.mkdir(parents=True, exist_ok=True)
 
     top_est = sorted(
@@ -44,8 +50,12 @@ def main():
     print("      ML PREDICT PIPELINE")
     print("==============================\n")
 
+    if load_flat_model() is None:
+        flat = export_flat_model_curent()
+        print(f"🌲 Model plat exportat ({flat.n_arbori} arbori, {flat.nbytes() / 1024:.0f} KB)")
+
     estimari = predict_aggregated(verbose=True)
-    rezultate_reale = json.loads(RESULTS_PATH.read_text(encoding="utf-8"))
+    rezultate_reale = json.loads(get_config().results_path.read_text(encoding="utf-8"))
 
     print("\n===== COMPARAȚIE CU REZULTATE REALE =====")
     for cand, real in rezultate_reale.items():
@@ -58,6 +68,9 @@ def main():
 
     save_run_snapshot(estimari, rezultate_reale)
 
+    artifact = write_prediction_artifact(estimari)
+    print(f"📦 Artefact de predicții {artifact['fingerprint'][:12]} salvat")
+
     print("\n==============================")
     print("   ✔ PREDICȚIE ML FINALIZATĂ")
     print("==============================\n")
@@ -1,11 +1,20 @@
+import argparse
+
 from ml_core import train_model
 
 def main():
+    parser = argparse.ArgumentParser(description="Antrenare model ML PMB 2024")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="adaugă arbori pentru sondajele noi când politica de refit o permite",
+    )
+    args = parser.parse_args()
+
     print("\n==============================")
     print("      ML TRAIN PIPELINE")
     print("==============================\n")
 
-    train_model(verbose=True)
+    train_model(verbose=True, incremental=args.incremental)
 
     print("\n==============================")
     print("   ✔ TRAIN ML FINALIZAT")
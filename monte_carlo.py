@@ -0,0 +1,126 @@
+from __future__ import annotations
+from typing import Any, Dict, List
+
+import numpy as np
+
+
+# -----------------------------
+# SIMULARE MONTE CARLO A CLASAMENTULUI
+#    - pornește de la media și marja agregată din poll_aggregator
+#    - scenarii corelate: dacă un candidat crește, ceilalți tind să scadă
+#      (corelația unei distribuții multinomiale între procente)
+#    - extragerile se fac în loturi NumPy → memoria rămâne O(marime_lot × candidați)
+# -----------------------------
+
+LATIME_BIN_MARJA = 0.1  # puncte procentuale
+MARJA_MAXIMA = 100.0
+
+
+def _corelatie_multinomiala(p: np.ndarray) -> np.ndarray:
+    """corr(i, j) = -sqrt(p_i p_j / ((1 - p_i)(1 - p_j))) pentru i != j."""
+    p = np.clip(p, 1e-6, 1 - 1e-6)
+    r = np.sqrt(p / (1 - p))
+    corr = -np.outer(r, r)
+    np.fill_diagonal(corr, 1.0)
+    return corr
+
+
+def _factor_cholesky(cov: np.ndarray) -> np.ndarray:
+    """L cu L @ L.T = cov; dacă cov nu e pozitiv definită, tăiem valorile proprii negative."""
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        valori, vectori = np.linalg.eigh(cov)
+        return vectori * np.sqrt(np.clip(valori, 0.0, None))
+
+
+def simuleaza_clasament(
+    rezultate: Dict[str, Dict[str, Any]],
+    n_simulari: int = 100_000,
+    marime_lot: int = 25_000,
+    seed: int | None = None,
+    corelat: bool = True,
+) -> Dict[str, Any]:
+    """
+    Probabilitatea ca fiecare candidat să termine pe locul 1, 2 sau 3 și
+    distribuția marjei de victorie (locul 1 − locul 2).
+
+    `rezultate` are formatul din calculeaza_medii_candidati (candidat →
+    {"media", "marja_eroare", ...}); candidații fără medie sunt ignorați.
+    Eroarea standard a fiecărui candidat este marja_eroare / 1.96.
+    """
+
+    candidati: List[str] = [c for c, r in rezultate.items() if r.get("media") is not None]
+    if not candidati:
+        raise ValueError("❌ Niciun candidat cu medie validă pentru simulare.")
+    if n_simulari <= 0 or marime_lot <= 0:
+        raise ValueError("❌ n_simulari și marime_lot trebuie să fie pozitive.")
+
+    k = len(candidati)
+    medii = np.array([rezultate[c]["media"] for c in candidati], dtype=float)
+    ses = np.array([(rezultate[c].get("marja_eroare") or 0.0) / 1.96 for c in candidati])
+
+    corr = _corelatie_multinomiala(medii / 100.0) if corelat else np.eye(k)
+    factor = _factor_cholesky(corr * np.outer(ses, ses))
+
+    rng = np.random.default_rng(seed)
+    locuri = min(3, k)
+    numar_pe_loc = np.zeros((locuri, k), dtype=np.int64)
+
+    n_bins = int(round(MARJA_MAXIMA / LATIME_BIN_MARJA))
+    histograma = np.zeros(n_bins, dtype=np.int64)
+    suma_marja = 0.0
+
+    ramase = n_simulari
+    while ramase > 0:
+        m = min(marime_lot, ramase)
+        ramase -= m
+
+        scenarii = medii + rng.standard_normal((m, k)) @ factor.T
+
+        ordine = np.argsort(-scenarii, axis=1)
+        for loc in range(locuri):
+            numar_pe_loc[loc] += np.bincount(ordine[:, loc], minlength=k)
+
+        if k >= 2:
+            primii_doi = np.take_along_axis(scenarii, ordine[:, :2], axis=1)
+            marje = primii_doi[:, 0] - primii_doi[:, 1]
+            suma_marja += float(marje.sum())
+            bins = np.minimum((marje / LATIME_BIN_MARJA).astype(np.int64), n_bins - 1)
+            histograma += np.bincount(bins, minlength=n_bins)
+
+    probabilitati = numar_pe_loc / n_simulari
+
+    rezultat: Dict[str, Any] = {
+        "n_simulari": n_simulari,
+        "seed": seed,
+        "candidati": {
+            c: {
+                "media": float(medii[j]),
+                "marja_eroare": float(ses[j] * 1.96),
+                **{f"p_locul_{loc + 1}": float(probabilitati[loc, j]) for loc in range(locuri)},
+            }
+            for j, c in enumerate(candidati)
+        },
+    }
+
+    if k >= 2:
+        cumulat = np.cumsum(histograma) / n_simulari
+
+        def _cuantila(q: float) -> float:
+            # capătul superior al bin-ului în care se atinge cuantila
+            return round(float((np.searchsorted(cumulat, q) + 1) * LATIME_BIN_MARJA), 6)
+
+        ultimul = int(np.nonzero(histograma)[0].max()) + 1
+        rezultat["marja_victorie"] = {
+            "medie": suma_marja / n_simulari,
+            "p05": _cuantila(0.05),
+            "p25": _cuantila(0.25),
+            "p50": _cuantila(0.50),
+            "p75": _cuantila(0.75),
+            "p95": _cuantila(0.95),
+            "latime_bin": LATIME_BIN_MARJA,
+            "histograma": histograma[:ultimul].tolist(),
+        }
+
+    return rezultat
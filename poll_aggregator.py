@@ -1,8 +1,14 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from datetime import date
+from itertools import islice
 from math import exp, sqrt
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any, Sequence
+
+import numpy as np
+
+from calibration_table import CalibrationTable, as_calibration_table
+from poll_store import PollStore
 
 
 # -----------------------------
@@ -19,6 +25,11 @@ class Poll:
     marja_eroare: float
 
 
+def _sau_none(x: float) -> float | None:
+    """NaN (eroare lipsă în tabelul de calibrare) → None, ca în JSON."""
+    return None if x != x else x
+
+
 # -----------------------------
 # 2. FUNCȚIA DE AGREGARE COMPLETĂ
 #    - time-decay
@@ -30,72 +41,172 @@ class Poll:
 # -----------------------------
 
 def calculeaza_media_candidat(
-    sondaje: List[Poll],
+    sondaje: List[Poll] | PollStore,
     candidat: str,
-    accuracy_db: Dict[str, Dict[str, Any]],
+    accuracy_db: Dict[str, Dict[str, Any]] | CalibrationTable,
     max_age_days: int = 45,
     lambda_time_decay: float = 0.05,
     azi: date | None = None,
+    cu_audit: bool = False,
 ) -> Dict[str, Any]:
+    """
+    Media ponderată + marja de eroare agregată pentru un candidat.
+
+    Implicit întoarce doar agregatele (fără niciun obiect alocat per sondaj).
+    Detaliile per sondaj vin din explica_media_candidat; cu_audit=True le
+    atașează în "sondaje_folosite", ca înainte. Un PollStore merge pe calea
+    columnară (calculeaza_medii_candidati), fără PollRow per sondaj.
+    """
 
     if azi is None:
         azi = date.today()
 
-    valori: List[float] = []
-    greutati: List[float] = []
-    marje: List[float] = []
-    sondaje_folosite: List[Dict[str, Any]] = []
+    tabel = as_calibration_table(accuracy_db)
+
+    if isinstance(sondaje, PollStore):
+        rezultat = calculeaza_medii_candidati(
+            sondaje, [candidat], tabel, max_age_days, lambda_time_decay, azi
+        )[candidat]
+        if cu_audit:
+            rezultat["sondaje_folosite"] = list(explica_media_candidat(
+                sondaje, candidat, tabel, max_age_days, lambda_time_decay, azi
+            ))
+        return rezultat
 
-    # cât de mult contează institutul vs candidatul la coeficient
-    GAMMA_INST_COEF = 0.7
-    GAMMA_CAND_COEF = 0.3
+    j = tabel.id_candidat(candidat)
 
-    # cât de mult contează institutul vs candidatul la bonus_greutate
-    GAMMA_INST_BONUS = 0.7
-    GAMMA_CAND_BONUS = 0.3
+    # coloana candidatului, ca liste de float (fără indexare numpy în buclă)
+    coef_j = tabel.coef[:, j].tolist()
+    bonus_j = tabel.bonus[:, j].tolist()
+    penalizare_j = tabel.penalizare[:, j].tolist()
+
+    numar = 0
+    suma_greutati = 0.0
+    suma_ponderata = 0.0
+    suma_w2se2 = 0.0
 
     for s in sondaje:
-        # 1. Calculăm vechimea sondajului față de "azi" (de ex. 2024-06-01)
         age_days = (azi - s.data).days
 
-        # ❗ Ignorăm sondajele din viitor și cele prea vechi
-        if age_days < 0:
-            continue
-        if age_days > max_age_days:
+        # ❗ Ignorăm sondajele din viitor, cele prea vechi și pe cele fără candidat
+        if age_days < 0 or age_days > max_age_days:
             continue
-
-        # 2. Ignorăm sondajele care nu conțin candidatul
         if candidat not in s.procentaje:
             continue
 
+        i = tabel.id_institut(s.institut)
+
+        adjusted_pct = s.procentaje[candidat] * coef_j[i]
+        w = (
+            exp(-lambda_time_decay * age_days)
+            * sqrt(max(s.esantion, 1))
+            * bonus_j[i]
+            * penalizare_j[i]
+        )
+        se = s.marja_eroare / 1.96
+
+        numar += 1
+        suma_greutati += w
+        suma_ponderata += adjusted_pct * w
+        suma_w2se2 += (w ** 2) * (se ** 2)
+
+    # Dacă nu există sondaje valide
+    if numar == 0:
+        rezultat = {
+            "candidat": candidat,
+            "media": None,
+            "marja_eroare": None,
+            "mesaj": "Nu există sondaje valide pentru acest candidat.",
+        }
+        if cu_audit:
+            rezultat["sondaje_folosite"] = []
+        return rezultat
+
+    # ----------------------------
+    # MEDIA PONDERATĂ FINALĂ + MOE AGREGATĂ
+    # ----------------------------
+    media = suma_ponderata / suma_greutati
+    se_agregat = sqrt(suma_w2se2 / (suma_greutati ** 2))
+    moe_agregat = 1.96 * se_agregat
+
+    rezultat = {
+        "candidat": candidat,
+        "media": media,
+        "marja_eroare": moe_agregat,
+        "numar_sondaje": numar,
+        "parametri": {
+            "max_age_days": max_age_days,
+            "lambda_time_decay": lambda_time_decay,
+            "azi": azi.isoformat()
+        }
+    }
+
+    if cu_audit:
+        rezultat["sondaje_folosite"] = list(explica_media_candidat(
+            sondaje, candidat, tabel, max_age_days, lambda_time_decay, azi
+        ))
+
+    return rezultat
+
+
+def explica_media_candidat(
+    sondaje: List[Poll] | PollStore,
+    candidat: str,
+    accuracy_db: Dict[str, Dict[str, Any]] | CalibrationTable,
+    max_age_days: int = 45,
+    lambda_time_decay: float = 0.05,
+    azi: date | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Audit trail-ul agregării, calculat leneș: câte un dict per sondaj folosit,
+    în ordinea din `sondaje`. offset / limit paginează fără să construiască
+    intrările sărite.
+    """
+
+    if azi is None:
+        azi = date.today()
+
+    tabel = as_calibration_table(accuracy_db)
+    stop = None if limit is None else offset + limit
+
+    if isinstance(sondaje, PollStore):
+        yield from _explica_store(sondaje, candidat, tabel, max_age_days, lambda_time_decay, azi, offset, stop)
+        return
+
+    j = tabel.id_candidat(candidat)
+
+    folosite = (
+        s for s in sondaje
+        if 0 <= (azi - s.data).days <= max_age_days and candidat in s.procentaje
+    )
+
+    for s in islice(folosite, offset, stop):
+        age_days = (azi - s.data).days
+
         # ----------------------------
         # VALOAREA BRUTĂ DIN SONDAJ
         # ----------------------------
         raw_pct = s.procentaje[candidat]
 
         # ----------------------------
-        # INFO DIN accuracy_institutes.json
+        # CALIBRARE DIN TABELUL COMPILAT (accuracy_institutes.json)
         # ----------------------------
-        inst_info = accuracy_db.get(s.institut, {}) or {}
+        i = tabel.id_institut(s.institut)
 
         # BONUSURI ȘI ERORI
-        global_bonus = float(inst_info.get("bonus_greutate", 1.0))
-        global_err = inst_info.get("eroare_medie")
-
-        cand_info: Dict[str, Any] = {}
-        cand_block = inst_info.get("cand")
-        if isinstance(cand_block, dict):
-            cand_info = cand_block.get(candidat, {}) or {}
-
-        cand_bonus = float(cand_info.get("bonus_greutate", global_bonus))
-        cand_err = cand_info.get("eroare_medie", global_err)
+        global_bonus = float(tabel.global_bonus[i])
+        global_err = _sau_none(float(tabel.global_err[i]))
+        cand_bonus = float(tabel.cand_bonus[i, j])
+        cand_err = _sau_none(float(tabel.cand_err[i, j]))
 
         # COEFICIENT PROCENTE (CALIBRARE SISTEMATICĂ)
-        global_coef = float(inst_info.get("coeficient_procente", 1.0))
-        cand_coef = float(cand_info.get("coeficient_procente", 1.0))
+        global_coef = float(tabel.global_coef[i])
+        cand_coef = float(tabel.cand_coef[i, j])
 
         # Institutul contează mai mult decât candidatul
-        effective_coef = (global_coef ** GAMMA_INST_COEF) * (cand_coef ** GAMMA_CAND_COEF)
+        effective_coef = float(tabel.coef[i, j])
 
         # Aplicăm calibrarea pe procent
         adjusted_pct = raw_pct * effective_coef
@@ -111,28 +222,17 @@ def calculeaza_media_candidat(
         weight_sample = sqrt(max(s.esantion, 1))
 
         # C) Bonus institut + per candidat (pentru greutate)
-        effective_bonus = (global_bonus ** GAMMA_INST_BONUS) * (cand_bonus ** GAMMA_CAND_BONUS)
+        effective_bonus = float(tabel.bonus[i, j])
 
         # D) Penalizare pe baza erorii medii (globală + per candidat)
-        erori_pentru_penalizare = [
-            e for e in [global_err, cand_err] if isinstance(e, (int, float, float))
-        ]
-        if erori_pentru_penalizare:
-            eroare_medie_pentru_penalizare = sum(erori_pentru_penalizare) / len(erori_pentru_penalizare)
-            penalizare_eroare = 1.0 / (1.0 + eroare_medie_pentru_penalizare)
-        else:
-            penalizare_eroare = 1.0
+        penalizare_eroare = float(tabel.penalizare[i, j])
 
         # ----------------------------
         # GREUTATEA FINALĂ
         # ----------------------------
         w = weight_time * weight_sample * effective_bonus * penalizare_eroare
 
-        valori.append(adjusted_pct)
-        greutati.append(w)
-        marje.append(s.marja_eroare)
-
-        sondaje_folosite.append({
+        yield {
             "institut": s.institut,
             "data": s.data.isoformat(),
             "esantion": s.esantion,
@@ -152,46 +252,384 @@ def calculeaza_media_candidat(
             "bonus_effectiv": effective_bonus,
             "penalizare_eroare": penalizare_eroare,
             "greutate_finala": w
-        })
+        }
 
-    # Dacă nu există sondaje valide
-    if not valori:
+
+def _explica_store(
+    store: PollStore,
+    candidat: str,
+    tabel: CalibrationTable,
+    max_age_days: int,
+    lambda_time_decay: float,
+    azi: date,
+    offset: int,
+    stop: int | None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    explica_media_candidat pe coloanele store-ului: selecția și componentele
+    greutății se calculează vectorizat, doar pentru pagina cerută.
+    """
+    procente, prezent, intregi = store.coloana_candidat(candidat)
+
+    varste = azi.toordinal() - store.zile.astype(np.int64)
+    folosite = np.flatnonzero((varste >= 0) & (varste <= max_age_days) & prezent)
+    idx = folosite[offset:stop]
+    if len(idx) == 0:
+        return
+
+    j = tabel.id_candidat(candidat)
+    ids_inst = tabel.ids_institute(store.institute)[store.institut_id[idx]]
+
+    raw_pct = procente[idx]
+    coef = tabel.coef[ids_inst, j]
+    # math.exp (nu np.exp), ca în calea pe liste: aceleași valori până la ultimul bit
+    weight_time = np.array([exp(-lambda_time_decay * v) for v in varste[idx].tolist()])
+    weight_sample = np.sqrt(np.maximum(store.esantion[idx], 1))
+    bonus = tabel.bonus[ids_inst, j]
+    penalizare = tabel.penalizare[ids_inst, j]
+
+    def _surse(valori: np.ndarray, intregi: np.ndarray) -> List[int | float]:
+        return [int(v) if e else v for v, e in zip(valori.tolist(), intregi.tolist())]
+
+    def _erori(valori: np.ndarray) -> List[float | None]:
+        return [_sau_none(v) for v in valori.tolist()]
+
+    coloane = zip(
+        [store.institute[k] for k in store.institut_id[idx].tolist()],
+        [date.fromordinal(z).isoformat() for z in store.zile[idx].tolist()],
+        _surse(store.esantion[idx], store.esantion_int[idx]),
+        [store.metode[k] for k in store.metoda_id[idx].tolist()],
+        _surse(raw_pct, intregi[idx]),
+        (raw_pct * coef).tolist(),
+        _surse(store.marja_eroare[idx], store.marja_int[idx]),
+        weight_time.tolist(),
+        weight_sample.tolist(),
+        tabel.global_bonus[ids_inst].tolist(),
+        _erori(tabel.global_err[ids_inst]),
+        tabel.cand_bonus[ids_inst, j].tolist(),
+        _erori(tabel.cand_err[ids_inst, j]),
+        tabel.global_coef[ids_inst].tolist(),
+        tabel.cand_coef[ids_inst, j].tolist(),
+        coef.tolist(),
+        bonus.tolist(),
+        penalizare.tolist(),
+        (weight_time * weight_sample * bonus * penalizare).tolist(),
+    )
+
+    for (institut, data, esantion, metoda, raw, ajustat, moe, w_time, w_sample, global_bonus,
+         global_err, cand_bonus, cand_err, global_coef, cand_coef, effective_coef,
+         effective_bonus, penalizare_eroare, w) in coloane:
+        yield {
+            "institut": institut,
+            "data": data,
+            "esantion": esantion,
+            "metoda": metoda,
+            "procent_raw": raw,
+            "procent_ajustat": ajustat,
+            "moe": moe,
+            "greutate_time": w_time,
+            "greutate_esantion": w_sample,
+            "bonus_global": global_bonus,
+            "eroare_medie_global": global_err,
+            "bonus_candidat": cand_bonus,
+            "eroare_medie_candidat": cand_err,
+            "coef_global": global_coef,
+            "coef_candidat": cand_coef,
+            "coef_effectiv": effective_coef,
+            "bonus_effectiv": effective_bonus,
+            "penalizare_eroare": penalizare_eroare,
+            "greutate_finala": w
+        }
+
+
+# -----------------------------
+# 3. AGREGARE BATCH (TOȚI CANDIDAȚII, O SINGURĂ TRECERE)
+#    - matrice sondaj × candidat + mască pentru candidații lipsă
+#    - calibrarea vine din tabelul compilat (CalibrationTable)
+#    - aceleași media / marja_eroare ca în calculeaza_media_candidat
+# -----------------------------
+
+@dataclass
+class _MatriceSondaje:
+    zile: np.ndarray           # data sondajului ca ordinal (n_sondaje,)
+    procente: np.ndarray       # procente ajustate cu coeficientul efectiv (n_sondaje × n_cand)
+    prezent: np.ndarray        # True unde sondajul conține candidatul
+    greutati_baza: np.ndarray  # sqrt(eșantion) × bonus × penalizare, 0 unde candidatul lipsește
+    ses: np.ndarray            # marja de eroare / 1.96 (n_sondaje,)
+
+
+def _filtreaza_zile(
+    sondaje: Sequence[Poll] | PollStore,
+    prima_zi: int,
+    ultima_zi: int,
+) -> Sequence[Poll] | PollStore:
+    """Sondajele cu data (ordinal) în [prima_zi, ultima_zi]."""
+    if isinstance(sondaje, PollStore):
+        return sondaje.take((sondaje.zile >= prima_zi) & (sondaje.zile <= ultima_zi))
+    return [s for s in sondaje if prima_zi <= s.data.toordinal() <= ultima_zi]
+
+
+def _construieste_matrice(
+    sondaje: Sequence[Poll] | PollStore,
+    candidati: Sequence[str],
+    tabel: CalibrationTable,
+) -> _MatriceSondaje:
+    """Tot ce nu depinde de "azi": procente calibrate și partea fixă a greutăților."""
+
+    if isinstance(sondaje, PollStore):
+        return _construieste_matrice_store(sondaje, candidati, tabel)
+
+    n_sondaje, n_cand = len(sondaje), len(candidati)
+
+    procente = np.zeros((n_sondaje, n_cand))
+    prezent = np.zeros((n_sondaje, n_cand), dtype=bool)
+    zile = np.empty(n_sondaje, dtype=np.int64)
+    esantioane = np.empty(n_sondaje)
+    marje = np.empty(n_sondaje)
+    ids_inst = np.empty(n_sondaje, dtype=np.intp)
+
+    for i, s in enumerate(sondaje):
+        zile[i] = s.data.toordinal()
+        esantioane[i] = max(s.esantion, 1)
+        marje[i] = s.marja_eroare
+        ids_inst[i] = tabel.id_institut(s.institut)
+
+        for j, candidat in enumerate(candidati):
+            if candidat in s.procentaje:
+                procente[i, j] = s.procentaje[candidat]
+                prezent[i, j] = True
+
+    return _calibreaza_matrice(zile, procente, prezent, esantioane, marje, ids_inst, candidati, tabel)
+
+
+def _construieste_matrice_store(
+    store: PollStore,
+    candidati: Sequence[str],
+    tabel: CalibrationTable,
+) -> _MatriceSondaje:
+    # id-urile din vocabularul store-ului → id-urile din tabelul de calibrare
+    ids_inst = tabel.ids_institute(store.institute)[store.institut_id]
+    procente, prezent = store.coloane_candidati(candidati)
+
+    return _calibreaza_matrice(
+        store.zile.astype(np.int64),
+        procente,
+        prezent,
+        np.maximum(store.esantion, 1).astype(np.float64),
+        store.marja_eroare.astype(np.float64),
+        ids_inst,
+        candidati,
+        tabel,
+    )
+
+
+def _calibreaza_matrice(
+    zile: np.ndarray,
+    procente: np.ndarray,
+    prezent: np.ndarray,
+    esantioane: np.ndarray,
+    marje: np.ndarray,
+    ids_inst: np.ndarray,
+    candidati: Sequence[str],
+    tabel: CalibrationTable,
+) -> _MatriceSondaje:
+    # calibrarea (sondaj × candidat) direct din tabelul compilat
+    ids_cand = tabel.ids_candidati(candidati)
+    coef = tabel.coef[ids_inst[:, None], ids_cand[None, :]]
+    bonus = tabel.bonus[ids_inst[:, None], ids_cand[None, :]]
+    penalizare = tabel.penalizare[ids_inst[:, None], ids_cand[None, :]]
+
+    greutati_baza = np.sqrt(esantioane)[:, None] * bonus * penalizare
+
+    return _MatriceSondaje(
+        zile=zile,
+        procente=procente * coef,
+        prezent=prezent,
+        greutati_baza=np.where(prezent, greutati_baza, 0.0),
+        ses=marje / 1.96,
+    )
+
+
+def _rezultat_candidat(
+    candidat: str,
+    numar_sondaje: int,
+    media: float,
+    marja_eroare: float,
+    parametri: Dict[str, Any],
+) -> Dict[str, Any]:
+    if numar_sondaje == 0:
         return {
             "candidat": candidat,
             "media": None,
             "marja_eroare": None,
             "mesaj": "Nu există sondaje valide pentru acest candidat.",
-            "sondaje_folosite": []
         }
 
-    # ----------------------------
-    # MEDIA PONDERATĂ FINALĂ
-    # ----------------------------
-    suma_greutati = sum(greutati)
-    media = sum(v * w for v, w in zip(valori, greutati)) / suma_greutati
+    return {
+        "candidat": candidat,
+        "media": float(media),
+        "marja_eroare": float(marja_eroare),
+        "numar_sondaje": int(numar_sondaje),
+        "parametri": dict(parametri),
+    }
+
+
+def calculeaza_medii_candidati(
+    sondaje: List[Poll] | PollStore,
+    candidati: Sequence[str],
+    accuracy_db: Dict[str, Dict[str, Any]] | CalibrationTable,
+    max_age_days: int = 45,
+    lambda_time_decay: float = 0.05,
+    azi: date | None = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Agregă toți candidații unei alegeri într-o singură trecere peste sondaje.
+
+    Echivalent cu apelarea calculeaza_media_candidat pentru fiecare candidat,
+    dar fără lista sondaje_folosite (doar agregatele).
+    """
+
+    if azi is None:
+        azi = date.today()
+
+    candidati = list(candidati)
+    tabel = as_calibration_table(accuracy_db)
+    parametri = {
+        "max_age_days": max_age_days,
+        "lambda_time_decay": lambda_time_decay,
+        "azi": azi.isoformat()
+    }
+
+    # sondajele din fereastra [0, max_age_days]
+    in_fereastra = _filtreaza_zile(sondaje, azi.toordinal() - max_age_days, azi.toordinal())
+    m = _construieste_matrice(in_fereastra, candidati, tabel)
 
     # ----------------------------
-    # CALCUL MOE AGREGATĂ
+    # GREUTĂȚI (sondaj × candidat), 0 unde candidatul lipsește
     # ----------------------------
-    ses = [(moe / 1.96) for moe in marje]
+    varste = azi.toordinal() - m.zile
+    weight_time = np.exp(-lambda_time_decay * varste)
+    greutati = weight_time[:, None] * m.greutati_baza
 
-    from math import sqrt as _sqrt
-    se_agregat = _sqrt(
-        sum((w ** 2) * (se ** 2) for w, se in zip(greutati, ses))
-        / (suma_greutati ** 2)
-    )
+    suma_greutati = greutati.sum(axis=0)
+    numar_sondaje = m.prezent.sum(axis=0)
 
-    moe_agregat = 1.96 * se_agregat
+    with np.errstate(invalid="ignore", divide="ignore"):
+        medii = (greutati * m.procente).sum(axis=0) / suma_greutati
+        se_agregat = np.sqrt(((greutati ** 2) * (m.ses ** 2)[:, None]).sum(axis=0)) / suma_greutati
 
     return {
-        "candidat": candidat,
-        "media": media,
-        "marja_eroare": moe_agregat,
-        "numar_sondaje": len(valori),
-        "sondaje_folosite": sondaje_folosite,
+        candidat: _rezultat_candidat(
+            candidat, numar_sondaje[j], medii[j], 1.96 * se_agregat[j], parametri
+        )
+        for j, candidat in enumerate(candidati)
+    }
+
+
+# -----------------------------
+# 4. SERIE ZILNICĂ (TREND PENTRU GRAFICE)
+#    - fereastra max_age_days alunecă zi cu zi
+#    - sumele ponderate se actualizează prin recurență:
+#        S(t) = S(t-1)·e^(-λ) + sondajele de azi − sondajele ieșite din fereastră
+#    - cost O(zile × candidați + sondaje) în loc de O(zile × sondaje)
+# -----------------------------
+
+def calculeaza_serie_zilnica(
+    sondaje: List[Poll] | PollStore,
+    candidati: Sequence[str],
+    accuracy_db: Dict[str, Dict[str, Any]] | CalibrationTable,
+    start: date,
+    end: date,
+    max_age_days: int = 45,
+    lambda_time_decay: float = 0.05,
+) -> Dict[str, Any]:
+    """
+    Estimarea agregată pentru fiecare zi din [start, end].
+
+    Pentru fiecare zi, media și marja de eroare coincid (până la erori de
+    rotunjire) cu calculeaza_medii_candidati(..., azi=ziua). Zilele fără
+    sondaje în fereastră au media / marja_eroare None.
+    """
+
+    if end < start:
+        raise ValueError("❌ end trebuie să fie după start.")
+
+    candidati = list(candidati)
+    tabel = as_calibration_table(accuracy_db)
+    n_zile, n_cand = (end - start).days + 1, len(candidati)
+
+    # sondajele care ajung vreodată în fereastră, grupate pe zile
+    prima_zi = start.toordinal() - max_age_days
+    relevante = _filtreaza_zile(sondaje, prima_zi, end.toordinal())
+    m = _construieste_matrice(relevante, candidati, tabel)
+
+    n_galeti = n_zile + max_age_days
+    idx = m.zile - prima_zi
+
+    galet_w = np.zeros((n_galeti, n_cand))
+    galet_wx = np.zeros((n_galeti, n_cand))
+    galet_w2se2 = np.zeros((n_galeti, n_cand))
+    galet_n = np.zeros((n_galeti, n_cand), dtype=np.int64)
+
+    np.add.at(galet_w, idx, m.greutati_baza)
+    np.add.at(galet_wx, idx, m.greutati_baza * m.procente)
+    np.add.at(galet_w2se2, idx, (m.greutati_baza ** 2) * (m.ses ** 2)[:, None])
+    np.add.at(galet_n, idx, m.prezent)
+
+    decay = np.exp(-lambda_time_decay)
+    decay_iesire = np.exp(-lambda_time_decay * (max_age_days + 1))
+
+    # starea inițială = fereastra completă pentru ziua start
+    varste = np.arange(max_age_days, -1, -1)
+    w_timp = np.exp(-lambda_time_decay * varste)[:, None]
+    s_w = (galet_w[:max_age_days + 1] * w_timp).sum(axis=0)
+    s_wx = (galet_wx[:max_age_days + 1] * w_timp).sum(axis=0)
+    s_w2se2 = (galet_w2se2[:max_age_days + 1] * w_timp ** 2).sum(axis=0)
+    n = galet_n[:max_age_days + 1].sum(axis=0)
+
+    medii = np.full((n_zile, n_cand), np.nan)
+    marje = np.full((n_zile, n_cand), np.nan)
+    numar = np.zeros((n_zile, n_cand), dtype=np.int64)
+
+    for t in range(n_zile):
+        if t > 0:
+            intra = t + max_age_days
+            iese = t - 1
+
+            s_w = s_w * decay + galet_w[intra] - galet_w[iese] * decay_iesire
+            s_wx = s_wx * decay + galet_wx[intra] - galet_wx[iese] * decay_iesire
+            s_w2se2 = (
+                s_w2se2 * decay ** 2 + galet_w2se2[intra]
+                - galet_w2se2[iese] * decay_iesire ** 2
+            )
+            n = n + galet_n[intra] - galet_n[iese]
+
+            # fereastra goală → resetăm ca să nu acumulăm erori de rotunjire
+            gol = n == 0
+            s_w[gol] = s_wx[gol] = s_w2se2[gol] = 0.0
+
+        activ = n > 0
+        medii[t, activ] = s_wx[activ] / s_w[activ]
+        marje[t, activ] = 1.96 * np.sqrt(np.maximum(s_w2se2[activ], 0.0)) / s_w[activ]
+        numar[t] = n
+
+    def _lista(col: np.ndarray) -> List[float | None]:
+        return [None if v != v else float(v) for v in col]
+
+    return {
+        "zile": [date.fromordinal(start.toordinal() + t).isoformat() for t in range(n_zile)],
+        "candidati": {
+            candidat: {
+                "media": _lista(medii[:, j]),
+                "marja_eroare": _lista(marje[:, j]),
+                "numar_sondaje": numar[:, j].tolist(),
+            }
+            for j, candidat in enumerate(candidati)
+        },
         "parametri": {
             "max_age_days": max_age_days,
             "lambda_time_decay": lambda_time_decay,
-            "azi": azi.isoformat()
-        }
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+        },
     }
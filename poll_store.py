@@ -0,0 +1,327 @@
+from __future__ import annotations
+import json
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+import numpy as np
+
+from file_cache import FileCache
+
+
+# -----------------------------
+# STOCARE COLUMNARĂ A SONDAJELOR
+#    - institut / metodă / candidat internate (id-uri int32)
+#    - datele ca ordinal int32
+#    - eșantionul și marja de eroare float64 (există eșantioane ne-întregi în date)
+#    - procentele în format CSR (ca scipy.sparse): pentru fiecare sondaj doar
+#      candidații lui → memoria nu crește cu numărul total de candidați din
+#      toate alegerile / țările din arhivă
+#        inceput[i]:inceput[i+1] = celulele sondajului i
+#        celula_candidat / celula_procent (float64) / celula_int
+#    - măști "*_int" pentru valorile care erau int în sursă → PollRow și
+#      audit-ul întorc exact valorile din JSON (21.4, nu 21.399999618530273; 30, nu 30.0)
+# -----------------------------
+
+class PollStore:
+    """
+    Toate sondajele unei surse într-un singur set de array-uri.
+
+    Iterarea / indexarea întoarce PollRow (view cu __slots__) care are
+    aceleași atribute ca poll_aggregator.Poll, deci codul vechi care
+    parcurge sondajele merge neschimbat.
+    """
+
+    def __init__(
+        self,
+        institute: List[str],
+        metode: List[str],
+        candidati: List[str],
+        institut_id: np.ndarray,
+        metoda_id: np.ndarray,
+        zile: np.ndarray,
+        esantion: np.ndarray,
+        marja_eroare: np.ndarray,
+        inceput: np.ndarray,
+        celula_candidat: np.ndarray,
+        celula_procent: np.ndarray,
+        celula_int: np.ndarray | None = None,
+        esantion_int: np.ndarray | None = None,
+        marja_int: np.ndarray | None = None,
+        ignorate: int = 0,
+    ):
+        self.institute = institute
+        self.metode = metode
+        self.candidati = candidati
+        self.candidat_ids: Dict[str, int] = {n: j for j, n in enumerate(candidati)}
+
+        self.institut_id = institut_id
+        self.metoda_id = metoda_id
+        self.zile = zile
+        self.esantion = esantion
+        self.marja_eroare = marja_eroare
+
+        # procentele (CSR): celulele sondajului i sunt [inceput[i], inceput[i + 1])
+        self.inceput = inceput
+        self.celula_candidat = celula_candidat
+        self.celula_procent = celula_procent
+
+        # True unde valoarea din sursă era int (lipsă → toate float)
+        self.celula_int = np.zeros(len(celula_procent), dtype=bool) if celula_int is None else celula_int
+        self.esantion_int = np.zeros(len(zile), dtype=bool) if esantion_int is None else esantion_int
+        self.marja_int = np.zeros(len(zile), dtype=bool) if marja_int is None else marja_int
+
+        # câte înregistrări au fost sărite la încărcare (dată coruptă / câmpuri lipsă)
+        self.ignorate = ignorate
+
+    # ----------------------------
+    # CONSTRUCȚIE
+    # ----------------------------
+
+    @classmethod
+    def from_records(cls, items: Iterable[Dict[str, Any]]) -> "PollStore":
+        institute: Dict[str, int] = {}
+        metode: Dict[str, int] = {}
+        candidati: Dict[str, int] = {}
+
+        inst_col: List[int] = []
+        metoda_col: List[int] = []
+        zile_col: List[int] = []
+        esantion_col: List[float] = []
+        marja_col: List[float] = []
+        inceput: List[int] = [0]
+        celula_candidat: List[int] = []
+        celula_procent: List[float] = []
+        ignorate = 0
+
+        for item in items:
+            try:
+                zi = date.fromisoformat(item["data"]).toordinal()
+            except Exception:
+                # ignorăm sondajele cu dată coruptă
+                ignorate += 1
+                continue
+
+            procentaje = item.get("procentaje", {}) or {}
+            if not isinstance(procentaje, dict):
+                ignorate += 1
+                continue
+
+            inst = item.get("institut", "necunoscut")
+            metoda = item.get("metoda", "necunoscut")
+
+            inst_col.append(institute.setdefault(inst, len(institute)))
+            metoda_col.append(metode.setdefault(metoda, len(metode)))
+            zile_col.append(zi)
+            esantion_col.append(item.get("esantion", 0) or 0)
+            marja_col.append(item.get("marja_eroare", 3.0))
+
+            for cand, pct in procentaje.items():
+                if isinstance(pct, (int, float)):
+                    celula_candidat.append(candidati.setdefault(cand, len(candidati)))
+                    celula_procent.append(pct)
+            inceput.append(len(celula_procent))
+
+        n = len(zile_col)
+        return cls(
+            institute=list(institute),
+            metode=list(metode),
+            candidati=list(candidati),
+            institut_id=np.asarray(inst_col, dtype=np.int32),
+            metoda_id=np.asarray(metoda_col, dtype=np.int32),
+            zile=np.asarray(zile_col, dtype=np.int32),
+            esantion=np.asarray(esantion_col, dtype=np.float64),
+            marja_eroare=np.asarray(marja_col, dtype=np.float64),
+            inceput=np.asarray(inceput, dtype=np.int64),
+            celula_candidat=np.asarray(celula_candidat, dtype=np.int32),
+            celula_procent=np.asarray(celula_procent, dtype=np.float64),
+            celula_int=np.fromiter((isinstance(v, int) for v in celula_procent), dtype=bool, count=len(celula_procent)),
+            esantion_int=np.fromiter((isinstance(v, int) for v in esantion_col), dtype=bool, count=n),
+            marja_int=np.fromiter((isinstance(v, int) for v in marja_col), dtype=bool, count=n),
+            ignorate=ignorate,
+        )
+
+    @classmethod
+    def load(cls, path: Path | str) -> "PollStore":
+        path = Path(path)
+        if not path.exists():
+            return cls.from_records([])
+        return cls.from_records(json.loads(path.read_text(encoding="utf-8")))
+
+    def take(self, indices: np.ndarray) -> "PollStore":
+        """Subset de rânduri (mască bool sau indici); vocabularele sunt partajate."""
+        indices = np.asarray(indices)
+        rand = np.flatnonzero(indices) if indices.dtype == bool else indices.astype(np.int64)
+
+        # celulele rândurilor alese, în ordinea rândurilor
+        lungimi = self.inceput[rand + 1] - self.inceput[rand]
+        inceput = np.zeros(len(rand) + 1, dtype=np.int64)
+        np.cumsum(lungimi, out=inceput[1:])
+        celule = np.repeat(self.inceput[rand] - inceput[:-1], lungimi) + np.arange(inceput[-1])
+
+        return PollStore(
+            institute=self.institute,
+            metode=self.metode,
+            candidati=self.candidati,
+            institut_id=self.institut_id[rand],
+            metoda_id=self.metoda_id[rand],
+            zile=self.zile[rand],
+            esantion=self.esantion[rand],
+            marja_eroare=self.marja_eroare[rand],
+            inceput=inceput,
+            celula_candidat=self.celula_candidat[celule],
+            celula_procent=self.celula_procent[celule],
+            celula_int=self.celula_int[celule],
+            esantion_int=self.esantion_int[rand],
+            marja_int=self.marja_int[rand],
+        )
+
+    # ----------------------------
+    # ACCES
+    # ----------------------------
+
+    def _rand_celula(self) -> np.ndarray:
+        """Indicele sondajului pentru fiecare celulă."""
+        return np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.inceput))
+
+    def coloane_candidati(self, candidati: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Procente (float64) și mască pentru candidații ceruți, în ordinea cerută;
+        un candidat care nu apare în niciun sondaj primește o coloană goală.
+        Matricea densă are doar coloanele cerute, nu toți candidații din store.
+        """
+        n = len(self)
+        procente = np.zeros((n, len(candidati)))
+        prezent = np.zeros((n, len(candidati)), dtype=bool)
+
+        coloana = np.full(len(self.candidati), -1, dtype=np.int64)
+        for j, cand in enumerate(candidati):
+            c = self.candidat_ids.get(cand)
+            if c is not None:
+                coloana[c] = j
+
+        col = coloana[self.celula_candidat]
+        alese = col >= 0
+        rand = self._rand_celula()[alese]
+        procente[rand, col[alese]] = self.celula_procent[alese]
+        prezent[rand, col[alese]] = True
+        return procente, prezent
+
+    def coloana_candidat(self, candidat: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(procente, prezent, era_int) pentru un singur candidat, câte o valoare per sondaj."""
+        n = len(self)
+        procente = np.zeros(n)
+        prezent = np.zeros(n, dtype=bool)
+        intregi = np.zeros(n, dtype=bool)
+
+        c = self.candidat_ids.get(candidat)
+        if c is not None:
+            alese = self.celula_candidat == c
+            rand = self._rand_celula()[alese]
+            procente[rand] = self.celula_procent[alese]
+            prezent[rand] = True
+            intregi[rand] = self.celula_int[alese]
+        return procente, prezent, intregi
+
+    def _coloane(self) -> tuple[np.ndarray, ...]:
+        return (
+            self.institut_id, self.metoda_id, self.zile, self.esantion, self.marja_eroare,
+            self.inceput, self.celula_candidat, self.celula_procent, self.celula_int,
+            self.esantion_int, self.marja_int,
+        )
+
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self._coloane())
+
+    def __len__(self) -> int:
+        return len(self.zile)
+
+    def __getitem__(self, i: int) -> "PollRow":
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        return PollRow(self, i)
+
+    def __iter__(self) -> Iterator["PollRow"]:
+        for i in range(len(self)):
+            yield PollRow(self, i)
+
+
+def _valoare_sursa(v: float, e_int: bool) -> int | float:
+    """Valoarea din store ca tipul din JSON-ul sursă (int sau float)."""
+    return int(v) if e_int else float(v)
+
+
+class PollRow:
+    """View read-only pe un rând din PollStore, compatibil cu Poll."""
+
+    __slots__ = ("_store", "_i")
+
+    def __init__(self, store: PollStore, i: int):
+        self._store = store
+        self._i = i
+
+    @property
+    def institut(self) -> str:
+        return self._store.institute[self._store.institut_id[self._i]]
+
+    @property
+    def metoda(self) -> str:
+        return self._store.metode[self._store.metoda_id[self._i]]
+
+    @property
+    def data(self) -> date:
+        return date.fromordinal(int(self._store.zile[self._i]))
+
+    @property
+    def esantion(self) -> int | float:
+        st, i = self._store, self._i
+        return _valoare_sursa(st.esantion[i], st.esantion_int[i])
+
+    @property
+    def marja_eroare(self) -> int | float:
+        st, i = self._store, self._i
+        return _valoare_sursa(st.marja_eroare[i], st.marja_int[i])
+
+    @property
+    def procentaje(self) -> Dict[str, int | float]:
+        st = self._store
+        celule = range(st.inceput[self._i], st.inceput[self._i + 1])
+        return {
+            st.candidati[st.celula_candidat[k]]: _valoare_sursa(st.celula_procent[k], st.celula_int[k])
+            for k in celule
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "institut": self.institut,
+            "data": self.data.isoformat(),
+            "esantion": self.esantion,
+            "metoda": self.metoda,
+            "procentaje": self.procentaje,
+            "marja_eroare": self.marja_eroare,
+        }
+
+    def __repr__(self) -> str:
+        return f"PollRow({self.institut!r}, {self.data.isoformat()})"
+
+
+# -----------------------------
+# ÎNCĂRCARE PARTAJATĂ (o singură dată per versiune a fișierului)
+# -----------------------------
+
+def _load_read_only(path: Path) -> PollStore:
+    store = PollStore.load(path)
+    # aceeași instanță e partajată de agregator, ML și calibrare → nimeni nu o modifică
+    for arr in store._coloane():
+        arr.flags.writeable = False
+    return store
+
+
+_STORE_CACHE = FileCache(_load_read_only)
+
+
+def load_poll_store(path: Path | str) -> PollStore:
+    return _STORE_CACHE.get(path)
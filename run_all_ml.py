@@ -3,12 +3,12 @@ import sys
 import time
 
 
-def run_script(name, file):
+def run_script(name, file, *args):
     print(f"\n==============================")
     print(f"▶ RULARE: {name}")
     print(f"==============================\n")
 
-    result = subprocess.run([sys.executable, file])
+    result = subprocess.run([sys.executable, file, *args])
 
     print("\n--- FINALIZAT ---\n")
     time.sleep(1)
@@ -27,8 +27,8 @@ def main():
         print("❌ Agentul a eșuat. Oprim execuția.")
         return
 
-    # 2️⃣ Train ML
-    code = run_script("ML TRAIN (ml_train.py)", "ml_train.py")
+    # 2️⃣ Train ML (incremental: refit complet doar când politica o cere)
+    code = run_script("ML TRAIN (ml_train.py)", "ml_train.py", "--incremental")
     if code != 0:
         print("❌ ML train a eșuat. Oprim execuția.")
         return
@@ -0,0 +1,165 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from calibration_table import load_calibration_table
+from config import get_config
+from elections import Election, load_registry
+from monte_carlo import simuleaza_clasament
+from poll_aggregator import calculeaza_medii_candidati
+from poll_store import PollStore
+
+
+# -----------------------------
+# PARTIȚIONARE: sondaje → alegeri
+#    - fiecare sursă de sondaje e citită o singură dată
+#    - un sondaj cu câmpul "alegere" merge doar la alegerea respectivă
+#    - fără câmp, merge la alegere doar dacă sursa aparține unei singure alegeri
+# -----------------------------
+
+def partitioneaza_sondaje(elections: List[Election]) -> Tuple[Dict[str, List[Dict[str, Any]]], int]:
+    pe_sursa: Dict[Path, List[Election]] = defaultdict(list)
+    for e in elections:
+        pe_sursa[e.sondaje].append(e)
+
+    partitii: Dict[str, List[Dict[str, Any]]] = {e.id: [] for e in elections}
+    neatribuite = 0
+
+    for sursa, grup in pe_sursa.items():
+        if not sursa.exists():
+            continue
+
+        ids = {e.id for e in grup}
+        for item in json.loads(sursa.read_text(encoding="utf-8")):
+            alegere = item.get("alegere")
+            if alegere in ids:
+                partitii[alegere].append(item)
+            elif alegere is None and len(grup) == 1:
+                partitii[grup[0].id].append(item)
+            else:
+                neatribuite += 1
+
+    return partitii, neatribuite
+
+
+# -----------------------------
+# AGREGAREA UNEI PARTIȚII (rulează într-un proces worker)
+# -----------------------------
+
+def agrega_alegere(args: Tuple[Election, List[Dict[str, Any]], int]) -> Dict[str, Any]:
+    election, records, n_simulari = args
+    t0 = time.perf_counter()
+
+    store = PollStore.from_records(records)
+    tabel = load_calibration_table(election.accuracy) if election.accuracy else {}
+    azi = election.zi_estimare
+
+    rezultate = calculeaza_medii_candidati(
+        store,
+        candidati=election.candidati,
+        accuracy_db=tabel,
+        max_age_days=election.max_age_days,
+        lambda_time_decay=election.lambda_time_decay,
+        azi=azi,
+    )
+
+    out: Dict[str, Any] = {
+        "id": election.id,
+        "nume": election.nume,
+        "tara": election.tara,
+        "data_alegeri": election.data.isoformat(),
+        "azi": azi.isoformat(),
+        "numar_sondaje": len(store),
+        "estimari": {
+            c: {k: r.get(k) for k in ("media", "marja_eroare", "numar_sondaje")}
+            for c, r in rezultate.items()
+        },
+    }
+
+    if n_simulari > 0 and any(r["media"] is not None for r in rezultate.values()):
+        simulare = simuleaza_clasament(rezultate, n_simulari=n_simulari, seed=42)
+        out["probabilitati"] = {
+            c: {k: v for k, v in info.items() if k.startswith("p_locul_")}
+            for c, info in simulare["candidati"].items()
+        }
+
+    if election.rezultate is not None and election.rezultate.exists():
+        reale = json.loads(election.rezultate.read_text(encoding="utf-8"))
+        out["diferente"] = {
+            c: rezultate[c]["media"] - reale[c]
+            for c in election.candidati
+            if c in reale and rezultate[c]["media"] is not None
+        }
+
+    out["secunde"] = time.perf_counter() - t0
+    return out
+
+
+def run_all(
+    elections: List[Election],
+    workers: int = 1,
+    n_simulari: int = 0,
+) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    partitii, neatribuite = partitioneaza_sondaje(elections)
+    sarcini = [(e, partitii[e.id], n_simulari) for e in elections]
+
+    if workers > 1 and len(sarcini) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(sarcini))) as pool:
+            rezultate = list(pool.map(agrega_alegere, sarcini))
+    else:
+        rezultate = [agrega_alegere(s) for s in sarcini]
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "sondaje_neatribuite": neatribuite,
+        "secunde_total": time.perf_counter() - t0,
+        "alegeri": {r["id"]: r for r in rezultate},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agregare pentru toate alegerile din registru")
+    parser.add_argument("--alegeri", nargs="*", help="id-uri din data/elections.json (implicit toate)")
+    parser.add_argument("--registru", default=str(get_config().elections_path))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--simulari", type=int, default=0, help="scenarii Monte Carlo per alegere (0 = fără)")
+    parser.add_argument("--output", default=str(get_config().election_results_path))
+    args = parser.parse_args()
+
+    registry = load_registry(args.registru)
+    ids = args.alegeri or list(registry)
+    necunoscute = [i for i in ids if i not in registry]
+    if necunoscute:
+        raise SystemExit(f"❌ Alegeri necunoscute: {', '.join(necunoscute)}")
+
+    print("\n==============================")
+    print("      AGREGARE MULTI-ALEGERI")
+    print("==============================\n")
+
+    consolidat = run_all([registry[i] for i in ids], workers=args.workers, n_simulari=args.simulari)
+
+    for r in consolidat["alegeri"].values():
+        print(f"🗳  {r['id']} ({r['numar_sondaje']} sondaje, {r['secunde'] * 1000:.1f} ms)")
+        for cand, est in r["estimari"].items():
+            media = "N/A" if est["media"] is None else f"{est['media']:.2f}%"
+            print(f"   {cand}: {media}")
+
+    if consolidat["sondaje_neatribuite"]:
+        print(f"⚠️ {consolidat['sondaje_neatribuite']} sondaje fără alegere atribuită")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(consolidat, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n📁 Rezultatele consolidate au fost salvate în {output}")
+
+
+if __name__ == "__main__":
+    main()
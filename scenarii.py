@@ -0,0 +1,159 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List
+
+import numpy as np
+
+from api_json import dumps
+from calibration_table import CalibrationTable
+from ml_core import data_alegeri, predict_features
+from ml_features import construieste_features
+from poll_aggregator import _construieste_matrice, _filtreaza_zile
+from poll_store import PollStore
+
+
+# -----------------------------
+# SCENARII "WHAT-IF" (sondaje ipotetice), SCORATE PE LOTURI
+#    - tot lotul devine un PollStore → un singur FeatureMatrix → un singur predict
+#    - agregatorul: sumele ponderate ale sondajelor reale se calculează o dată,
+#      apoi fiecare scenariu își adaugă contribuția (vectorizat pe tot lotul)
+#    - "agregat" = ce ar da calculeaza_medii_candidati(reale + scenariul, azi)
+# -----------------------------
+
+MAX_SCENARII = 100_000
+MARIME_LOT_JSON = 2_000  # scenarii serializate per bucată în răspunsul streaming
+
+
+@dataclass
+class ScorScenarii:
+    azi: date
+    candidati: List[str]
+    prezent: np.ndarray       # bool (n_scenarii × n_cand): candidatul apare în scenariu
+    calibrat: np.ndarray      # procentul × coeficientul institutului, NaN unde lipsește
+    agregat: np.ndarray       # media agregatorului cu scenariul adăugat
+    marja_eroare: np.ndarray  # marja agregată cu scenariul adăugat
+    ml: np.ndarray            # predicția modelului pentru rândul (scenariu, candidat)
+    in_fereastra: np.ndarray  # bool (n_scenarii,): scenariul intră în fereastra lui "azi"
+
+    def __len__(self) -> int:
+        return len(self.in_fereastra)
+
+
+def lot_din_scenarii(scenarii: Iterable[Dict[str, Any]]) -> PollStore:
+    """Scenariile (câmpurile din polls_buc.json) → PollStore, în ordinea primită."""
+    lot = PollStore.from_records(scenarii)
+    if lot.ignorate:
+        raise ValueError(f"❌ {lot.ignorate} scenarii au dată sau procentaje invalide.")
+    return lot
+
+
+def scoreaza_scenarii(
+    lot: PollStore,
+    reale: PollStore,
+    tabel: CalibrationTable,
+    max_age_days: int = 40,
+    lambda_time_decay: float = 0.04,
+    azi: date | None = None,
+) -> ScorScenarii:
+    """
+    Scorează independent fiecare scenariu din lot: fiecare e adăugat singur
+    peste sondajele reale, niciodată împreună cu celelalte scenarii.
+    """
+    data_vot = data_alegeri()
+    if azi is None:
+        azi = data_vot
+
+    candidati = list(lot.candidati)
+    ziua = azi.toordinal()
+
+    # ----------------------------
+    # AGREGATOR: sumele sondajelor reale, o singură dată
+    # ----------------------------
+    baza = _construieste_matrice(_filtreaza_zile(reale, ziua - max_age_days, ziua), candidati, tabel)
+    w_baza = np.exp(-lambda_time_decay * (ziua - baza.zile))[:, None] * baza.greutati_baza
+    s_w = w_baza.sum(axis=0)
+    s_wx = (w_baza * baza.procente).sum(axis=0)
+    s_w2se2 = ((w_baza ** 2) * (baza.ses ** 2)[:, None]).sum(axis=0)
+
+    # contribuția fiecărui scenariu (0 dacă e în afara ferestrei)
+    m = _construieste_matrice(lot, candidati, tabel)
+    varste = ziua - m.zile
+    in_fereastra = (varste >= 0) & (varste <= max_age_days)
+    w = np.where(in_fereastra, np.exp(-lambda_time_decay * varste), 0.0)[:, None] * m.greutati_baza
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        suma = s_w + w
+        agregat = (s_wx + w * m.procente) / suma
+        marja = 1.96 * np.sqrt(s_w2se2 + (w ** 2) * (m.ses ** 2)[:, None]) / suma
+
+    # ----------------------------
+    # ML: un rând per (scenariu, candidat prezent), un singur predict
+    # ----------------------------
+    fm = construieste_features(lot, candidati, data_vot)
+    ml = np.full(m.procente.shape, np.nan)
+    if len(fm):
+        ml[fm.sondaj, fm.candidat] = predict_features(fm)
+
+    lipsa = ~m.prezent
+    agregat[lipsa] = marja[lipsa] = np.nan
+
+    return ScorScenarii(
+        azi=azi,
+        candidati=candidati,
+        prezent=m.prezent,
+        calibrat=np.where(m.prezent, m.procente, np.nan),
+        agregat=agregat,
+        marja_eroare=marja,
+        ml=ml,
+        in_fereastra=in_fereastra,
+    )
+
+
+# ----------------------------
+# SERIALIZARE JSON PE BUCĂȚI (răspuns streaming)
+# ----------------------------
+
+def _valori(a: np.ndarray) -> List[List[float | None]]:
+    """Rânduri de float-uri Python, NaN → None (null în JSON)."""
+    return np.where(np.isnan(a), None, a).tolist()
+
+
+def scenarii_json(scor: ScorScenarii, antet: Dict[str, Any], marime_lot: int = MARIME_LOT_JSON) -> Iterator[bytes]:
+    """
+    {**antet, "scenarii": [...]} ca bucăți de bytes: în memorie stă doar
+    o bucată de marime_lot scenarii serializate, nu tot răspunsul.
+    """
+    inceput = dumps(antet)[:-1]
+    yield inceput + (b"," if antet else b"") + b'"scenarii":['
+
+    for start in range(0, len(scor), marime_lot):
+        stop = min(start + marime_lot, len(scor))
+        coloane = [
+            _valori(a[start:stop])
+            for a in (scor.calibrat, scor.agregat, scor.marja_eroare, scor.ml)
+        ]
+        prezent = scor.prezent[start:stop].tolist()
+        bucata = [
+            {
+                "index": i,
+                "in_fereastra": fereastra,
+                "candidati": {
+                    cand: {
+                        "calibrat": calibrat[j],
+                        "agregat": agregat[j],
+                        "marja_eroare": marja[j],
+                        "ml": ml[j],
+                    }
+                    for j, cand in enumerate(scor.candidati)
+                    if p[j]
+                },
+            }
+            for i, fereastra, p, calibrat, agregat, marja, ml in zip(
+                range(start, stop), scor.in_fereastra[start:stop].tolist(), prezent, *coloane
+            )
+        ]
+        # o singură serializare per bucată (fără "[" și "]"), nu una per scenariu
+        yield (b"," if start else b"") + dumps(bucata)[1:-1]
+
+    yield b"]}"
@@ -0,0 +1,149 @@
+from __future__ import annotations
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Sequence, Tuple
+
+from file_cache import FileCache, file_fingerprint
+from http_cache import din_mtime_ns, etag
+
+
+# -----------------------------
+# CACHE-UL DE STOCK ȚINUT ÎN MEMORIE (pentru API)
+#    - stocks_cache.json e parsat o singură dată per versiune a fișierului
+#      (stock_agent.save_cache_atomic îl înlocuiește cu os.replace → mtime nou)
+#    - pentru fiecare țară: corpul răspunsului deja serializat + ETag-ul lui,
+#      deci un request e doar o căutare în dict
+#    - o versiune nouă se construiește separat și înlocuiește referința
+#      dintr-o singură atribuire; cititorii văd fie versiunea veche, fie pe cea nouă
+#    - răspunsul bulk (toate țările) e serializat la încărcare; subseturile
+#      de țări / câmpuri se serializează o dată și se țin per versiune
+# -----------------------------
+
+MAX_VEDERI = 256  # combinații (țări, câmpuri) memorate per versiune a fișierului
+
+@dataclass(frozen=True)
+class RaspunsTara:
+    corp: bytes               # {"country": cod, **intrare}, exact ca JSONResponse
+    etag: str                 # hash-ul corpului: se schimbă doar când se schimbă țara
+    updated_at: str | None
+    last_modified: datetime
+
+
+@dataclass(frozen=True)
+class RaspunsBulk:
+    corp: bytes
+    etag: str
+    last_modified: datetime | None  # cea mai recentă actualizare dintre țările incluse
+
+
+@dataclass(frozen=True)
+class StockStore:
+    fingerprint: Tuple[int, int] | None = None
+    tari: Dict[str, RaspunsTara] = field(default_factory=dict)
+    intrari: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    _vederi: Dict[tuple, RaspunsBulk] = field(default_factory=dict, repr=False, compare=False)
+
+    def __len__(self) -> int:
+        return len(self.tari)
+
+    def get(self, code: str) -> RaspunsTara | None:
+        return self.tari.get(code.upper())
+
+    def vedere(
+        self,
+        coduri: Sequence[str] | None = None,
+        campuri: Sequence[str] | None = None,
+    ) -> RaspunsBulk:
+        """
+        {"countries": {cod: intrare}, "missing": [...]} pentru țările cerute
+        (None = toate), cu doar câmpurile cerute (None = toate), în ordinea
+        din fișier. Cheia e normalizată, deci ordinea parametrilor nu contează.
+        """
+        cheie = (
+            None if coduri is None else tuple(sorted({c.upper() for c in coduri})),
+            None if campuri is None else tuple(sorted(set(campuri))),
+        )
+        gata = self._vederi.get(cheie)
+        if gata is not None:
+            return gata
+
+        alese = set(cheie[0]) if cheie[0] is not None else None
+        tari: Dict[str, Dict[str, Any]] = {}
+        for code, intrare in self.intrari.items():
+            if alese is None or code in alese:
+                tari[code] = intrare if campuri is None else {
+                    k: v for k, v in intrare.items() if k in cheie[1]
+                }
+        continut: Dict[str, Any] = {"countries": tari}
+        if alese is not None:
+            continut["missing"] = [c for c in cheie[0] if c not in self.intrari]
+
+        corp = _serializeaza(continut)
+        momente = [self.tari[c].last_modified for c in tari]
+        vedere = RaspunsBulk(
+            corp=corp,
+            etag=etag("stocks", corp.decode("utf-8")),
+            last_modified=max(momente) if momente else None,
+        )
+
+        if len(self._vederi) >= MAX_VEDERI:
+            # cea mai veche combinație iese (dict-ul păstrează ordinea inserării)
+            self._vederi.pop(next(iter(self._vederi)), None)
+        self._vederi[cheie] = vedere
+        return vedere
+
+
+def _serializeaza(continut: Any) -> bytes:
+    # aceleași setări ca starlette.responses.JSONResponse.render
+    return json.dumps(
+        continut, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _last_modified(updated_at: Any, implicit: datetime) -> datetime:
+    try:
+        moment = datetime.fromisoformat(str(updated_at).replace("Z", "+00:00"))
+    except ValueError:
+        return implicit
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def incarca_stock_store(path: Path) -> StockStore:
+    fp = file_fingerprint(path)
+    if fp is None:
+        return StockStore()
+
+    try:
+        cache = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        # fișier trunchiat / invalid: ca stock_agent.load_cache, tratat ca gol
+        return StockStore(fingerprint=fp)
+
+    mtime = din_mtime_ns(fp[0])
+    tari: Dict[str, RaspunsTara] = {}
+    intrari: Dict[str, Dict[str, Any]] = {}
+    for code, intrare in cache.items():
+        if not isinstance(intrare, dict):
+            continue
+        corp = _serializeaza({"country": code, **intrare})
+        intrari[code.upper()] = intrare
+        tari[code.upper()] = RaspunsTara(
+            corp=corp,
+            etag=etag("stock", corp.decode("utf-8")),
+            updated_at=intrare.get("updated_at"),
+            last_modified=_last_modified(intrare.get("updated_at"), mtime),
+        )
+
+    store = StockStore(fingerprint=fp, tari=tari, intrari=intrari)
+    store.vedere()  # blob-ul cu toate țările, gata înainte de primul request
+    return store
+
+
+# un singur StockStore per proces și per versiune a fișierului
+_STOCK_CACHE = FileCache(incarca_stock_store)
+
+
+def get_stock_store(path: Path | str) -> StockStore:
+    return _STOCK_CACHE.get(path)
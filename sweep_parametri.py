@@ -0,0 +1,213 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from calibration_table import load_calibration_table
+from config import get_config
+from elections import Election, get_election
+from poll_aggregator import _construieste_matrice, _filtreaza_zile
+from poll_store import load_poll_store
+
+# data alegerilor și fișierele (sondaje / rezultate / calibrare) vin din registru
+ALEGERE_IMPLICITA = "ro-pmb-2024"
+
+
+# -----------------------------
+# EVALUARE VECTORIZATĂ PE GRILĂ
+#    pentru o zi "azi" fixă, toate configurațiile (lambda, max_age_days)
+#    se evaluează cu două produse matriceale (configurații × sondaje) @ (sondaje × candidați)
+# -----------------------------
+
+def evalueaza_grila(
+    lambdas: np.ndarray,
+    max_ages: np.ndarray,
+    azi: date,
+    polls_path: Path | None = None,
+    results_path: Path | None = None,
+    accuracy_path: Path | None = None,
+) -> Dict[str, np.ndarray]:
+    """
+    MAE și eroarea maximă (puncte procentuale) față de rezultatele reale pentru
+    fiecare configurație. Căile lipsă vin din config.get_config().
+    """
+    cfg = get_config()
+    polls_path = polls_path or cfg.polls_path
+    results_path = results_path or cfg.results_path
+    accuracy_path = accuracy_path or cfg.accuracy_path
+
+    store = load_poll_store(polls_path)
+    tabel = load_calibration_table(accuracy_path)
+    rezultate = json.loads(Path(results_path).read_text(encoding="utf-8"))
+
+    candidati = list(rezultate)
+    real = np.array([rezultate[c] for c in candidati], dtype=float)
+
+    sondaje = _filtreaza_zile(store, azi.toordinal() - int(max_ages.max()), azi.toordinal())
+    m = _construieste_matrice(sondaje, candidati, tabel)
+    varste = azi.toordinal() - m.zile
+
+    # ponderea de timp pentru fiecare (configurație, sondaj); 0 în afara ferestrei
+    w_timp = np.exp(-np.outer(lambdas, varste))
+    w_timp *= varste[None, :] <= max_ages[:, None]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        medii = (w_timp @ (m.greutati_baza * m.procente)) / (w_timp @ m.greutati_baza)
+
+    erori = np.abs(medii - real[None, :])
+    # o configurație care lasă un candidat fără estimare nu e validă
+    valid = np.isfinite(erori).all(axis=1)
+
+    mae = np.where(valid, np.nan_to_num(erori).mean(axis=1), np.inf)
+    eroare_max = np.where(valid, np.nan_to_num(erori).max(axis=1), np.inf)
+    return {"mae": mae, "eroare_max": eroare_max, "medii": medii}
+
+
+def _evalueaza_lot(args) -> Dict[str, Any]:
+    lambdas, max_ages, azi, cai = args
+    t0 = time.perf_counter()
+    out = evalueaza_grila(lambdas, max_ages, azi, *cai)
+    return {
+        "lambdas": lambdas,
+        "max_ages": max_ages,
+        "azi": azi,
+        "mae": out["mae"],
+        "eroare_max": out["eroare_max"],
+        "secunde": time.perf_counter() - t0,
+    }
+
+
+# -----------------------------
+# GRILĂ / RANDOM SEARCH + FAN-OUT PE PROCESE
+# -----------------------------
+
+def construieste_configuratii(
+    lambda_min: float,
+    lambda_max: float,
+    lambda_pas: float,
+    age_min: int,
+    age_max: int,
+    age_pas: int,
+    random_n: int = 0,
+    seed: int = 42,
+) -> tuple[np.ndarray, np.ndarray]:
+    if random_n > 0:
+        rng = np.random.default_rng(seed)
+        lambdas = rng.uniform(lambda_min, lambda_max, random_n)
+        max_ages = rng.integers(age_min, age_max + 1, random_n)
+        return lambdas, max_ages
+
+    grila_l = np.arange(lambda_min, lambda_max + lambda_pas / 2, lambda_pas)
+    grila_a = np.arange(age_min, age_max + 1, age_pas)
+    lambdas, max_ages = np.meshgrid(grila_l, grila_a, indexing="ij")
+    return lambdas.ravel(), max_ages.ravel()
+
+
+def sweep(
+    lambdas: np.ndarray,
+    max_ages: np.ndarray,
+    zile_inainte: List[int],
+    workers: int = 1,
+    marime_lot: int = 5_000,
+    alegere: Election | None = None,
+) -> Dict[str, Any]:
+    if alegere is None:
+        alegere = get_election(ALEGERE_IMPLICITA)
+    if alegere.rezultate is None:
+        raise ValueError(f"❌ Alegerea {alegere.id} nu are rezultate în registru.")
+    cai = (alegere.sondaje, alegere.rezultate, alegere.accuracy)
+
+    loturi = [
+        (lambdas[i:i + marime_lot], max_ages[i:i + marime_lot], alegere.data - timedelta(days=z), cai)
+        for z in zile_inainte
+        for i in range(0, len(lambdas), marime_lot)
+    ]
+
+    t0 = time.perf_counter()
+    if workers > 1 and len(loturi) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rezultate = list(pool.map(_evalueaza_lot, loturi))
+    else:
+        rezultate = [_evalueaza_lot(lot) for lot in loturi]
+    durata = time.perf_counter() - t0
+
+    configuratii = []
+    for r in rezultate:
+        for lam, age, mae, emax in zip(r["lambdas"], r["max_ages"], r["mae"], r["eroare_max"]):
+            configuratii.append({
+                "lambda_time_decay": float(lam),
+                "max_age_days": int(age),
+                "azi": r["azi"].isoformat(),
+                "mae": float(mae),
+                "eroare_max": float(emax),
+            })
+    configuratii.sort(key=lambda c: (c["mae"], c["eroare_max"]))
+
+    return {
+        "configuratii": configuratii,
+        "numar_configuratii": len(configuratii),
+        "secunde_total": durata,
+        "secunde_per_configuratie": durata / max(len(configuratii), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Sweep pentru max_age_days / lambda_time_decay față de rezultatele reale"
+    )
+    parser.add_argument("--alegere", default=ALEGERE_IMPLICITA, help="id din data/elections.json")
+    parser.add_argument("--lambda-min", type=float, default=0.0)
+    parser.add_argument("--lambda-max", type=float, default=0.2)
+    parser.add_argument("--lambda-pas", type=float, default=0.002)
+    parser.add_argument("--age-min", type=int, default=5)
+    parser.add_argument("--age-max", type=int, default=120)
+    parser.add_argument("--age-pas", type=int, default=1)
+    parser.add_argument("--random", type=int, default=0, help="random search cu N configurații în loc de grilă")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--zile-inainte", type=int, nargs="+", default=[8],
+        help="cu câte zile înainte de alegeri se face estimarea (8 = 2024-06-01 pentru PMB 2024, ca în main.py)",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    lambdas, max_ages = construieste_configuratii(
+        args.lambda_min, args.lambda_max, args.lambda_pas,
+        args.age_min, args.age_max, args.age_pas,
+        random_n=args.random, seed=args.seed,
+    )
+
+    print("\n==============================")
+    print("      SWEEP PARAMETRI AGREGATOR")
+    print("==============================\n")
+
+    alegere = get_election(args.alegere)
+    print(f"🗳  {alegere.nume} ({alegere.data.isoformat()})")
+
+    rezultat = sweep(lambdas, max_ages, args.zile_inainte, workers=args.workers, alegere=alegere)
+
+    print(f"🔢 Configurații evaluate: {rezultat['numar_configuratii']}")
+    print(f"⏱  Timp total: {rezultat['secunde_total']:.3f}s "
+          f"({rezultat['secunde_per_configuratie'] * 1e6:.1f} µs / configurație)")
+
+    print(f"\n===== TOP {args.top} (după MAE) =====")
+    for i, c in enumerate(rezultat["configuratii"][:args.top], 1):
+        print(
+            f"{i}. lambda={c['lambda_time_decay']:.4f}  max_age_days={c['max_age_days']}  "
+            f"azi={c['azi']}  MAE={c['mae']:.3f}p  max={c['eroare_max']:.3f}p"
+        )
+
+    best = rezultat["configuratii"][0]
+    print("\n✔ Cele mai bune setări:", json.dumps(best, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
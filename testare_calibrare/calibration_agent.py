@@ -1,31 +1,41 @@
 import json
+import sys
 from collections import defaultdict
 from datetime import date
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Any
+
+if __name__ == "__main__":
+    # rulat ca script: root-ul proiectului (config, calibration_table, ...) în sys.path
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from calibration_table import CalibrationTable  # noqa: E402
+from config import get_config  # noqa: E402
+from elections import get_election  # noqa: E402
+from poll_store import PollStore, load_poll_store  # noqa: E402
 
 # ----------------------------
-# DETECTARE ROOT PROIECT (universală)
+# CĂI PROIECT
+#    vin din config.get_config() (root-ul cu "data/" sau MYPOLLS_ROOT);
+#    numele vechi (ROOT, HISTORY_DIR, ...) rămân disponibile prin __getattr__
 # ----------------------------
-THIS_FILE = Path(__file__).resolve()
-ROOT = THIS_FILE
+_CAI = {
+    "ROOT": "root",
+    "HISTORY_DIR": "history_dir",
+    "POLLS_PATH": "polls_path",
+    "ACCURACY_PATH": "accuracy_path",
+}
+
 
-# urcăm în sus până găsim folderul "data"
-while ROOT != ROOT.parent:
-    if (ROOT / "data").exists():
-        break
-    ROOT = ROOT.parent
+# alegerea calibrată: data alegerilor și fereastra de sondaje vin din registru
+ALEGERE = "ro-pmb-2024"
 
-if not (ROOT / "data").exists():
-    raise FileNotFoundError("❌ Nu am putut găsi folderul 'data' în niciun director părinte.")
 
-# acum toate path-urile sunt 100% corecte, indiferent unde rulează scriptul
-HISTORY_DIR = ROOT / "data" / "history"
-POLLS_PATH = ROOT / "data" / "polls_buc.json"
-ACCURACY_PATH = ROOT / "data" / "accuracy_institutes.json"
+def __getattr__(name: str):
+    if name in _CAI:
+        return getattr(get_config(), _CAI[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-print(f"📁 ROOT detectat: {ROOT}")
-print(f"📁 HISTORY_DIR: {HISTORY_DIR}")
 
 # ----------------------------
 # NORMALIZARE INSTITUTE (FULL)
@@ -68,11 +78,12 @@ def load_json(path: Path, default):
 
 def load_latest_history() -> Dict[str, Any]:
     """Încarcă ultimul snapshot din data/history"""
-    if not HISTORY_DIR.exists():
+    history_dir = get_config().history_dir
+    if not history_dir.exists():
         raise FileNotFoundError("❌ Nu există directorul data/history.")
 
     run_files = sorted(
-        HISTORY_DIR.glob("rezultate_*.json"),
+        history_dir.glob("rezultate_*.json"),
         key=lambda p: p.stat().st_mtime,
         reverse=True
     )
@@ -96,13 +107,23 @@ def compute_institute_bonuses(
     learning_rate_bonus: float = 0.3,
     learning_rate_coef_global: float = 0.7,
     learning_rate_coef_cand: float = 0.7,
+    store: PollStore | None = None,
+    previous: Dict[str, Dict[str, Any]] | None = None,
 ) -> Dict[str, Dict[str, Any]]:
-
-    # încărcăm sondaje brute
-    polls = load_json(POLLS_PATH, [])
-    previous = load_json(ACCURACY_PATH, {})
-
-    if not polls:
+    """
+    Bonusurile noi pentru fiecare institut. `store` / `previous` pot fi date
+    din memorie (bucla de calibrare); implicit se citesc din polls_buc.json
+    și accuracy_institutes.json. Fără print-uri: sondajele corupte
+    (store.ignorate) le raportează cine încarcă store-ul.
+    """
+
+    # sondajele din PollStore-ul partajat (datele corupte sunt deja sărite la încărcare)
+    if store is None:
+        store = load_poll_store(get_config().polls_path)
+    if previous is None:
+        previous = load_json(get_config().accuracy_path, {})
+
+    if not len(store):
         raise ValueError("❌ polls_buc.json este gol sau nu există.")
 
     # colectoare de erori
@@ -111,51 +132,36 @@ def compute_institute_bonuses(
     ratios_global = defaultdict(list)
     ratios_per_cand = defaultdict(lambda: defaultdict(list))
 
-    # pondere institut vs candidat
-    GAMMA_INST_COEF = 0.7
-    GAMMA_CAND_COEF = 0.3
+    # coeficienții efectivi din iterația anterioară, compilați o singură dată
+    prev_table = CalibrationTable.from_accuracy_db(previous)
+
+    # normalizare nume institut — o dată per institut internat, nu per sondaj
+    inst_norm = [normalize_institute(n) for n in store.institute]
+    inst_ids = prev_table.ids_institute(inst_norm)
+
+    # coloanele candidaților din rezultate + coeficienții lor per institut
+    candidati = list(final_results)
+    procente, prezent = store.coloane_candidati(candidati)
+    cand_ids = prev_table.ids_candidati(candidati)
+
+    # ignorăm sondaje în afara ferestrei
+    varste = election_date.toordinal() - store.zile.astype(int)
+    in_fereastra = (varste >= 0) & (varste <= max_age_days)
 
     # procesăm fiecare sondaj
-    for poll in polls:
-
-        # validare minimă
-        if "institut" not in poll or "procentaje" not in poll or "data" not in poll:
-            print("⚠️ Sondaj corupt ignorat:", poll)
-            continue
-
-        # normalizare nume institut
-        inst = normalize_institute(poll["institut"])
-        procentaje = poll.get("procentaje", {})
-
-        # validare dată
-        try:
-            poll_date = date.fromisoformat(poll["data"])
-        except:
-            print(f"⚠️ Dată invalidă în sondaj: {poll}")
-            continue
-
-        # ignorăm sondaje în afara ferestrei
-        age_days = (election_date - poll_date).days
-        if age_days < 0 or age_days > max_age_days:
-            continue
-
-        # coeficienții anteriori
-        prev_inst = previous.get(inst, {})
-        prev_global_coef = float(prev_inst.get("coeficient_procente", 1.0))
-        prev_cand_block = prev_inst.get("cand", {}) or {}
+    for r in map(int, in_fereastra.nonzero()[0]):
+        inst = inst_norm[store.institut_id[r]]
+        inst_id = inst_ids[store.institut_id[r]]
 
         # analizăm fiecare candidat
-        for cand, real in final_results.items():
+        for j, (cand, real) in enumerate(final_results.items()):
 
-            if cand not in procentaje:
+            if not prezent[r, j]:
                 continue
-            raw = procentaje[cand]
-
-            prev_cand_info = prev_cand_block.get(cand, {})
-            prev_cand_coef = float(prev_cand_info.get("coeficient_procente", 1.0))
+            raw = float(procente[r, j])
 
             # coeficient efectiv folosit în iteratia anterioară
-            effective_coef = (prev_global_coef**GAMMA_INST_COEF) * (prev_cand_coef**GAMMA_CAND_COEF)
+            effective_coef = float(prev_table.coef[inst_id, cand_ids[j]])
             adjusted = raw * effective_coef
 
             # erori
@@ -262,7 +268,8 @@ def compute_institute_bonuses(
 # ----------------------------
 # SALVARE CU NORMALIZARE FINALĂ
 # ----------------------------
-def save_accuracy(bonuses: Dict[str, Dict[str, Any]]):
+def merge_accuracy(bonuses: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Combină institutele care devin identice după normalizare (fără efecte pe disc)."""
 
     merged = {}
 
@@ -271,7 +278,7 @@ def save_accuracy(bonuses: Dict[str, Dict[str, Any]]):
         inst = normalize_institute(raw_inst)
 
         if inst not in merged:
-            merged[inst] = data
+            merged[inst] = dict(data)
         else:
             # media bonusurilor dacă existau dubluri
             merged[inst]["bonus_greutate"] = round(
@@ -284,7 +291,13 @@ def save_accuracy(bonuses: Dict[str, Dict[str, Any]]):
                 (merged[inst]["coeficient_procente"] + data["coeficient_procente"]) / 2, 4
             )
 
-    ACCURACY_PATH.write_text(
+    return merged
+
+
+def save_accuracy(bonuses: Dict[str, Dict[str, Any]]):
+    merged = merge_accuracy(bonuses)
+
+    get_config().accuracy_path.write_text(
         json.dumps(merged, indent=2, ensure_ascii=False), encoding="utf-8"
     )
     print("✔ accuracy_institutes.json salvat (normalizat + curățat)")
@@ -294,16 +307,26 @@ def save_accuracy(bonuses: Dict[str, Dict[str, Any]]):
 # RUN
 # ----------------------------
 def calibrate_from_latest_snapshot():
+    cfg = get_config()
+    print(f"📁 ROOT detectat: {cfg.root}")
+    print(f"📁 HISTORY_DIR: {cfg.history_dir}")
+
     snapshot = load_latest_history()
     final_results = snapshot.get("rezultate_complete")
 
     if not final_results:
         raise ValueError("❌ Snapshot-ul nu are câmpul 'rezultate_complete'.")
 
+    store = load_poll_store(cfg.polls_path)
+    if store.ignorate:
+        print(f"⚠️ {store.ignorate} sondaje corupte ignorate")
+
+    alegere = get_election(ALEGERE)
     bonuses = compute_institute_bonuses(
         final_results=final_results,
-        election_date=date(2024,6,9),
-        max_age_days=40
+        election_date=alegere.data,
+        max_age_days=alegere.max_age_days,
+        store=store,
     )
     save_accuracy(bonuses)
 
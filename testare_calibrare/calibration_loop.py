@@ -0,0 +1,147 @@
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+if __name__ == "__main__":
+    # rulat ca script: root-ul proiectului în sys.path (calibration_agent e lângă script)
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from calibration_agent import (  # noqa: E402
+    ALEGERE,
+    compute_institute_bonuses,
+    load_json,
+    merge_accuracy,
+)
+from calibration_table import CalibrationTable  # noqa: E402
+from config import get_config  # noqa: E402
+from elections import Election, get_election  # noqa: E402
+from poll_aggregator import calculeaza_medii_candidati  # noqa: E402
+from poll_store import PollStore, load_poll_store  # noqa: E402
+
+# aceleași criterii ca backup/train_until_converged.py
+TOLERANTA = 3.0  # ±3%
+MAX_ITERATII = 50
+
+# ziua agregării, fereastra, time-decay-ul și data alegerilor vin din intrarea
+# ALEGERE a registrului (data/elections.json), ca în calibrate_from_latest_snapshot
+
+
+# ----------------------------
+# BUCLA CALIBRARE → AGREGARE, ÎN MEMORIE
+#    aceeași succesiune ca train_until_converged (main.py → calibration_agent.py
+#    → verificare toleranță), dar fără subprocese, fără sleep, fără snapshot-uri
+#    intermediare și fără re-citirea fișierelor; pe disc se scrie doar
+#    accuracy_institutes.json final
+# ----------------------------
+
+def diferenta_maxima(estimari: Dict[str, float | None], rezultate: Dict[str, float]) -> float:
+    """Diferența maximă absolută între estimări și rezultate reale."""
+    diffs = [
+        abs(estimari[cand] - real)
+        for cand, real in rezultate.items()
+        if estimari.get(cand) is not None
+    ]
+    return max(diffs) if diffs else 999
+
+
+def optimizeaza_calibrarea(
+    store: PollStore,
+    final_results: Dict[str, float],
+    accuracy: Dict[str, Dict[str, Any]],
+    toleranta: float = TOLERANTA,
+    max_iteratii: int = MAX_ITERATII,
+    alegere: Election | None = None,
+) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]], bool]:
+    """
+    Iterează până când agregatorul calibrat ajunge în toleranță.
+    Întoarce (accuracy final, istoricul iterațiilor, convergent).
+    """
+    if alegere is None:
+        alegere = get_election(ALEGERE)
+    candidati = list(final_results)
+    istoric: List[Dict[str, Any]] = []
+
+    for i in range(1, max_iteratii + 1):
+        # 1️⃣ agregarea cu calibrarea curentă (main.py)
+        rezultate = calculeaza_medii_candidati(
+            store,
+            candidati,
+            CalibrationTable.from_accuracy_db(accuracy),
+            max_age_days=alegere.max_age_days,
+            lambda_time_decay=alegere.lambda_time_decay,
+            azi=alegere.zi_estimare,
+        )
+        estimari = {c: r["media"] for c, r in rezultate.items()}
+
+        # 2️⃣ calibrarea pornind de la accuracy-ul curent (calibration_agent.py)
+        accuracy = merge_accuracy(compute_institute_bonuses(
+            final_results=final_results,
+            election_date=alegere.data,
+            max_age_days=alegere.max_age_days,
+            store=store,
+            previous=accuracy,
+        ))
+
+        # 3️⃣ verificarea toleranței pe estimările din pasul 1
+        diff = diferenta_maxima(estimari, final_results)
+        istoric.append({"iteratie": i, "diferenta_maxima": diff, "estimari": estimari})
+
+        if diff <= toleranta:
+            return accuracy, istoric, True
+
+    return accuracy, istoric, False
+
+
+def save_accuracy_atomic(accuracy: Dict[str, Dict[str, Any]]) -> None:
+    accuracy_path = get_config().accuracy_path
+    tmp = accuracy_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(accuracy, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, accuracy_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrare → agregare până la toleranță, în proces")
+    parser.add_argument("--toleranta", type=float, default=TOLERANTA)
+    parser.add_argument("--max-iteratii", type=int, default=MAX_ITERATII)
+    parser.add_argument("--dry-run", action="store_true", help="nu scrie accuracy_institutes.json")
+    args = parser.parse_args()
+
+    cfg = get_config()
+    alegere = get_election(ALEGERE)
+    final_results = json.loads(cfg.results_path.read_text(encoding="utf-8"))
+    store = load_poll_store(cfg.polls_path)
+    accuracy = load_json(cfg.accuracy_path, {})
+    print("📌 Rezultatele reale PMB:", final_results)
+    if store.ignorate:
+        print(f"⚠️ {store.ignorate} sondaje corupte ignorate")
+
+    t0 = time.perf_counter()
+    accuracy, istoric, convergent = optimizeaza_calibrarea(
+        store, final_results, accuracy,
+        toleranta=args.toleranta, max_iteratii=args.max_iteratii, alegere=alegere,
+    )
+    durata = time.perf_counter() - t0
+
+    for pas in istoric:
+        print(f"   #{pas['iteratie']}: diferența maximă {pas['diferenta_maxima']:.2f}%")
+
+    if convergent:
+        print(f"\n🎉 Toleranța de ±{args.toleranta}% atinsă după {len(istoric)} iterații "
+              f"({durata * 1000:.1f} ms)")
+    else:
+        print(f"\n⚠️ A fost atins numărul maxim de iterații fără convergență ({durata * 1000:.1f} ms)")
+
+    if args.dry_run:
+        print("ℹ️ --dry-run: accuracy_institutes.json nu a fost modificat")
+        return
+
+    save_accuracy_atomic(accuracy)
+    print("✔ accuracy_institutes.json salvat (normalizat + curățat)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+from __future__ import annotations
+import json
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from incremental_aggregator import IncrementalAggregator  # noqa: E402
+from poll_aggregator import calculeaza_medii_candidati  # noqa: E402
+from poll_store import PollStore  # noqa: E402
+
+CANDIDATI = ["Nicușor Dan", "Gabriela Firea", "Cristian Popescu Piedone"]
+ACCURACY = {
+    "CURS": {"bonus_greutate": 1.2, "eroare_medie": 2.0, "coeficient_procente": 1.05},
+    "INSCOP": {"bonus_greutate": 0.9, "eroare_medie": 4.0, "coeficient_procente": 0.97},
+}
+PARAMETRI = {"max_age_days": 40, "lambda_time_decay": 0.04}
+
+
+def _sondaj(institut, data, nd, gf, cpp=None, esantion=1000, marja=3.0):
+    procentaje = {"Nicușor Dan": nd, "Gabriela Firea": gf}
+    if cpp is not None:
+        procentaje["Cristian Popescu Piedone"] = cpp
+    return {
+        "institut": institut,
+        "data": data,
+        "esantion": esantion,
+        "metoda": "CATI",
+        "procentaje": procentaje,
+        "marja_eroare": marja,
+    }
+
+
+SONDAJE = [
+    _sondaj("CURS", "2024-05-20", 46.0, 24.0, 27.0, esantion=1200),
+    # două sondaje de la același institut în aceeași zi: ambele contează
+    _sondaj("INSCOP", "2024-05-22", 38.5, 26.0, 20.0),
+    _sondaj("INSCOP", "2024-05-22", 31.0, 29.5, 22.0, esantion=800, marja=3.5),
+    _sondaj("Avangarde", "2024-04-10", 40.0, 30.0),
+    _sondaj("CURS", "2024-06-05", 44.0, 23.0, 19.0),  # din viitor pentru azi = 2024-06-01
+]
+
+
+def _scrie(path: Path, sondaje) -> None:
+    # același format ca agent_update.save_json
+    path.write_text(json.dumps(sondaje, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def _batch(path: Path, azi: date):
+    return calculeaza_medii_candidati(PollStore.load(path), CANDIDATI, ACCURACY, azi=azi, **PARAMETRI)
+
+
+def _egale(incremental, batch):
+    for cand in CANDIDATI:
+        a, b = incremental[cand], batch[cand]
+        assert a.get("numar_sondaje") == b.get("numar_sondaje")
+        if b["media"] is None:
+            assert a["media"] is None
+        else:
+            assert a["media"] == pytest.approx(b["media"], rel=1e-12)
+            assert a["marja_eroare"] == pytest.approx(b["marja_eroare"], rel=1e-12)
+
+
+def test_aceleasi_rezultate_ca_batch(tmp_path):
+    polls = tmp_path / "polls.json"
+    _scrie(polls, SONDAJE)
+    azi = date(2024, 6, 1)
+
+    agg = IncrementalAggregator(CANDIDATI, ACCURACY, azi=azi, **PARAMETRI)
+    assert agg.sincronizeaza(polls)["reconstruit"]
+    _egale(agg.rezultate(), _batch(polls, azi))
+    assert agg.rezultate()["Nicușor Dan"]["numar_sondaje"] == 3
+
+
+def test_coada_adaugata_si_reluare_din_disc(tmp_path):
+    polls, stare = tmp_path / "polls.json", tmp_path / "state.json"
+    azi = date(2024, 6, 1)
+    _scrie(polls, SONDAJE[:2])
+
+    agg = IncrementalAggregator(CANDIDATI, ACCURACY, azi=azi, **PARAMETRI)
+    agg.sincronizeaza(polls)
+    agg.save(stare)
+
+    _scrie(polls, SONDAJE)
+    reluat = IncrementalAggregator.load(stare, ACCURACY)
+    assert reluat.sincronizeaza(polls) == {"noi": 3, "reconstruit": False}
+    _egale(reluat.rezultate(), _batch(polls, azi))
+
+    # fișier neschimbat → nimic de absorbit
+    assert reluat.sincronizeaza(polls) == {"noi": 0, "reconstruit": False}
+
+    for zi in (date(2024, 6, 9), date(2024, 5, 25)):
+        reluat.advance(zi)
+        _egale(reluat.rezultate(), _batch(polls, zi))
+
+
+def test_editare_si_stergere_refac_sumele(tmp_path):
+    polls = tmp_path / "polls.json"
+    azi = date(2024, 6, 1)
+    _scrie(polls, SONDAJE)
+
+    agg = IncrementalAggregator(CANDIDATI, ACCURACY, azi=azi, **PARAMETRI)
+    agg.sincronizeaza(polls)
+
+    editate = [dict(s) for s in SONDAJE]
+    editate[1] = _sondaj("INSCOP", "2024-05-22", 41.0, 26.0, 20.0)
+    _scrie(polls, editate)
+    assert agg.sincronizeaza(polls)["reconstruit"]
+    _egale(agg.rezultate(), _batch(polls, azi))
+
+    _scrie(polls, editate[:1] + editate[2:])
+    assert agg.sincronizeaza(polls)["reconstruit"]
+    _egale(agg.rezultate(), _batch(polls, azi))
+    assert len(agg) == len(SONDAJE) - 1